@@ -0,0 +1,175 @@
+/**
+ * Promoter Index Benchmark
+ *
+ * Builds the promoter mirror's table (hash, bitmap, sorted and full-text
+ * indexes — see PromoterTable in src/promoter-mirror.ts) from synthetic
+ * promoters and times index builds and typical get_promoters queries at
+ * 10k, 100k and 1M rows. Each query is also run as a plain scan over the
+ * records, the way a store without indexes would answer it.
+ *
+ * Run with: npm run bench:indexes            (10k, 100k, 1M)
+ *           npm run bench:indexes -- 50000   (custom sizes)
+ *
+ * The 1M run needs about 3 GB of heap; the npm script raises Node's limit.
+ */
+
+import { PromoterTable, toRow, type PromoterQuery } from '../src/promoter-mirror.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+const SIZES = process.argv.slice(2).map(Number).filter((n) => n > 0);
+const DEFAULT_SIZES = [10_000, 100_000, 1_000_000];
+
+const STATES = ['accepted', 'accepted', 'accepted', 'pending', 'rejected', 'blocked', 'inactive'];
+const FIRST_NAMES = ['John', 'Jose', 'Maria', 'Anna', 'Li', 'Omar', 'Sara', 'Jonas', 'Joanna', 'Mehmet'];
+const LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Kowalski', 'Okafor', 'Jensen', 'Rossi', 'Novak'];
+const CAMPAIGNS = 20;
+
+// Timed repetitions per query (after one warm-up run)
+const RUNS = 20;
+
+// ============================================================================
+// DATA
+// ============================================================================
+
+/** Small deterministic PRNG (mulberry32), so every run sees the same data. */
+function random(seed: number): () => number {
+  return () => {
+    seed = (seed + 0x6d2b79f5) | 0;
+    let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+    t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+function promoter(id: number, rand: () => number): Record<string, unknown> {
+  const first = FIRST_NAMES[Math.floor(rand() * FIRST_NAMES.length)];
+  const last = LAST_NAMES[Math.floor(rand() * LAST_NAMES.length)];
+  const campaign = 1 + Math.floor(rand() * CAMPAIGNS);
+  const joined = Date.UTC(2020, 0, 1) + Math.floor(rand() * 5 * 365) * 86_400_000;
+  return {
+    id,
+    email: `${first}.${last}${id}@example.com`.toLowerCase(),
+    name: `${first} ${last}`,
+    cust_id: `cus_${id}`,
+    state: STATES[Math.floor(rand() * STATES.length)],
+    archived_at: rand() < 0.05 ? '2024-01-01 00:00:00' : null,
+    joined_at: new Date(joined).toISOString(),
+    fraud_suspicions: rand() < 0.02 ? ['same_ip_suspicion'] : [],
+    stats: {
+      revenue_amount: Math.floor(rand() * 100_000),
+      clicks_count: Math.floor(rand() * 5_000),
+      customers_count: Math.floor(rand() * 200),
+      referrals_count: Math.floor(rand() * 400),
+    },
+    promoter_campaigns: [{ campaign: { id: campaign }, ref_token: `ref${id}` }],
+  };
+}
+
+// ============================================================================
+// HELPERS
+// ============================================================================
+
+/** Median wall time of fn in ms, after one warm-up call. */
+function time(fn: () => unknown): number {
+  fn();
+  const samples: number[] = [];
+  for (let i = 0; i < RUNS; i++) {
+    const started = performance.now();
+    fn();
+    samples.push(performance.now() - started);
+  }
+  return samples.sort((a, b) => a - b)[Math.floor(RUNS / 2)];
+}
+
+function ms(value: number): string {
+  return value < 1 ? `${(value * 1000).toFixed(0)}µs` : `${value.toFixed(1)}ms`;
+}
+
+const stat = (record: Record<string, unknown>, key: string) =>
+  (record.stats as Record<string, number>)[key];
+const campaignOf = (record: Record<string, unknown>) =>
+  ((record.promoter_campaigns as { campaign: { id: number } }[])[0]).campaign.id;
+
+// ============================================================================
+// BENCHMARK
+// ============================================================================
+
+/**
+ * Each query as a get_promoters argument set, plus the equivalent scan
+ * (filter every record, then sort) for comparison.
+ */
+const QUERIES: { name: string; query: PromoterQuery; scan: (records: Record<string, unknown>[]) => unknown }[] = [
+  {
+    name: 'state + campaign',
+    query: { state: 'accepted', campaign_id: 7 },
+    scan: (records) => records
+      .filter((r) => !r.archived_at && r.state === 'accepted' && campaignOf(r) === 7)
+      .sort((a, b) => (b.id as number) - (a.id as number))
+      .slice(0, 20),
+  },
+  {
+    name: 'revenue range, sort by revenue',
+    query: { revenue_amount_from: 40_000, revenue_amount_to: 60_000, sort_by: 'revenue_amount' },
+    scan: (records) => records
+      .filter((r) => !r.archived_at && stat(r, 'revenue_amount') >= 40_000 && stat(r, 'revenue_amount') <= 60_000)
+      .sort((a, b) => stat(b, 'revenue_amount') - stat(a, 'revenue_amount'))
+      .slice(0, 20),
+  },
+  {
+    name: 'joined_at range, sort by clicks',
+    query: { joined_at_from: '2023-01-01', joined_at_to: '2023-03-31', sort_by: 'clicks_count' },
+    scan: (records) => records
+      .filter((r) => !r.archived_at && (r.joined_at as string) >= '2023-01-01' && (r.joined_at as string) < '2023-04-01')
+      .sort((a, b) => stat(b, 'clicks_count') - stat(a, 'clicks_count'))
+      .slice(0, 20),
+  },
+  {
+    name: 'ids (3)',
+    query: { ids: [5, 500, 5000] },
+    scan: (records) => records.filter((r) => [5, 500, 5000].includes(r.id as number)),
+  },
+  {
+    name: 'q "jo" (prefix search)',
+    query: { q: 'jo' },
+    scan: (records) => records
+      .filter((r) => !r.archived_at && `${r.name} ${r.email}`.toLowerCase().split(/[^a-z0-9]+/).some((w) => w.startsWith('jo')))
+      .slice(0, 20),
+  },
+];
+
+function run(size: number): void {
+  const rand = random(size);
+  const records = Array.from({ length: size }, (_, i) => promoter(i + 1, rand));
+  const heapBefore = process.memoryUsage().heapUsed;
+
+  // Hash, bitmap and full-text indexes are maintained on upsert
+  const table = new PromoterTable();
+  let started = performance.now();
+  for (const record of records) table.upsert(toRow(record)!);
+  const upsertMs = performance.now() - started;
+
+  // Sorted indexes are built by the first query that needs them
+  started = performance.now();
+  table.query({ sort_by: 'revenue_amount' }, 1, 20);
+  const sortedMs = performance.now() - started;
+  const heapMb = (process.memoryUsage().heapUsed - heapBefore) / 1024 / 1024;
+
+  const email = (records[Math.floor(size / 2)].email as string);
+  console.log(
+    `\n${size.toLocaleString('en')} promoters — upsert + hash/bitmap/search indexes ${ms(upsertMs)}, ` +
+    `sorted indexes ${ms(sortedMs)}, index memory ~${heapMb.toFixed(0)} MB`
+  );
+  console.log(`  ${'email lookup'.padEnd(32)} ${ms(time(() => table.lookup('email', email))).padStart(8)}` +
+    `   scan ${ms(time(() => records.find((r) => r.email === email))).padStart(8)}`);
+  for (const { name, query, scan } of QUERIES) {
+    console.log(`  ${name.padEnd(32)} ${ms(time(() => table.query(query, 1, 20))).padStart(8)}` +
+      `   scan ${ms(time(() => scan(records))).padStart(8)}`);
+  }
+}
+
+for (const size of SIZES.length > 0 ? SIZES : DEFAULT_SIZES) {
+  run(size);
+}
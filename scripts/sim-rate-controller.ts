@@ -0,0 +1,184 @@
+/**
+ * Adaptive Rate Control Simulation
+ *
+ * Runs the real RateLimiter and AdaptiveRateController (src/rate-limiter.ts,
+ * src/rate-controller.ts) against an in-process mock of FirstPromoter's
+ * rate limit, once with the adaptive controller and once with the static
+ * limit, and compares the throughput. Like a test track: same car, same
+ * course, once with cruise control fixed and once with an attentive driver.
+ *
+ * The mock enforces a sliding-window limit per token and answers 429 with
+ * Retry-After once it is used up. Scenarios:
+ * - headroom: the account's real limit is twice the configured start
+ * - sole client: the real limit is just above the configured start
+ * - shared token: another client uses part of the same budget
+ * - headers: like headroom, but the mock sends X-RateLimit-* headers
+ *
+ * Time is scaled down (2s windows) so a run takes about 40 seconds; every
+ * scenario runs concurrently with its own limiter, controller and mock.
+ *
+ * Run with: npm run sim:rate-controller
+ */
+
+import { RateLimiter } from '../src/rate-limiter.js';
+import { AdaptiveRateController, retryAfterMs } from '../src/rate-controller.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+const WINDOW_MS = 2_000;
+const WINDOWS = 20;
+
+// Mirrors FP_RATE_LIMIT / FP_RATE_LIMIT_MAX at 1/10 scale (380 / 400)
+const START_LIMIT = 38;
+const CEILING = 40;
+
+// Requests kept in flight, like a busy server with many tool calls
+const WORKERS = 24;
+
+// Simulated round trip: 60–140ms against the real 60s window, scaled with
+// the window so requests racing its edge are as rare as they are live
+const LATENCY_SCALE = WINDOW_MS / 60_000;
+const MIN_LATENCY_MS = 60 * LATENCY_SCALE;
+const MAX_LATENCY_MS = 140 * LATENCY_SCALE;
+
+interface Scenario {
+  name: string;
+  trueLimit: number;      // what the mock server allows per window
+  ceiling: number;        // FP_RATE_LIMIT_MAX
+  foreign?: number;       // another client's requests per window
+  headers?: boolean;      // mock sends X-RateLimit-* headers
+}
+
+const SCENARIOS: Scenario[] = [
+  { name: 'headroom (real limit 2x start)', trueLimit: 2 * START_LIMIT, ceiling: 2 * CEILING },
+  { name: 'sole client', trueLimit: CEILING, ceiling: CEILING },
+  { name: 'shared token (15/window foreign)', trueLimit: CEILING, ceiling: CEILING, foreign: 15 },
+  { name: 'headroom + rate-limit headers', trueLimit: 2 * START_LIMIT, ceiling: 2 * CEILING, headers: true },
+];
+
+// ============================================================================
+// MOCK SERVER
+// ============================================================================
+
+/**
+ * FirstPromoter's limit as seen from outside: a sliding window of accepted
+ * requests per token, shared with any foreign traffic.
+ */
+class MockServer {
+  private readonly hits: number[] = [];
+  ok = 0;
+  throttled = 0;
+
+  constructor(private readonly scenario: Scenario, stop: Promise<void>) {
+    if (scenario.foreign) {
+      const timer = setInterval(() => this.hits.push(Date.now()), WINDOW_MS / scenario.foreign);
+      void stop.then(() => clearInterval(timer));
+    }
+  }
+
+  async request(): Promise<{ status: number; headers: Headers }> {
+    await sleep(MIN_LATENCY_MS + Math.random() * (MAX_LATENCY_MS - MIN_LATENCY_MS));
+    const now = Date.now();
+    while (this.hits.length > 0 && this.hits[0] <= now - WINDOW_MS) this.hits.shift();
+
+    const headers = new Headers();
+    const used = this.hits.length;
+    const limit = this.scenario.trueLimit;
+    if (used >= limit) {
+      this.throttled++;
+      const resetSeconds = Math.max(1, Math.ceil((this.hits[0] + WINDOW_MS - now) / 1000));
+      headers.set('Retry-After', String(resetSeconds));
+      if (this.scenario.headers) {
+        headers.set('X-RateLimit-Limit', String(limit));
+        headers.set('X-RateLimit-Remaining', '0');
+        headers.set('X-RateLimit-Reset', String(resetSeconds));
+      }
+      return { status: 429, headers };
+    }
+
+    this.hits.push(now);
+    this.ok++;
+    if (this.scenario.headers) {
+      headers.set('X-RateLimit-Limit', String(limit));
+      headers.set('X-RateLimit-Remaining', String(limit - used - 1));
+    }
+    return { status: 200, headers };
+  }
+}
+
+// ============================================================================
+// SIMULATION
+// ============================================================================
+
+function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+interface RunResult {
+  okPerWindow: number;
+  lastHalfOkPerWindow: number;
+  throttled: number;
+  finalLimit: number;
+}
+
+/**
+ * Workers take a permit, send a request and feed the response to the
+ * controller; a 429 waits for Retry-After, as api.ts does before retrying.
+ */
+async function simulate(scenario: Scenario, adaptive: boolean): Promise<RunResult> {
+  let stopRun!: () => void;
+  const stop = new Promise<void>((resolve) => { stopRun = resolve; });
+  const server = new MockServer(scenario, stop);
+  const limiter = new RateLimiter(START_LIMIT, WINDOW_MS, scenario.ceiling);
+  const controller = new AdaptiveRateController(limiter, { ceiling: scenario.ceiling, windowMs: WINDOW_MS, adaptive });
+
+  const started = Date.now();
+  const end = started + WINDOWS * WINDOW_MS;
+  const okByWindow = new Array<number>(WINDOWS).fill(0);
+
+  const worker = async () => {
+    while (Date.now() < end) {
+      await limiter.acquire();
+      const sentAt = Date.now();
+      const { status, headers } = await server.request();
+      controller.onResponse(status, headers, sentAt);
+      if (status === 429) {
+        await sleep(retryAfterMs(headers) ?? WINDOW_MS);
+      } else if (Date.now() < end) {
+        okByWindow[Math.floor((Date.now() - started) / WINDOW_MS)]++;
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: WORKERS }, worker));
+  stopRun();
+
+  const lastHalf = okByWindow.slice(WINDOWS / 2);
+  return {
+    okPerWindow: okByWindow.reduce((a, b) => a + b, 0) / WINDOWS,
+    lastHalfOkPerWindow: lastHalf.reduce((a, b) => a + b, 0) / lastHalf.length,
+    throttled: server.throttled,
+    finalLimit: limiter.currentLimit(),
+  };
+}
+
+const results = await Promise.all(SCENARIOS.flatMap((scenario) => [
+  simulate(scenario, false),
+  simulate(scenario, true),
+]));
+
+console.log(`window ${WINDOW_MS}ms x ${WINDOWS}, start limit ${START_LIMIT}, ${WORKERS} workers\n`);
+SCENARIOS.forEach((scenario, i) => {
+  const [fixed, adaptive] = [results[2 * i], results[2 * i + 1]];
+  const gain = fixed.okPerWindow > 0 ? (adaptive.okPerWindow / fixed.okPerWindow - 1) * 100 : 0;
+  console.log(`${scenario.name} — server allows ${scenario.trueLimit}/window`);
+  for (const [label, r] of [['static', fixed], ['adaptive', adaptive]] as const) {
+    console.log(
+      `  ${label.padEnd(8)} ok/window ${r.okPerWindow.toFixed(1).padStart(5)} ` +
+      `(last half ${r.lastHalfOkPerWindow.toFixed(1).padStart(5)}), ` +
+      `429s ${String(r.throttled).padStart(4)}, final limit ${r.finalLimit}`
+    );
+  }
+  console.log(`  throughput ${gain >= 0 ? '+' : ''}${gain.toFixed(0)}%\n`);
+});
@@ -7,12 +7,33 @@
  *
  * Includes:
  * - Error parsing with actionable messages per status code
- * - Sliding-window rate limiter (stays under 400 req/min)
+ * - Sliding-window rate limiter (stays under 400 req/min) with priority
+ *   classes: interactive calls go ahead of bulk and background work
+ * - Adaptive limit (AIMD) from 429 / 5xx responses and rate-limit headers
+ *   (see rate-controller.ts)
  * - Automatic retry with exponential backoff on 429 / 5xx
  * - Request/response logging to stderr
+ * - Keep-alive connection pool shared by every tool (see http.ts)
+ * - Coalescing of identical in-flight GET requests (singleflight)
+ * - TTL + LRU response cache with invalidation on mutations (see cache.ts)
+ * - Optional persistent SQLite cache tier (see disk-cache.ts)
+ * - Cancellation: the calling tool's abort signal (see request-context.ts)
+ *   ends limiter waits, retry backoff and in-flight GETs
+ * - Per-family circuit breakers that fail fast during outages, with an
+ *   optional stale-cache fallback for GETs (see circuit-breaker.ts)
  */
 
 import { logger } from './logger.js';
+import { httpRequest, HttpRequestError } from './http.js';
+import { RateLimiter, type RateLimiterStats, type RequestPriority } from './rate-limiter.js';
+import { AdaptiveRateController, retryAfterMs, type RateControllerStats } from './rate-controller.js';
+import { responseCache, resourceFamily, cacheTtlFor, affectedFamilies, type CacheStats } from './cache.js';
+import { diskCache, type DiskCacheStats } from './disk-cache.js';
+import { reportCache } from './report-cache.js';
+import { circuitBreakers, CircuitOpenError, type CircuitBreakerStats } from './circuit-breaker.js';
+import {
+  currentSignal, currentPriority, currentTool, abortError, abortableSleep, throwIfAborted, noteStaleData,
+} from './request-context.js';
 
 // ============================================================================
 // CONFIGURATION
@@ -45,6 +66,26 @@ export class FirstPromoterAPIError extends Error {
   }
 }
 
+/**
+ * The API could not be reached at all (DNS, timeout, connection refused).
+ */
+export class NetworkError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = 'NetworkError';
+  }
+}
+
+/**
+ * True for failures that mean FirstPromoter is down rather than that the
+ * request was wrong: open breaker, network error or 5xx.
+ */
+function isOutage(error: unknown): boolean {
+  return error instanceof CircuitOpenError
+    || error instanceof NetworkError
+    || (error instanceof FirstPromoterAPIError && error.statusCode >= 500);
+}
+
 /**
  * Parse the API error body to extract a human-readable detail string.
  * FirstPromoter may return JSON with "error", "message", or "errors" fields,
@@ -91,33 +132,37 @@ function buildErrorMessage(status: number, raw: string): string {
 }
 
 // ============================================================================
-// RATE LIMITER — sliding window, 400 req/min with 380 safe buffer
+// RATE LIMITER — sliding window, 400 req/min; starts at 380 and adapts
 // ============================================================================
 
-const RATE_WINDOW_MS = 60_000;  // 60 seconds
-const RATE_LIMIT = 380;         // safe buffer below 400/min
-const requestTimestamps: number[] = [];
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
 
-/**
- * Wait if we're approaching the rate limit.
- * Cleans old timestamps, then delays if at the limit.
- */
-async function waitForRateLimit(): Promise<void> {
-  const now = Date.now();
+const RATE_WINDOW_MS = envInt('FP_RATE_WINDOW_MS', 60_000);  // 60 seconds
+const RATE_LIMIT_MAX = envInt('FP_RATE_LIMIT_MAX', 400);     // FirstPromoter's documented limit
+const RATE_LIMIT = Math.min(envInt('FP_RATE_LIMIT', 380), RATE_LIMIT_MAX); // safe starting point
+const RATE_ADAPTIVE = !['0', 'false', 'no'].includes((process.env.FP_RATE_ADAPTIVE || '').toLowerCase());
 
-  // Remove timestamps older than the window
-  while (requestTimestamps.length > 0 && requestTimestamps[0] < now - RATE_WINDOW_MS) {
-    requestTimestamps.shift();
-  }
+// One limiter shared by every tool — permits are handed out by priority
+// class and fairly across tools, so concurrent tool calls can never exceed
+// the budget (see rate-limiter.ts)
+const rateLimiter = new RateLimiter(RATE_LIMIT, RATE_WINDOW_MS, RATE_LIMIT_MAX);
 
-  if (requestTimestamps.length >= RATE_LIMIT) {
-    // Calculate how long until the oldest request exits the window
-    const waitMs = requestTimestamps[0] + RATE_WINDOW_MS - now + 50; // +50ms buffer
-    logger.warn(`Rate limiter: pausing ${waitMs}ms`, { queued: requestTimestamps.length });
-    await sleep(waitMs);
-  }
+// Moves the limit between a floor and RATE_LIMIT_MAX from response feedback
+const rateController = new AdaptiveRateController(rateLimiter, {
+  ceiling: RATE_LIMIT_MAX,
+  windowMs: RATE_WINDOW_MS,
+  adaptive: RATE_ADAPTIVE,
+});
 
-  requestTimestamps.push(Date.now());
+/**
+ * How many requests of the given class could be sent right now without
+ * waiting for the limiter.
+ */
+export function getRateLimitHeadroom(priority: RequestPriority = 'interactive'): number {
+  return rateLimiter.available(priority);
 }
 
 // ============================================================================
@@ -127,20 +172,14 @@ async function waitForRateLimit(): Promise<void> {
 const MAX_RETRIES = 3;
 const BASE_DELAY_MS = 1000; // 1s, 2s, 4s
 
-function sleep(ms: number): Promise<void> {
-  return new Promise((resolve) => setTimeout(resolve, ms));
-}
-
 /**
  * Calculate how long to wait before retrying.
- * Uses Retry-After header if present, otherwise exponential backoff.
+ * Uses Retry-After (or a rate-limit reset header) if present, otherwise
+ * exponential backoff.
  */
 function getRetryDelay(attempt: number, response: Response): number {
-  const retryAfter = response.headers.get('Retry-After');
-  if (retryAfter) {
-    const seconds = parseInt(retryAfter, 10);
-    if (!isNaN(seconds)) return seconds * 1000;
-  }
+  const serverDelay = retryAfterMs(response.headers);
+  if (serverDelay !== undefined) return serverDelay;
   // Exponential backoff: 1s, 2s, 4s
   return BASE_DELAY_MS * Math.pow(2, attempt);
 }
@@ -149,25 +188,85 @@ function isRetryable(status: number): boolean {
   return status === 429 || (status >= 500 && status <= 504);
 }
 
+// ============================================================================
+// REQUEST COALESCING — identical in-flight GETs share one upstream call
+// ============================================================================
+
+/**
+ * One upstream GET and the callers waiting for it. The request is only
+ * cancelled once every caller that joined has been cancelled.
+ */
+interface InFlightRequest {
+  promise: Promise<unknown>;
+  controller: AbortController;
+  waiting: number;
+}
+
+// Key: "GET /endpoint?canonical-query" → the upstream call
+const inFlightRequests = new Map<string, InFlightRequest>();
+let upstreamGets = 0;   // GETs that actually went to the network
+let coalescedGets = 0;  // GETs that joined an existing in-flight call
+
+/**
+ * Wait for a shared upstream GET on behalf of one caller. A caller without
+ * a signal (e.g. a background sync) keeps the request alive for good.
+ */
+function joinInFlight(flight: InFlightRequest, signal: AbortSignal | undefined): Promise<unknown> {
+  throwIfAborted(signal);
+  flight.waiting++;
+  if (!signal) return flight.promise;
+
+  return new Promise((resolve, reject) => {
+    const onAbort = () => {
+      if (--flight.waiting === 0) flight.controller.abort();
+      reject(abortError());
+    };
+    signal.addEventListener('abort', onAbort, { once: true });
+    flight.promise
+      .then(resolve, reject)
+      .finally(() => signal.removeEventListener('abort', onAbort));
+  });
+}
+
+/**
+ * Canonicalize query parameters so that the same query written in a
+ * different order ({a, b} vs {b, a}) maps to the same key.
+ * URLSearchParams.sort() is stable, so repeated keys (columns[]) keep order.
+ */
+function canonicalQuery(queryParams?: Record<string, string> | URLSearchParams): string {
+  if (!queryParams) return '';
+  const params = new URLSearchParams(queryParams);
+  params.sort();
+  return params.toString();
+}
+
 // ============================================================================
 // API HELPER
 // ============================================================================
 
+export type HttpMethod = 'GET' | 'POST' | 'PUT' | 'DELETE';
+
 /**
  * Makes a request to the FirstPromoter API
  *
  * This is like a waiter going to the kitchen (FirstPromoter) to get food (data).
+ * If another waiter is already fetching the exact same GET order, we simply
+ * wait for theirs instead of making a second trip.
  *
  * @param endpoint - The specific API endpoint (e.g., "/promoters")
- * @param options - Additional options for the request
+ * @param options - Additional options for the request. cache: false skips
+ *                  both cache tiers for a GET (no lookup, no store), for
+ *                  bulk reads like mirror syncs that would only evict
+ *                  interactive entries
  * @returns The data from FirstPromoter
  */
 export async function callFirstPromoterAPI(
   endpoint: string,
   options: {
-    method?: 'GET' | 'POST' | 'PUT' | 'DELETE';
+    method?: HttpMethod;
     body?: Record<string, unknown>;
     queryParams?: Record<string, string> | URLSearchParams;
+    cache?: boolean;
   } = {}
 ): Promise<unknown> {
   // Check if credentials are configured
@@ -188,19 +287,145 @@ export async function callFirstPromoterAPI(
   }
 
   const method = options.method || 'GET';
+  const family = resourceFamily(endpoint);
+  const signal = currentSignal();
+  throwIfAborted(signal);
+
+  // Limiter class of this call; the tool name keeps tools fair to each other
+  const priority = currentPriority();
+  const lane = { priority, flow: currentTool() ?? priority };
+
+  // Mutations always reach the server, then drop cached reads they may affect.
+  // Cancelling stops a mutation before it is sent, never halfway through.
+  if (method !== 'GET') {
+    return executeRequest(url, endpoint, method, options.body, lane, signal)
+      .then((result) => result.data)
+      .finally(() => {
+        responseCache.invalidate(family);
+        diskCache.invalidate(affectedFamilies(family));
+        reportCache.invalidate(affectedFamilies(family));
+      });
+  }
+
+  const query = canonicalQuery(options.queryParams);
+  const key = `${method} ${endpoint}?${query}`;
+
+  // Serve from the response cache when a fresh copy exists. The tiers are
+  // checked independently, so FP_CACHE_DB also works with the memory tier off.
+  const ttlMs = options.cache === false ? 0 : cacheTtlFor(endpoint, new URLSearchParams(query));
+  if (ttlMs > 0 && responseCache.enabled) {
+    const cached = responseCache.get(key, family);
+    if (cached !== undefined) {
+      logger.debug(`API cache hit: ${method} ${endpoint}`);
+      return cached;
+    }
+  }
+
+  // Fall back to the persistent tier and promote hits into memory
+  if (ttlMs > 0 && diskCache.enabled) {
+    const stored = diskCache.get(key);
+    if (stored) {
+      logger.debug(`API disk cache hit: ${method} ${endpoint}`);
+      responseCache.set(key, stored.value, stored.bytes, family, stored.ttlMs);
+      return stored.value;
+    }
+  }
+
+  // Join an identical request that is already on its way
+  const existing = inFlightRequests.get(key);
+  if (existing) {
+    coalescedGets++;
+    logger.debug(`API request coalesced: ${method} ${endpoint}`);
+    return withStaleFallback(joinInFlight(existing, signal), key, endpoint);
+  }
+
+  // Remember the family generation so a response that raced with a
+  // mutation is not written back into the cache
+  const generation = responseCache.generation(family);
+  const controller = new AbortController();
+  const request = executeRequest(url, endpoint, method, options.body, lane, controller.signal)
+    .then(({ data, text, bytes }) => {
+      if (ttlMs > 0 && responseCache.generation(family) === generation) {
+        responseCache.set(key, data, bytes, family, ttlMs);
+        diskCache.set(key, family, text, bytes, ttlMs);
+      }
+      return data;
+    })
+    .finally(() => inFlightRequests.delete(key));
+  const flight: InFlightRequest = { promise: request, controller, waiting: 0 };
+  inFlightRequests.set(key, flight);
+  upstreamGets++;
+  return withStaleFallback(joinInFlight(flight, signal), key, endpoint);
+}
+
+/**
+ * While the API is down, answer a GET from an expired cache entry if one
+ * is still kept (FP_CACHE_STALE_MS). The tool call is told (noteStaleData),
+ * so buildToolResponse flags every response shape; responses with a meta
+ * object also carry { source, age_seconds }, like the promoter mirror's.
+ */
+function withStaleFallback(request: Promise<unknown>, key: string, endpoint: string): Promise<unknown> {
+  return request.catch((error) => {
+    const stale = isOutage(error) ? responseCache.getStale(key) : undefined;
+    if (!stale) throw error;
+
+    logger.warn(`API unavailable — serving stale cache: GET ${endpoint}`, { ageMs: stale.ageMs });
+    noteStaleData(stale.ageMs);
+    const record = stale.value as Record<string, unknown> | null;
+    if (!record || Array.isArray(record) || typeof record.meta !== 'object' || record.meta === null) {
+      return stale.value;
+    }
+    return {
+      ...record,
+      meta: { ...record.meta, source: 'stale_cache', age_seconds: Math.round(stale.ageMs / 1000) },
+    };
+  });
+}
+
+/**
+ * Sends one logical request, retrying on network errors, 429 and 5xx.
+ * Mutations are only retried after a network error when the request never
+ * reached the server (see HttpRequestError.maybeSent).
+ * Each attempt takes its own rate-limit permit, queued in the lane's
+ * priority class, and must pass the family's circuit breaker — once the
+ * breaker opens, the call stops retrying and fails fast.
+ *
+ * The signal ends the limiter wait and the retry backoff. It only aborts
+ * the HTTP request itself for GETs — a mutation already on the wire is
+ * left to finish, since the server may have applied it.
+ *
+ * @returns The parsed JSON body, the raw text and its size in bytes (for the caches)
+ */
+async function executeRequest(
+  url: string,
+  endpoint: string,
+  method: HttpMethod,
+  body: Record<string, unknown> | undefined,
+  lane: { priority: RequestPriority; flow: string },
+  signal?: AbortSignal,
+): Promise<{ data: unknown; text: string; bytes: number }> {
+  const family = resourceFamily(endpoint);
 
   // Retry loop
   for (let attempt = 0; attempt <= MAX_RETRIES; attempt++) {
-    // Wait if we're near the rate limit
-    await waitForRateLimit();
+    // Fail fast while FirstPromoter is known to be down
+    circuitBreakers.admit(family);
+
+    // Wait for a permit if we're at the rate limit
+    try {
+      await rateLimiter.acquire({ signal, ...lane });
+    } catch (error) {
+      circuitBreakers.release(family);
+      throw error;
+    }
 
     const startMs = Date.now();
     logger.debug(`API request: ${method} ${endpoint}`);
 
     let response: Response;
     try {
-      // Make the actual HTTP request to FirstPromoter
-      response = await fetch(url, {
+      // Make the actual HTTP request to FirstPromoter (over a pooled keep-alive socket)
+      response = await httpRequest(url, {
         method,
         headers: {
           // Authorization: Like showing your ID card
@@ -211,30 +436,61 @@ export async function callFirstPromoterAPI(
           'Content-Type': 'application/json',
         },
         // body: The actual data we're sending (if any)
-        body: options.body ? JSON.stringify(options.body) : undefined,
+        body: body ? JSON.stringify(body) : undefined,
+        signal: method === 'GET' ? signal : undefined,
       });
     } catch (err) {
+      // Cancelled by the client — nobody is waiting for a retry
+      if (signal?.aborted) {
+        circuitBreakers.release(family);
+        throw abortError();
+      }
+
       // Network-level error (DNS, timeout, connection refused)
       const durationMs = Date.now() - startMs;
       const errMsg = err instanceof Error ? err.message : String(err);
       logger.error(`API network error: ${method} ${endpoint}`, { durationMs, error: errMsg });
+      circuitBreakers.recordFailure(family, errMsg);
+
+      // A mutation that may have reached the server (timeout, reset
+      // mid-request) is never replayed: it could be applied twice
+      const mayHaveApplied = method !== 'GET' && !(err instanceof HttpRequestError && !err.maybeSent);
+      if (mayHaveApplied) {
+        throw new NetworkError(
+          `Network error calling FirstPromoter API: ${errMsg}. The ${method} request may have been ` +
+          'applied — check the current state before trying again'
+        );
+      }
 
       if (attempt < MAX_RETRIES) {
+        circuitBreakers.ensureClosed(family);
         const delay = BASE_DELAY_MS * Math.pow(2, attempt);
         logger.warn(`Retrying (${attempt + 1}/${MAX_RETRIES}) in ${delay}ms...`);
-        await sleep(delay);
+        await abortableSleep(delay, signal);
         continue;
       }
-      throw new Error(`Network error calling FirstPromoter API: ${errMsg}`);
+      throw new NetworkError(`Network error calling FirstPromoter API: ${errMsg}`);
     }
 
     const durationMs = Date.now() - startMs;
 
+    // Let the adaptive controller see every status and rate-limit header
+    rateController.onResponse(response.status, response.headers, startMs);
+
+    // Any answer below 500 means the server is up
+    if (response.status >= 500) {
+      circuitBreakers.recordFailure(family, `HTTP ${response.status}`);
+    } else {
+      circuitBreakers.recordSuccess(family);
+    }
+
     // Check if the request was successful
     if (response.ok) {
       logger.debug(`API response: ${response.status} ${method} ${endpoint}`, { durationMs });
       // Parse the JSON response and return it
-      return response.json();
+      // (JSON.parse throws on an empty body, just like response.json())
+      const text = await response.text();
+      return { data: JSON.parse(text), text, bytes: Buffer.byteLength(text) };
     }
 
     // Error path — read the body once
@@ -242,12 +498,13 @@ export async function callFirstPromoterAPI(
 
     // Retry on 429 or 5xx (if we have attempts left)
     if (isRetryable(response.status) && attempt < MAX_RETRIES) {
+      circuitBreakers.ensureClosed(family);
       const delay = getRetryDelay(attempt, response);
       logger.warn(
         `API error ${response.status} on ${method} ${endpoint} — retrying (${attempt + 1}/${MAX_RETRIES}) in ${delay}ms`,
         { durationMs },
       );
-      await sleep(delay);
+      await abortableSleep(delay, signal);
       continue;
     }
 
@@ -260,3 +517,42 @@ export async function callFirstPromoterAPI(
   // This should never be reached, but TypeScript needs it
   throw new Error('Unexpected: retry loop exited without returning or throwing');
 }
+
+// ============================================================================
+// STATS
+// ============================================================================
+
+export interface ApiStats {
+  rate_limiter: RateLimiterStats;
+  rate_control: RateControllerStats;
+  circuit_breakers: CircuitBreakerStats;
+  cache: CacheStats;
+  disk_cache: DiskCacheStats;
+  coalescing: {
+    inFlight: number;
+    upstreamGets: number;
+    coalescedGets: number;   // upstream calls saved
+    savedRatio: number;
+  };
+}
+
+/**
+ * Returns a snapshot of the API layer's internal counters (for diagnostics).
+ */
+export function getApiStats(): ApiStats {
+  return {
+    rate_limiter: rateLimiter.stats(),
+    rate_control: rateController.stats(),
+    circuit_breakers: circuitBreakers.stats(),
+    cache: responseCache.stats(),
+    disk_cache: diskCache.stats(),
+    coalescing: {
+      inFlight: inFlightRequests.size,
+      upstreamGets,
+      coalescedGets,
+      savedRatio: upstreamGets + coalescedGets > 0
+        ? coalescedGets / (upstreamGets + coalescedGets)
+        : 0,
+    },
+  };
+}
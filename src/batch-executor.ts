@@ -0,0 +1,191 @@
+/**
+ * Batch Executor
+ *
+ * FirstPromoter's batch endpoints (accept/reject/block promoters, approve
+ * commissions, delete referrals, ...) take one `ids` array per request.
+ * This file splits a long list into evenly sized chunks, sends them
+ * concurrently within the rate budget, and merges the batch processes the
+ * API creates into one outcome — like splitting a big delivery across
+ * several vans and handing back a single receipt.
+ *
+ * Includes:
+ * - executeBatch() — one request for short lists, chunked for long ones
+ * - Aggregated counts plus every batch process ID (for get_batch_process
+ *   and get_batch_progress)
+ * - Failed chunks reported with their IDs, so only those need a retry
+ *
+ * Every chunk goes through callFirstPromoterAPI, so the shared rate
+ * limiter, retries and cache invalidation apply.
+ */
+
+import { callFirstPromoterAPI } from './api.js';
+import type { HttpMethod } from './api.js';
+import { mapConcurrent, bulkConcurrency } from './paginator.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// Most IDs sent in one batch request. Above 5 IDs the API processes a batch
+// asynchronously anyway, so larger chunks only mean fewer requests.
+const BATCH_CHUNK_SIZE = (() => {
+  const value = parseInt(process.env.FP_BATCH_CHUNK_SIZE || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : 100;
+})();
+
+/**
+ * Shared description text for the batch tools' ids parameter behaviour.
+ */
+export const BATCH_CHUNKING_NOTE =
+  `CHUNKING: Lists longer than ${BATCH_CHUNK_SIZE} ids are split into evenly sized chunks that are sent ` +
+  "concurrently; the response is then one aggregated object instead of the RESPONSE STRUCTURE described " +
+  "next: { status (completed/in_progress/partially_failed/failed), total, processed_count, failed_count, " +
+  "batch_ids[], batches[]: { id, ids_count, status, total, processed_count, failed_count, progress, " +
+  "processing_errors[] }, failed_chunks[]: { ids[], error } } — ids of failed chunks are included in total " +
+  "and failed_count. " +
+  "Pass batch_ids to wait_for_batch_processes to wait for asynchronous batches to finish. ";
+
+// ============================================================================
+// CHUNKING
+// ============================================================================
+
+/**
+ * Split ids into the fewest chunks of at most `size`, all of nearly equal
+ * length (250 ids → 84 + 83 + 83 rather than 100 + 100 + 50), so the
+ * batches finish at about the same time.
+ */
+export function chunkIds(ids: readonly number[], size = BATCH_CHUNK_SIZE): number[][] {
+  const count = Math.ceil(ids.length / size);
+  const chunks: number[][] = [];
+  let start = 0;
+  for (let i = 0; i < count; i++) {
+    const length = Math.ceil((ids.length - start) / (count - i));
+    chunks.push(ids.slice(start, start + length));
+    start += length;
+  }
+  return chunks;
+}
+
+// ============================================================================
+// EXECUTOR
+// ============================================================================
+
+export interface BatchExecution {
+  status: 'completed' | 'in_progress' | 'partially_failed' | 'failed';
+  total: number;
+  processed_count: number;
+  failed_count: number;
+  batch_ids: number[];
+  batches: Record<string, unknown>[];
+  failed_chunks: { ids: number[]; error: string }[];
+}
+
+export interface BatchExecutorStats {
+  executions: number;
+  chunkedExecutions: number;
+  chunksSent: number;
+  chunksFailed: number;
+  chunkSize: number;
+}
+
+let executions = 0;
+let chunkedExecutions = 0;
+let chunksSent = 0;
+let chunksFailed = 0;
+
+/**
+ * Send a batch mutation.
+ *
+ * @param endpoint - Batch endpoint, e.g. '/promoters/accept'
+ * @param options.body - Request body without the ids (e.g. { campaign_id })
+ * @param options.ids - IDs to act on; omitted means the endpoint's default
+ * @returns The API's batch object when one request was enough, otherwise
+ *          a BatchExecution aggregating every chunk
+ */
+export async function executeBatch(
+  endpoint: string,
+  options: { method: HttpMethod; body?: Record<string, unknown>; ids?: number[] },
+): Promise<unknown> {
+  executions++;
+  const { method, body = {}, ids } = options;
+
+  if (!ids || ids.length <= BATCH_CHUNK_SIZE) {
+    chunksSent++;
+    return callFirstPromoterAPI(endpoint, { method, body: ids ? { ...body, ids } : body });
+  }
+
+  chunkedExecutions++;
+  const chunks = chunkIds(ids);
+  chunksSent += chunks.length;
+
+  const settled = await mapConcurrent(chunks, bulkConcurrency(), (chunk) =>
+    callFirstPromoterAPI(endpoint, { method, body: { ...body, ids: chunk } })
+  );
+
+  const execution: BatchExecution = {
+    status: 'completed',
+    total: 0,
+    processed_count: 0,
+    failed_count: 0,
+    batch_ids: [],
+    batches: [],
+    failed_chunks: [],
+  };
+
+  settled.forEach((outcome, i) => {
+    if (outcome.status === 'rejected') {
+      // Count these IDs as failed so total = processed + failed once done
+      chunksFailed++;
+      execution.total += chunks[i].length;
+      execution.failed_count += chunks[i].length;
+      execution.failed_chunks.push({
+        ids: chunks[i],
+        error: outcome.reason instanceof Error ? outcome.reason.message : String(outcome.reason),
+      });
+      return;
+    }
+
+    const batch = (outcome.value ?? {}) as Record<string, unknown>;
+    execution.total += numberOr(batch.total, chunks[i].length);
+    execution.processed_count += numberOr(batch.processed_count, 0);
+    execution.failed_count += numberOr(batch.failed_count, 0);
+    if (typeof batch.id === 'number') execution.batch_ids.push(batch.id);
+    execution.batches.push({
+      id: batch.id,
+      ids_count: chunks[i].length,
+      status: batch.status,
+      total: batch.total,
+      processed_count: batch.processed_count,
+      failed_count: batch.failed_count,
+      progress: batch.progress,
+      processing_errors: batch.processing_errors,
+    });
+  });
+
+  // Nothing got through: surface it as a normal tool error
+  if (execution.batches.length === 0) {
+    throw new Error(`All ${chunks.length} batch requests failed: ${execution.failed_chunks[0].error}`);
+  }
+
+  execution.status = aggregateStatus(execution);
+  return execution;
+}
+
+/**
+ * Overall status: failed if every batch failed, partially_failed if some
+ * request or batch failed, completed once every batch is, else in_progress.
+ */
+function aggregateStatus(execution: BatchExecution): BatchExecution['status'] {
+  const failedBatches = execution.batches.filter((batch) => batch.status === 'failed').length;
+  if (failedBatches === execution.batches.length && execution.failed_chunks.length === 0) return 'failed';
+  if (failedBatches > 0 || execution.failed_chunks.length > 0) return 'partially_failed';
+  return execution.batches.every((batch) => batch.status === 'completed') ? 'completed' : 'in_progress';
+}
+
+function numberOr(value: unknown, fallback: number): number {
+  return typeof value === 'number' ? value : fallback;
+}
+
+export function getBatchExecutorStats(): BatchExecutorStats {
+  return { executions, chunkedExecutions, chunksSent, chunksFailed, chunkSize: BATCH_CHUNK_SIZE };
+}
@@ -0,0 +1,298 @@
+/**
+ * Batch Process Waiter
+ *
+ * Waits for asynchronous batch processes to finish, so the model does not
+ * have to call get_batch_progress again and again. Like a kitchen timer
+ * that checks the oven more often as the roast gets close to done: when
+ * progress is fast we look again soon, when nothing moves we wait longer.
+ *
+ * Includes:
+ * - One GET /batch_processes/progress per tick for every tracked batch
+ * - Poll interval from the observed progress rate (half the estimated time
+ *   left), backing off while nothing moves
+ * - A detail check (GET /batch_processes/{id}) for a batch whose progress
+ *   stalls, to spot failed or stopped batches that never reach 100%
+ * - A progress callback for MCP progress notifications
+ * - A final detail fetch (status and counts) of the batches no detail check
+ *   has already seen finish, cut off at the deadline; anything left over is
+ *   reported with its last known progress
+ *
+ * Batch endpoints are never cached (see cache.ts), so every poll is live.
+ */
+
+import { callFirstPromoterAPI } from './api.js';
+import { mapConcurrent, bulkConcurrency } from './paginator.js';
+import { withPriority, withSignal } from './request-context.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+const MIN_POLL_INTERVAL_MS = 1_000;
+const MAX_POLL_INTERVAL_MS = 15_000;
+
+// Interval growth per tick while no tracked batch makes progress
+const IDLE_BACKOFF = 1.5;
+
+// Ticks without progress before a batch's details are checked
+const STALL_TICKS = 3;
+
+// Consecutive failed polls before giving up (the API layer already retries)
+const MAX_FAILED_POLLS = 3;
+
+// Statuses after which a batch will not change any more
+const FINAL_STATUSES = new Set(['completed', 'failed', 'stopped']);
+
+// ============================================================================
+// WAITER
+// ============================================================================
+
+export interface BatchWaitProgress {
+  done: number;            // batches finished
+  total: number;           // batches tracked
+  percent: number;         // mean progress over all tracked batches (0-100)
+  elapsedMs: number;
+}
+
+export interface BatchWaitResult {
+  status: 'completed' | 'timed_out' | 'cancelled';
+  done: number;
+  pending: number[];
+  batches: Record<string, unknown>[];
+  meta: { polls: number; detail_checks: number; elapsed_ms: number };
+}
+
+export interface BatchWaiterStats {
+  waits: number;
+  polls: number;
+  detailChecks: number;
+  timedOut: number;
+}
+
+const stats: BatchWaiterStats = { waits: 0, polls: 0, detailChecks: 0, timedOut: 0 };
+
+interface TrackedBatch {
+  progress: number;
+  changedAt: number;       // when progress last moved
+  rate: number;            // percent per ms over the last move (0 = unknown)
+  stalledTicks: number;
+  status?: string;         // set once a detail check saw a final status
+  detail?: Record<string, unknown>;  // the detail response that showed it
+  error?: string;          // the final detail fetch failed
+}
+
+/**
+ * Poll until every batch is finished, the deadline passes, or the signal
+ * aborts.
+ *
+ * @param ids - Batch process IDs
+ * @param options.timeoutMs - How long to wait at most
+ * @param options.onProgress - Called after every tick that changed something
+ * @param options.signal - Stops waiting early (e.g. the client cancelled)
+ */
+export async function waitForBatches(
+  ids: number[],
+  options: {
+    timeoutMs: number;
+    onProgress?: (progress: BatchWaitProgress) => Promise<void> | void;
+    signal?: AbortSignal;
+  },
+): Promise<BatchWaitResult> {
+  stats.waits++;
+  const started = Date.now();
+  const deadline = started + options.timeoutMs;
+  const tracked = new Map<number, TrackedBatch>(
+    [...new Set(ids)].map((id) => [id, { progress: 0, changedAt: started, rate: 0, stalledTicks: 0 }])
+  );
+  let polls = 0;
+  let detailChecks = 0;
+  let interval = MIN_POLL_INTERVAL_MS;
+  let lastPercent = -1;
+  let failedPolls = 0;
+
+  const pending = () => [...tracked].filter(([, batch]) => !isDone(batch)).map(([id]) => id);
+
+  // One request per tick: the progress map, or the details of the batch
+  // that has been stuck the longest. Polls are bulk work: nobody is hurt
+  // if they wait behind an interactive call.
+  const tick = async (): Promise<void> => {
+    const stalled = mostStalled(tracked);
+    if (stalled !== undefined) {
+      detailChecks++;
+      stats.detailChecks++;
+      const batch = tracked.get(stalled)!;
+      batch.stalledTicks = 0;
+      const detail = await withPriority('bulk', () => callFirstPromoterAPI(`/batch_processes/${stalled}`)) as Record<string, unknown>;
+      if (typeof detail.progress === 'number') batch.progress = detail.progress;
+      if (typeof detail.status === 'string' && FINAL_STATUSES.has(detail.status)) {
+        batch.status = detail.status;
+        batch.detail = detail;
+      }
+      return;
+    }
+
+    polls++;
+    stats.polls++;
+    const progressMap = await withPriority('bulk', () => callFirstPromoterAPI('/batch_processes/progress')) as Record<string, unknown>;
+    for (const [id, batch] of tracked) {
+      if (isDone(batch)) continue;
+      const progress = progressMap?.[String(id)];
+      if (typeof progress === 'number' && progress > batch.progress) {
+        const now = Date.now();
+        batch.rate = (progress - batch.progress) / Math.max(1, now - batch.changedAt);
+        batch.progress = progress;
+        batch.changedAt = now;
+        batch.stalledTicks = 0;
+      } else {
+        batch.stalledTicks++;
+      }
+    }
+  };
+
+  while (pending().length > 0 && !options.signal?.aborted) {
+    try {
+      await tick();
+      failedPolls = 0;
+    } catch (error) {
+      if (++failedPolls >= MAX_FAILED_POLLS) throw error;
+    }
+
+    const percent = meanProgress(tracked);
+    if (options.onProgress && percent !== lastPercent) {
+      lastPercent = percent;
+      await options.onProgress({
+        done: tracked.size - pending().length,
+        total: tracked.size,
+        percent,
+        elapsedMs: Date.now() - started,
+      });
+    }
+
+    if (pending().length === 0) break;
+
+    interval = nextInterval(tracked, interval);
+
+    const remaining = deadline - Date.now();
+    if (remaining <= 0) break;
+    await sleep(Math.min(interval, remaining), options.signal);
+  }
+
+  // Final state (status, processed/failed counts) of the batches that
+  // finished on the progress map; batches a detail check already saw finish
+  // are not fetched again. Still-running batches keep their progress value,
+  // and the fetch is cut off at the deadline and when the caller goes away.
+  const idList = options.signal?.aborted
+    ? []
+    : [...tracked].filter(([, batch]) => isDone(batch) && !batch.detail).map(([id]) => id);
+  const remaining = deadline - Date.now();
+  const cutoff = new AbortController();
+  const timer = setTimeout(() => cutoff.abort(), Math.max(0, remaining));
+  const details = remaining <= 0 ? [] : await withSignal(cutoff.signal, () =>
+    mapConcurrent(idList, bulkConcurrency(), (id) => callFirstPromoterAPI(`/batch_processes/${id}`))
+  );
+  clearTimeout(timer);
+  details.forEach((outcome, i) => {
+    const batch = tracked.get(idList[i])!;
+    if (cutoff.signal.aborted && outcome.status === 'rejected') return;
+    detailChecks++;
+    stats.detailChecks++;
+    if (outcome.status === 'rejected') {
+      batch.error = outcome.reason instanceof Error ? outcome.reason.message : String(outcome.reason);
+      return;
+    }
+    const detail = outcome.value as Record<string, unknown>;
+    batch.detail = detail;
+    if (typeof detail.status === 'string' && FINAL_STATUSES.has(detail.status)) batch.status = detail.status;
+  });
+
+  const batches = [...tracked].map(([id, batch]) => {
+    const detail = batch.detail;
+    if (!detail) {
+      return batch.error !== undefined
+        ? { id, progress: batch.progress, error: batch.error }
+        : { id, progress: batch.progress };
+    }
+    return {
+      id,
+      status: detail.status,
+      progress: detail.progress ?? batch.progress,
+      total: detail.total,
+      processed_count: detail.processed_count,
+      failed_count: detail.failed_count,
+      action_label: detail.action_label,
+      processing_errors: detail.processing_errors,
+    };
+  });
+
+  const stillPending = pending();
+  const status = stillPending.length === 0
+    ? 'completed'
+    : options.signal?.aborted ? 'cancelled' : 'timed_out';
+  if (status === 'timed_out') stats.timedOut++;
+
+  return {
+    status,
+    done: tracked.size - stillPending.length,
+    pending: stillPending,
+    batches,
+    meta: { polls, detail_checks: detailChecks, elapsed_ms: Date.now() - started },
+  };
+}
+
+export function getBatchWaiterStats(): BatchWaiterStats {
+  return { ...stats };
+}
+
+// ============================================================================
+// HELPERS
+// ============================================================================
+
+function isDone(batch: TrackedBatch): boolean {
+  return batch.status !== undefined || batch.progress >= 100;
+}
+
+function meanProgress(tracked: Map<number, TrackedBatch>): number {
+  let sum = 0;
+  for (const batch of tracked.values()) sum += isDone(batch) ? 100 : batch.progress;
+  return Math.round(sum / tracked.size);
+}
+
+/**
+ * Half the estimated time until the next batch finishes, from each moving
+ * batch's last observed rate; a longer wait than last time if none moved.
+ */
+function nextInterval(tracked: Map<number, TrackedBatch>, previous: number): number {
+  let soonest = Infinity;
+  for (const batch of tracked.values()) {
+    if (isDone(batch) || batch.stalledTicks > 0 || batch.rate <= 0) continue;
+    soonest = Math.min(soonest, (100 - batch.progress) / batch.rate);
+  }
+  const interval = Number.isFinite(soonest) ? soonest / 2 : previous * IDLE_BACKOFF;
+  return Math.min(MAX_POLL_INTERVAL_MS, Math.max(MIN_POLL_INTERVAL_MS, interval));
+}
+
+/** The unfinished batch stuck for the most ticks, if any reached STALL_TICKS. */
+function mostStalled(tracked: Map<number, TrackedBatch>): number | undefined {
+  let worst: number | undefined;
+  let worstTicks = STALL_TICKS - 1;
+  for (const [id, batch] of tracked) {
+    if (!isDone(batch) && batch.stalledTicks > worstTicks) {
+      worst = id;
+      worstTicks = batch.stalledTicks;
+    }
+  }
+  return worst;
+}
+
+/** setTimeout as a promise that resolves early when the signal aborts. */
+function sleep(ms: number, signal?: AbortSignal): Promise<void> {
+  return new Promise((resolve) => {
+    const timer = setTimeout(done, ms);
+    function done() {
+      clearTimeout(timer);
+      signal?.removeEventListener('abort', done);
+      resolve();
+    }
+    signal?.addEventListener('abort', done, { once: true });
+  });
+}
@@ -0,0 +1,297 @@
+/**
+ * Response Cache
+ *
+ * A bounded in-memory cache for GET responses from the FirstPromoter API.
+ * Think of it as a fridge next to the kitchen: slow-changing dishes (campaign
+ * lists, payout stats, closed-period reports) are kept for a while so the
+ * next order does not need another trip to FirstPromoter.
+ *
+ * Includes:
+ * - Per-endpoint TTLs (see CACHE_TTL_RULES)
+ * - LRU eviction by total byte size (FP_CACHE_MAX_BYTES)
+ * - Invalidation by resource family when a mutating tool touches the same data
+ * - Hit/miss counters per family for tuning
+ * - Expired entries kept for FP_CACHE_STALE_MS as a fallback while the API
+ *   is down (see circuit-breaker.ts); never served while it is up
+ */
+
+import { logger } from './logger.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// Total budget for cached response bodies (default 32 MB). Set to 0 to disable.
+const CACHE_MAX_BYTES = (() => {
+  const value = parseInt(process.env.FP_CACHE_MAX_BYTES || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : 32 * 1024 * 1024;
+})();
+
+const SECOND = 1_000;
+const MINUTE = 60 * SECOND;
+
+// How long past their TTL entries may still be served during an outage
+// (default 30 minutes). Set to 0 to disable the stale fallback.
+const CACHE_STALE_MS = (() => {
+  const value = parseInt(process.env.FP_CACHE_STALE_MS || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : 30 * MINUTE;
+})();
+
+/**
+ * TTL rules, checked in order — the first matching prefix wins.
+ * A TTL of 0 means "never cache" (e.g. batch progress must always be live).
+ */
+const CACHE_TTL_RULES: { prefix: string; ttlMs: number }[] = [
+  { prefix: '/batch_processes', ttlMs: 0 },
+  { prefix: '/promoter_campaigns', ttlMs: 5 * MINUTE },
+  { prefix: '/payouts/stats', ttlMs: 5 * MINUTE },
+  { prefix: '/payouts/due_stats', ttlMs: 2 * MINUTE },
+  { prefix: '/payouts/group_by_promoters', ttlMs: 2 * MINUTE },
+  { prefix: '/reports/', ttlMs: 2 * MINUTE },   // open periods; closed ones use CLOSED_REPORT_TTL_MS
+  { prefix: '/promo_codes', ttlMs: 2 * MINUTE },
+  { prefix: '/', ttlMs: 30 * SECOND },          // promoters, referrals, commissions, payouts, ...
+];
+
+// Reports whose end_date is in the past no longer change
+const CLOSED_REPORT_TTL_MS = 60 * MINUTE;
+
+// An end_date counts as past one day after it ended in UTC, so accounts in
+// time zones behind UTC do not get their still-running day cached for an hour
+const REPORT_SETTLE_MS = 24 * 60 * MINUTE;
+
+/**
+ * Which cached families a mutation invalidates, keyed by the mutated family.
+ * E.g. moving referrals changes promoter stats, approving commissions changes
+ * payout totals and report revenue. Families not listed only invalidate
+ * themselves.
+ */
+const INVALIDATION_MAP: Record<string, string[]> = {
+  promoters: ['promoters', 'promoter_campaigns', 'promo_codes', 'reports'],
+  promoter_campaigns: ['promoter_campaigns', 'promoters', 'promo_codes'],
+  referrals: ['referrals', 'promoters', 'commissions', 'reports'],
+  commissions: ['commissions', 'payouts', 'promoters', 'reports'],
+  promo_codes: ['promo_codes', 'promoter_campaigns'],
+};
+
+// ============================================================================
+// KEY HELPERS
+// ============================================================================
+
+/**
+ * The resource family of an endpoint is its first path segment:
+ * "/promoters/123" → "promoters", "/reports/overview" → "reports".
+ */
+export function resourceFamily(endpoint: string): string {
+  return endpoint.split('/')[1] || '';
+}
+
+/**
+ * Families whose cached reads become stale after a mutation on `mutatedFamily`.
+ */
+export function affectedFamilies(mutatedFamily: string): string[] {
+  return INVALIDATION_MAP[mutatedFamily] ?? [mutatedFamily];
+}
+
+/**
+ * Pick the TTL for a GET response from its endpoint and query.
+ */
+export function cacheTtlFor(endpoint: string, query: URLSearchParams): number {
+  if (endpoint.startsWith('/reports/')) {
+    const endDate = query.get('end_date');
+    const settled = new Date(Date.now() - REPORT_SETTLE_MS).toISOString().slice(0, 10);
+    if (endDate && endDate.slice(0, 10) < settled) {
+      return CLOSED_REPORT_TTL_MS;
+    }
+  }
+
+  for (const rule of CACHE_TTL_RULES) {
+    if (endpoint.startsWith(rule.prefix)) return rule.ttlMs;
+  }
+  return 0;
+}
+
+// ============================================================================
+// CACHE
+// ============================================================================
+
+interface CacheEntry {
+  value: unknown;
+  bytes: number;
+  family: string;
+  storedAt: number;
+  expiresAt: number;
+}
+
+export interface CacheStats {
+  enabled: boolean;
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+  hits: number;
+  misses: number;
+  hitRatio: number;
+  evictions: number;
+  invalidations: number;
+  staleMs: number;
+  staleHits: number;     // expired entries served because the API was down
+  byFamily: Record<string, { hits: number; misses: number; hitRatio: number }>;
+}
+
+export class ResponseCache {
+  // Map iteration order is insertion order — re-inserting on access keeps
+  // the least recently used entry at the front.
+  private readonly entries = new Map<string, CacheEntry>();
+  private readonly generations = new Map<string, number>();
+  private readonly familyCounters = new Map<string, { hits: number; misses: number }>();
+  private totalBytes = 0;
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+  private invalidations = 0;
+  private staleHits = 0;
+
+  constructor(
+    private readonly maxBytes: number,
+    private readonly staleMs = 0,
+  ) {}
+
+  get enabled(): boolean {
+    return this.maxBytes > 0;
+  }
+
+  /**
+   * Look up a fresh entry. Expired entries are dropped on access once they
+   * are past the stale window too.
+   */
+  get(key: string, family: string): unknown | undefined {
+    const entry = this.entries.get(key);
+    const counters = this.countersFor(family);
+    const now = Date.now();
+
+    if (!entry || entry.expiresAt <= now) {
+      if (entry && entry.expiresAt + this.staleMs <= now) this.remove(key, entry);
+      this.misses++;
+      counters.misses++;
+      return undefined;
+    }
+
+    // Move to the most-recently-used end
+    this.entries.delete(key);
+    this.entries.set(key, entry);
+    this.hits++;
+    counters.hits++;
+    return entry.value;
+  }
+
+  /**
+   * Look up an entry that may have expired, for use while the API is
+   * unreachable. Entries dropped by a mutation are never returned.
+   *
+   * @returns The value and how old it is, or undefined
+   */
+  getStale(key: string): { value: unknown; ageMs: number } | undefined {
+    const entry = this.entries.get(key);
+    const now = Date.now();
+    if (!entry || entry.expiresAt + this.staleMs <= now) return undefined;
+    this.staleHits++;
+    return { value: entry.value, ageMs: now - entry.storedAt };
+  }
+
+  /**
+   * Store a response. Entries larger than a quarter of the budget are not
+   * cached, so one huge export cannot flush everything else.
+   */
+  set(key: string, value: unknown, bytes: number, family: string, ttlMs: number): void {
+    if (!this.enabled || ttlMs <= 0 || bytes > this.maxBytes / 4) return;
+
+    const existing = this.entries.get(key);
+    if (existing) this.remove(key, existing);
+
+    const now = Date.now();
+    this.entries.set(key, { value, bytes, family, storedAt: now, expiresAt: now + ttlMs });
+    this.totalBytes += bytes;
+
+    // Evict least recently used entries until we're back under budget
+    for (const [oldKey, oldEntry] of this.entries) {
+      if (this.totalBytes <= this.maxBytes) break;
+      this.remove(oldKey, oldEntry);
+      this.evictions++;
+    }
+  }
+
+  /**
+   * Current generation of a family. A GET remembers the generation when it
+   * starts; if a mutation bumped it meanwhile, the (possibly stale) response
+   * is not cached.
+   */
+  generation(family: string): number {
+    return this.generations.get(family) ?? 0;
+  }
+
+  /**
+   * Drop every entry affected by a mutation on the given family.
+   */
+  invalidate(mutatedFamily: string): void {
+    const families = new Set(affectedFamilies(mutatedFamily));
+
+    for (const family of families) {
+      this.generations.set(family, this.generation(family) + 1);
+    }
+
+    let dropped = 0;
+    for (const [key, entry] of this.entries) {
+      if (families.has(entry.family)) {
+        this.remove(key, entry);
+        dropped++;
+      }
+    }
+
+    if (dropped > 0) {
+      this.invalidations += dropped;
+      logger.debug(`Cache: invalidated ${dropped} entr(ies) after ${mutatedFamily} mutation`);
+    }
+  }
+
+  stats(): CacheStats {
+    const byFamily: CacheStats['byFamily'] = {};
+    for (const [family, c] of this.familyCounters) {
+      byFamily[family] = { ...c, hitRatio: ratio(c.hits, c.misses) };
+    }
+
+    return {
+      enabled: this.enabled,
+      entries: this.entries.size,
+      bytes: this.totalBytes,
+      maxBytes: this.maxBytes,
+      hits: this.hits,
+      misses: this.misses,
+      hitRatio: ratio(this.hits, this.misses),
+      evictions: this.evictions,
+      invalidations: this.invalidations,
+      staleMs: this.staleMs,
+      staleHits: this.staleHits,
+      byFamily,
+    };
+  }
+
+  private remove(key: string, entry: CacheEntry): void {
+    this.entries.delete(key);
+    this.totalBytes -= entry.bytes;
+  }
+
+  private countersFor(family: string): { hits: number; misses: number } {
+    let counters = this.familyCounters.get(family);
+    if (!counters) {
+      counters = { hits: 0, misses: 0 };
+      this.familyCounters.set(family, counters);
+    }
+    return counters;
+  }
+}
+
+function ratio(hits: number, misses: number): number {
+  return hits + misses > 0 ? hits / (hits + misses) : 0;
+}
+
+// Shared cache instance used by callFirstPromoterAPI
+export const responseCache = new ResponseCache(CACHE_MAX_BYTES, CACHE_STALE_MS);
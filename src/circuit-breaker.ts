@@ -0,0 +1,245 @@
+/**
+ * Circuit Breakers
+ *
+ * Stops sending requests to FirstPromoter while it is clearly down, so tool
+ * calls fail in milliseconds with a clear message instead of each spending
+ * 7+ seconds in retries and piling up. Like the fuse box in a house: after
+ * repeated faults the fuse for that room trips, and it is only switched back
+ * on carefully — one test — once things have had time to cool down.
+ *
+ * One breaker per resource family (promoters, referrals, reports, ...):
+ * - closed: requests flow; consecutive outage failures (network errors,
+ *   5xx) are counted, and FP_BREAKER_FAILURES of them open the breaker
+ * - open: every request fails fast with CircuitOpenError until the cooldown
+ *   (FP_BREAKER_COOLDOWN_MS, doubled after every failed probe up to
+ *   MAX_COOLDOWN_MS) has passed
+ * - half_open: a single probe request is let through; success closes the
+ *   breaker, failure opens it again
+ *
+ * 4xx and 429 responses mean the server is up, so they count as successes
+ * here (429s are the rate controller's business, see rate-controller.ts).
+ */
+
+import { logger } from './logger.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const FAILURE_THRESHOLD = envInt('FP_BREAKER_FAILURES', 5);
+const BASE_COOLDOWN_MS = envInt('FP_BREAKER_COOLDOWN_MS', 30_000);
+const MAX_COOLDOWN_MS = 5 * 60_000;
+
+// Recent state transitions kept for get_server_stats
+const MAX_TRANSITIONS = 20;
+
+// ============================================================================
+// ERRORS
+// ============================================================================
+
+/**
+ * Thrown instead of calling the API while a family's breaker is open.
+ */
+export class CircuitOpenError extends Error {
+  constructor(
+    public readonly family: string,
+    public readonly retryInMs: number,
+    lastError: string | null,
+  ) {
+    super(
+      `FirstPromoter API looks unavailable for ${family} — not calling it for now ` +
+      `(retrying in ~${Math.ceil(retryInMs / 1000)}s)` +
+      (lastError ? `. Last error: ${lastError}` : '')
+    );
+    this.name = 'CircuitOpenError';
+  }
+}
+
+// ============================================================================
+// BREAKERS
+// ============================================================================
+
+export type BreakerState = 'closed' | 'open' | 'half_open';
+
+interface Breaker {
+  state: BreakerState;
+  failures: number;          // consecutive outage failures
+  cooldownMs: number;        // current open period (grows with failed probes)
+  openUntil: number;
+  probing: boolean;          // the half-open probe is in flight
+  lastError: string | null;
+  opened: number;
+  rejected: number;
+}
+
+export interface BreakerTransition {
+  family: string;
+  from: BreakerState;
+  to: BreakerState;
+  at: string;
+  reason: string;
+}
+
+export interface CircuitBreakerStats {
+  failureThreshold: number;
+  cooldownMs: number;
+  transitions: number;       // state changes since start
+  rejected: number;          // calls failed fast while open
+  families: Record<string, {
+    state: BreakerState;
+    failures: number;
+    opened: number;
+    rejected: number;
+    retryInMs: number;
+    lastError: string | null;
+  }>;
+  recent: BreakerTransition[];
+}
+
+export class CircuitBreakers {
+  private readonly breakers = new Map<string, Breaker>();
+  private readonly recent: BreakerTransition[] = [];
+  private transitions = 0;
+  private rejected = 0;
+
+  /**
+   * Let a request for `family` through, or throw CircuitOpenError.
+   * After the cooldown the first caller becomes the half-open probe.
+   */
+  admit(family: string): void {
+    const breaker = this.breakers.get(family);
+    if (!breaker || breaker.state === 'closed') return;
+
+    const now = Date.now();
+    if (breaker.state === 'open' && now >= breaker.openUntil) {
+      this.transition(family, breaker, 'half_open', 'cooldown over, probing');
+    }
+    if (breaker.state === 'half_open' && !breaker.probing) {
+      breaker.probing = true;
+      return;
+    }
+
+    breaker.rejected++;
+    this.rejected++;
+    throw new CircuitOpenError(family, Math.max(0, breaker.openUntil - now), breaker.lastError);
+  }
+
+  /**
+   * Throw CircuitOpenError unless the breaker is closed — checked before a
+   * retry, so a call stops retrying as soon as the breaker opens.
+   */
+  ensureClosed(family: string): void {
+    const breaker = this.breakers.get(family);
+    if (!breaker || breaker.state === 'closed') return;
+    this.rejected++;
+    breaker.rejected++;
+    throw new CircuitOpenError(family, Math.max(0, breaker.openUntil - Date.now()), breaker.lastError);
+  }
+
+  /** The server answered (any status below 500). */
+  recordSuccess(family: string): void {
+    const breaker = this.breakers.get(family);
+    if (!breaker) return;
+    breaker.failures = 0;
+    if (breaker.state !== 'closed') {
+      breaker.probing = false;
+      breaker.cooldownMs = BASE_COOLDOWN_MS;
+      this.transition(family, breaker, 'closed', 'probe succeeded');
+    }
+  }
+
+  /** A network error or 5xx response. */
+  recordFailure(family: string, error: string): void {
+    const breaker = this.breakerFor(family);
+    breaker.failures++;
+    breaker.lastError = error;
+
+    if (breaker.state === 'half_open') {
+      breaker.probing = false;
+      breaker.cooldownMs = Math.min(MAX_COOLDOWN_MS, breaker.cooldownMs * 2);
+      this.open(family, breaker, 'probe failed');
+    } else if (breaker.state === 'closed' && breaker.failures >= FAILURE_THRESHOLD) {
+      this.open(family, breaker, `${breaker.failures} consecutive failures`);
+    }
+  }
+
+  /**
+   * An admitted request ended without an answer either way (cancelled by
+   * the client) — free the half-open probe slot for the next caller.
+   */
+  release(family: string): void {
+    const breaker = this.breakers.get(family);
+    if (breaker?.state === 'half_open') breaker.probing = false;
+  }
+
+  stats(): CircuitBreakerStats {
+    const now = Date.now();
+    const families: CircuitBreakerStats['families'] = {};
+    for (const [family, breaker] of this.breakers) {
+      families[family] = {
+        state: breaker.state,
+        failures: breaker.failures,
+        opened: breaker.opened,
+        rejected: breaker.rejected,
+        retryInMs: breaker.state === 'open' ? Math.max(0, breaker.openUntil - now) : 0,
+        lastError: breaker.lastError,
+      };
+    }
+    return {
+      failureThreshold: FAILURE_THRESHOLD,
+      cooldownMs: BASE_COOLDOWN_MS,
+      transitions: this.transitions,
+      rejected: this.rejected,
+      families,
+      recent: [...this.recent],
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  private breakerFor(family: string): Breaker {
+    let breaker = this.breakers.get(family);
+    if (!breaker) {
+      breaker = {
+        state: 'closed',
+        failures: 0,
+        cooldownMs: BASE_COOLDOWN_MS,
+        openUntil: 0,
+        probing: false,
+        lastError: null,
+        opened: 0,
+        rejected: 0,
+      };
+      this.breakers.set(family, breaker);
+    }
+    return breaker;
+  }
+
+  private open(family: string, breaker: Breaker, reason: string): void {
+    breaker.openUntil = Date.now() + breaker.cooldownMs;
+    breaker.opened++;
+    this.transition(family, breaker, 'open', reason);
+  }
+
+  private transition(family: string, breaker: Breaker, to: BreakerState, reason: string): void {
+    const from = breaker.state;
+    breaker.state = to;
+    this.transitions++;
+    this.recent.push({ family, from, to, at: new Date().toISOString(), reason });
+    if (this.recent.length > MAX_TRANSITIONS) this.recent.shift();
+
+    const message = `Circuit breaker ${family}: ${from} → ${to} (${reason})`;
+    if (to === 'open') logger.warn(message);
+    else logger.info(message);
+  }
+}
+
+// Shared breakers used by callFirstPromoterAPI
+export const circuitBreakers = new CircuitBreakers();
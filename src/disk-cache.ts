@@ -0,0 +1,288 @@
+/**
+ * Persistent Disk Cache (optional)
+ *
+ * A SQLite-backed second cache tier that survives restarts. The in-memory
+ * cache (cache.ts) is the fridge; this is the pantry — a bit slower to reach,
+ * but still there after the restaurant closes and reopens.
+ *
+ * Enabled by setting FP_CACHE_DB to a file path (e.g. /app/data/cache.db).
+ * Uses Node's built-in node:sqlite module (Node 22.13+), so no extra
+ * dependency is needed; on older Node versions the disk tier is skipped
+ * with a warning and the server keeps working with the memory cache only.
+ *
+ * Includes:
+ * - The same per-endpoint TTLs as the memory cache (stored as expires_at)
+ * - A total size cap, evicting least recently accessed rows
+ * - Periodic compaction: expired rows are purged and free pages reclaimed
+ * - An owner fingerprint (hash of FP_ACCOUNT_ID + FP_BEARER_TOKEN): when the
+ *   credentials change, the file is wiped on open, so a restarted server
+ *   never answers with another account's data
+ */
+
+import { createHash } from 'node:crypto';
+import type { DatabaseSync, StatementSync } from 'node:sqlite';
+import { logger } from './logger.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+const CACHE_DB_PATH = process.env.FP_CACHE_DB || '';
+
+// Total size budget for cached bodies on disk (default 256 MB)
+const CACHE_DB_MAX_BYTES = (() => {
+  const value = parseInt(process.env.FP_CACHE_DB_MAX_BYTES || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : 256 * 1024 * 1024;
+})();
+
+// How often expired rows are purged and the file is compacted (default 10 min)
+const CACHE_DB_COMPACT_INTERVAL_MS = (() => {
+  const value = parseInt(process.env.FP_CACHE_DB_COMPACT_INTERVAL_MS || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : 10 * 60_000;
+})();
+
+// Whose data the file holds. Only a hash is stored, never the token itself.
+const CACHE_OWNER = createHash('sha256')
+  .update(`${process.env.FP_ACCOUNT_ID || ''}\n${process.env.FP_BEARER_TOKEN || ''}`)
+  .digest('hex');
+
+// Reclaim free pages once they exceed this share of the file
+const FREE_PAGE_RATIO_THRESHOLD = 0.25;
+
+// ============================================================================
+// DISK CACHE
+// ============================================================================
+
+export interface DiskCacheStats {
+  enabled: boolean;
+  path: string;
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+  hits: number;
+  misses: number;
+  evictions: number;
+  compactions: number;
+}
+
+export class DiskCache {
+  private db: DatabaseSync | null = null;
+  private statements: {
+    get: StatementSync;
+    touch: StatementSync;
+    put: StatementSync;
+    remove: StatementSync;
+    oldest: StatementSync;
+    count: StatementSync;
+  } | null = null;
+  private totalBytes = 0;
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+  private compactions = 0;
+
+  constructor(
+    private readonly path: string,
+    private readonly maxBytes: number,
+    private readonly owner: string,
+  ) {}
+
+  get enabled(): boolean {
+    return this.db !== null;
+  }
+
+  /**
+   * Open (or create) the database. Safe to call when disabled — it does
+   * nothing if no path is configured or node:sqlite is unavailable.
+   */
+  async open(): Promise<void> {
+    if (!this.path || this.db) return;
+
+    let sqlite: typeof import('node:sqlite');
+    try {
+      sqlite = await import('node:sqlite');
+    } catch {
+      logger.warn('Disk cache disabled: node:sqlite is not available (requires Node 22.13+)');
+      return;
+    }
+
+    try {
+      const db = new sqlite.DatabaseSync(this.path);
+
+      // auto_vacuum must be set before the first table is created
+      db.exec(`
+        PRAGMA auto_vacuum = INCREMENTAL;
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        CREATE TABLE IF NOT EXISTS responses (
+          key         TEXT PRIMARY KEY,
+          family      TEXT NOT NULL,
+          body        TEXT NOT NULL,
+          bytes       INTEGER NOT NULL,
+          expires_at  INTEGER NOT NULL,
+          accessed_at INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at);
+        CREATE INDEX IF NOT EXISTS responses_family ON responses (family);
+        CREATE TABLE IF NOT EXISTS meta (
+          name  TEXT PRIMARY KEY,
+          value TEXT NOT NULL
+        );
+      `);
+
+      // Cached bodies belong to one account: start over if the file was
+      // written with other credentials (or before owners were recorded)
+      const stored = db.prepare("SELECT value FROM meta WHERE name = 'owner'").get() as
+        { value: string } | undefined;
+      if (stored?.value !== this.owner) {
+        const wiped = db.prepare('DELETE FROM responses').run();
+        db.prepare("INSERT OR REPLACE INTO meta (name, value) VALUES ('owner', ?)").run(this.owner);
+        if (Number(wiped.changes) > 0) {
+          logger.info(`Disk cache: credentials changed, dropped ${wiped.changes} entr(ies)`);
+        }
+      }
+
+      this.statements = {
+        get: db.prepare('SELECT body, bytes, expires_at FROM responses WHERE key = ?'),
+        touch: db.prepare('UPDATE responses SET accessed_at = ? WHERE key = ?'),
+        put: db.prepare(
+          'INSERT OR REPLACE INTO responses (key, family, body, bytes, expires_at, accessed_at) ' +
+          'VALUES (?, ?, ?, ?, ?, ?)'
+        ),
+        remove: db.prepare('DELETE FROM responses WHERE key = ? RETURNING bytes'),
+        oldest: db.prepare('SELECT key FROM responses ORDER BY accessed_at LIMIT 32'),
+        count: db.prepare('SELECT COUNT(*) AS entries, COALESCE(SUM(bytes), 0) AS bytes FROM responses'),
+      };
+      this.db = db;
+
+      this.compact();
+      const timer = setInterval(() => this.compact(), CACHE_DB_COMPACT_INTERVAL_MS);
+      timer.unref(); // don't keep the process alive just for maintenance
+
+      const { entries } = this.statements.count.get() as { entries: number };
+      logger.info(`Disk cache opened: ${this.path}`, { entries, bytes: this.totalBytes });
+    } catch (err) {
+      logger.error('Disk cache disabled: failed to open database', {
+        path: this.path,
+        error: err instanceof Error ? err.message : String(err),
+      });
+      this.db = null;
+      this.statements = null;
+    }
+  }
+
+  /**
+   * Look up a fresh entry.
+   * @returns The parsed body and its remaining TTL, or undefined on miss
+   */
+  get(key: string): { value: unknown; bytes: number; ttlMs: number } | undefined {
+    if (!this.statements) return undefined;
+
+    const now = Date.now();
+    const row = this.statements.get.get(key) as
+      { body: string; bytes: number; expires_at: number } | undefined;
+
+    if (!row || row.expires_at <= now) {
+      this.misses++;
+      return undefined;
+    }
+
+    this.statements.touch.run(now, key);
+    this.hits++;
+    return { value: JSON.parse(row.body), bytes: row.bytes, ttlMs: row.expires_at - now };
+  }
+
+  /**
+   * Store a raw JSON body, then evict least recently accessed rows
+   * until the total size is back under the cap.
+   */
+  set(key: string, family: string, body: string, bytes: number, ttlMs: number): void {
+    if (!this.statements || ttlMs <= 0 || bytes > this.maxBytes / 4) return;
+
+    const now = Date.now();
+    this.removeKey(key);
+    this.statements.put.run(key, family, body, bytes, now + ttlMs, now);
+    this.totalBytes += bytes;
+
+    while (this.totalBytes > this.maxBytes) {
+      const victims = this.statements.oldest.all() as { key: string }[];
+      if (victims.length === 0) break;
+      for (const victim of victims) {
+        this.removeKey(victim.key);
+        this.evictions++;
+        if (this.totalBytes <= this.maxBytes) break;
+      }
+    }
+  }
+
+  /**
+   * Drop every row belonging to one of the given families.
+   */
+  invalidate(families: string[]): void {
+    if (!this.db || families.length === 0) return;
+
+    const placeholders = families.map(() => '?').join(', ');
+    this.db.prepare(`DELETE FROM responses WHERE family IN (${placeholders})`).run(...families);
+    this.refreshTotals();
+  }
+
+  /**
+   * Compaction policy: purge expired rows, then reclaim free pages once
+   * they make up more than FREE_PAGE_RATIO_THRESHOLD of the file.
+   */
+  compact(): void {
+    if (!this.db) return;
+
+    try {
+      const purged = this.db.prepare('DELETE FROM responses WHERE expires_at <= ?').run(Date.now());
+      this.refreshTotals();
+
+      const { freelist_count: freePages } =
+        this.db.prepare('PRAGMA freelist_count').get() as { freelist_count: number };
+      const { page_count: totalPages } =
+        this.db.prepare('PRAGMA page_count').get() as { page_count: number };
+
+      if (totalPages > 0 && freePages / totalPages > FREE_PAGE_RATIO_THRESHOLD) {
+        this.db.exec('PRAGMA incremental_vacuum; PRAGMA wal_checkpoint(TRUNCATE);');
+        this.compactions++;
+        logger.debug('Disk cache: compacted', { freePages, totalPages });
+      }
+
+      if (Number(purged.changes) > 0) {
+        logger.debug(`Disk cache: purged ${purged.changes} expired entr(ies)`);
+      }
+    } catch (err) {
+      logger.warn('Disk cache: compaction failed', {
+        error: err instanceof Error ? err.message : String(err),
+      });
+    }
+  }
+
+  stats(): DiskCacheStats {
+    const counts = this.statements?.count.get() as { entries: number } | undefined;
+    return {
+      enabled: this.enabled,
+      path: this.path,
+      entries: counts?.entries ?? 0,
+      bytes: this.totalBytes,
+      maxBytes: this.maxBytes,
+      hits: this.hits,
+      misses: this.misses,
+      evictions: this.evictions,
+      compactions: this.compactions,
+    };
+  }
+
+  private removeKey(key: string): void {
+    const removed = this.statements!.remove.get(key) as { bytes: number } | undefined;
+    if (removed) this.totalBytes -= removed.bytes;
+  }
+
+  private refreshTotals(): void {
+    const { bytes } = this.statements!.count.get() as { bytes: number };
+    this.totalBytes = bytes;
+  }
+}
+
+// Shared disk cache instance — opened once at startup by index.ts
+export const diskCache = new DiskCache(CACHE_DB_PATH, CACHE_DB_MAX_BYTES, CACHE_OWNER);
@@ -6,25 +6,245 @@
  * it can mix up fields between similar-looking records. A clear text summary
  * makes each record's fields unambiguous.
  *
- * Every tool response includes:
+ * By default every tool response includes:
  * 1. A formatted text summary (easy to read, hard to misinterpret)
  * 2. The raw JSON data appended below (for detailed analysis if needed)
+ *
+ * The response_format option (per call, or FP_RESPONSE_FORMAT globally)
+ * can drop either part or switch the raw JSON to a minified form.
  */
 
+import { readPath } from './projection.js';
+import { applyResponseBudget } from './result-store.js';
+import { staleDataAge } from './request-context.js';
+
 // ============================================================================
 // SHARED UTILITY
 // ============================================================================
 
+/**
+ * How a tool response is laid out:
+ * - summary               → the formatted text summary only
+ * - compact_json          → minified raw JSON only, with null/empty fields dropped
+ * - summary+compact_json  → summary followed by the compact raw JSON
+ * - full                  → summary followed by pretty-printed raw JSON (original format)
+ */
+export const RESPONSE_FORMATS = ['summary', 'compact_json', 'summary+compact_json', 'full'] as const;
+export type ResponseFormat = typeof RESPONSE_FORMATS[number];
+
+// Server-wide default, overridable per call with the response_format argument
+const DEFAULT_RESPONSE_FORMAT: ResponseFormat = (() => {
+  const value = process.env.FP_RESPONSE_FORMAT as ResponseFormat | undefined;
+  return value && RESPONSE_FORMATS.includes(value) ? value : 'full';
+})();
+
+/**
+ * Shared description for the per-tool response_format argument.
+ */
+export const RESPONSE_FORMAT_DESCRIPTION =
+  "Output layout: 'summary' (text only), 'compact_json' (minified raw JSON without null/empty fields), " +
+  "'summary+compact_json', or 'full' (summary + pretty-printed raw JSON). " +
+  `Defaults to '${DEFAULT_RESPONSE_FORMAT}'.`;
+
+/**
+ * Recursively drops null, undefined, empty strings, empty arrays and empty
+ * objects from object properties. Array elements are kept in place (only
+ * their contents are pruned) so positions stay meaningful.
+ */
+export function pruneEmpty(value: unknown): unknown {
+  if (Array.isArray(value)) {
+    return value.map((item) => {
+      const pruned = pruneEmpty(item);
+      return pruned === undefined ? null : pruned;
+    });
+  }
+  if (value === null || typeof value !== 'object') {
+    return value === null || value === '' ? undefined : value;
+  }
+
+  const result: Record<string, unknown> = {};
+  let kept = 0;
+  for (const [key, child] of Object.entries(value)) {
+    const pruned = pruneEmpty(child);
+    if (pruned === undefined || (Array.isArray(pruned) && pruned.length === 0)) continue;
+    result[key] = pruned;
+    kept++;
+  }
+  return kept > 0 ? result : undefined;
+}
+
+// --- Payload size counters (reported by get_server_stats) ---
+
+// Building the pretty-printed JSON just to measure it would double the work
+// of every trimmed response, so only one in this many is measured; the
+// 'full' size of the others is estimated from the measured ones' ratio
+const FULL_SIZE_SAMPLE_EVERY = 10;
+
+const responseCounters = {
+  responses: 0,
+  fullLayoutBytes: 0,     // sent by 'full' responses (their full size is exact)
+  sentBytes: 0,           // what was actually returned
+  trimmedResponses: 0,    // responses in the other layouts
+  trimmedSentBytes: 0,
+  sampledFullBytes: 0,    // full size of the measured trimmed responses…
+  sampledSentBytes: 0,    // …and what they sent
+  byFormat: {} as Record<string, number>,
+};
+
+export interface ResponseStats {
+  defaultFormat: ResponseFormat;
+  responses: number;
+  fullBytes: number;        // size in the 'full' layout (sampled estimate for other layouts)
+  sentBytes: number;
+  savedRatio: number;
+  byFormat: Record<string, number>;
+}
+
+export function getResponseStats(): ResponseStats {
+  const { responses, fullLayoutBytes, sentBytes, trimmedSentBytes, sampledFullBytes, sampledSentBytes, byFormat } =
+    responseCounters;
+  const trimmedRatio = sampledSentBytes > 0 ? sampledFullBytes / sampledSentBytes : 1;
+  const fullBytes = fullLayoutBytes + Math.round(trimmedSentBytes * trimmedRatio);
+  return {
+    defaultFormat: DEFAULT_RESPONSE_FORMAT,
+    responses,
+    fullBytes,
+    sentBytes,
+    savedRatio: fullBytes > 0 ? 1 - sentBytes / fullBytes : 0,
+    byFormat: { ...byFormat },
+  };
+}
+
 /**
  * Wraps a formatted summary + raw JSON into a single response string.
  * Every tool should use this to ensure consistent output format.
  *
  * @param summary - Human-readable text summary of the data
  * @param rawData - The original API response (will be JSON-stringified)
- * @returns Combined string: summary + separator + raw JSON
+ * @param format - Output layout; falls back to FP_RESPONSE_FORMAT (default 'full')
+ * @returns The response text in the requested layout, or a preview plus
+ *          resource URIs if it exceeds the response budget. If any of the
+ *          call's data came from the stale cache during an API outage, the
+ *          text starts with a line saying so.
  */
-export function buildToolResponse(summary: string, rawData: unknown): string {
-  return `${summary}\n\n---\nRaw JSON data:\n${JSON.stringify(rawData, null, 2)}`;
+export function buildToolResponse(summary: string, rawData: unknown, format?: ResponseFormat): string {
+  const layout = format ?? DEFAULT_RESPONSE_FORMAT;
+  const staleMs = staleDataAge();
+  if (staleMs !== undefined) {
+    summary = formatStaleNotice(staleMs) + summary;
+  }
+  const full = () => `${summary}\n\n---\nRaw JSON data:\n${JSON.stringify(rawData, null, 2)}`;
+
+  let text: string;
+  switch (layout) {
+    case 'summary':
+      text = summary;
+      break;
+    case 'compact_json':
+      text = JSON.stringify(pruneEmpty(rawData) ?? null);
+      if (staleMs !== undefined) text = formatStaleNotice(staleMs) + text;
+      break;
+    case 'summary+compact_json':
+      text = `${summary}\n\n---\nRaw JSON data (compact):\n${JSON.stringify(pruneEmpty(rawData) ?? null)}`;
+      break;
+    default:
+      text = full();
+  }
+
+  // Oversized responses are parked in the result store and replaced by a preview + URI
+  const unbudgeted = text;
+  text = applyResponseBudget(text, summary);
+  const sentBytes = Buffer.byteLength(text);
+
+  responseCounters.responses++;
+  responseCounters.sentBytes += sentBytes;
+  if (layout === 'full') {
+    responseCounters.fullLayoutBytes += Buffer.byteLength(unbudgeted);
+  } else {
+    if (responseCounters.trimmedResponses++ % FULL_SIZE_SAMPLE_EVERY === 0) {
+      responseCounters.sampledFullBytes += Buffer.byteLength(full());
+      responseCounters.sampledSentBytes += sentBytes;
+    }
+    responseCounters.trimmedSentBytes += sentBytes;
+  }
+  responseCounters.byFormat[layout] = (responseCounters.byFormat[layout] ?? 0) + 1;
+
+  return text;
+}
+
+/**
+ * Warning line for responses built (partly) from stale cache entries,
+ * so the model does not present old data as live.
+ */
+function formatStaleNotice(ageMs: number): string {
+  return `WARNING: The FirstPromoter API is unavailable — served from stale cache, ${Math.round(ageMs / 1000)}s old. ` +
+    'Say so when citing these values.\n\n';
+}
+
+/**
+ * One-line header for list tools called with fetch_all=true.
+ * Tells the client how many pages were merged and whether a limit cut it short.
+ */
+export function formatFetchAllSummary(fetched: { records: unknown[]; pages: number; truncated: boolean }): string {
+  let line = `Fetched ${fetched.records.length} record(s) across ${fetched.pages} page(s).`;
+  if (fetched.truncated) {
+    line += ' Stopped early at the record/size limit — narrow the filters or raise max_records to get the rest.';
+  }
+  return line;
+}
+
+/**
+ * One-line header for results served by the local promoter mirror,
+ * so the client knows how fresh the data is.
+ */
+export function formatMirrorSummary(meta: { total_count: number; age_seconds: number; synced_at: string }): string {
+  return `Served from the local promoter mirror: ${meta.total_count} match(es), ` +
+    `data synced ${meta.age_seconds}s ago (${meta.synced_at}). Pass source='live' to query the API directly.`;
+}
+
+/**
+ * Generic summary for list tools called with a `fields` projection.
+ * Prints only the requested paths of each record instead of the full
+ * per-resource layout, so the summary shrinks along with the raw JSON.
+ *
+ * @param label - Singular record name, e.g. "promoter"
+ * @param data - Projected response (flat array or { data, meta })
+ * @param fields - The requested dot paths
+ */
+export function formatProjectedRecords(label: string, data: unknown, fields: string[]): string {
+  const raw = data as Record<string, unknown>;
+  const records: Record<string, unknown>[] = Array.isArray(data)
+    ? data
+    : Array.isArray(raw?.data)
+      ? raw.data as Record<string, unknown>[]
+      : [];
+
+  const lines: string[] = [`Found ${records.length} ${label}(s). Fields: ${fields.join(', ')}\n`];
+
+  records.forEach((record, i) => {
+    lines.push(`${i + 1}. ID: ${record.id ?? 'N/A'}`);
+    for (const field of fields) {
+      if (field === 'id') continue;
+      lines.push(`   ${field}: ${formatFieldValue(readPath(record, field))}`);
+    }
+    lines.push('');
+  });
+
+  if (raw?.meta) {
+    const meta = raw.meta as Record<string, unknown>;
+    if (meta.current_page || meta.total_pages) {
+      lines.push(`Page ${meta.current_page || '?'} of ${meta.total_pages || '?'}`);
+    }
+  }
+
+  return lines.join('\n');
+}
+
+function formatFieldValue(value: unknown): string {
+  if (value === undefined || value === null || value === '') return 'N/A';
+  if (Array.isArray(value)) return value.map(formatFieldValue).join(', ') || 'none';
+  if (typeof value === 'object') return JSON.stringify(value);
+  return String(value);
 }
 
 // ============================================================================
@@ -134,6 +354,37 @@ export function formatPromoters(data: unknown): string {
   return lines.join('\n');
 }
 
+/**
+ * Formats a get_promoters_bulk result: counts, failed identifiers, then one
+ * line per resolved input.
+ * Shape: { results: { '<kind>:<value>': promoter }, errors: [{ input, error }], meta }
+ */
+export function formatPromoterBulkLookup(data: unknown): string {
+  const raw = data as Record<string, unknown>;
+  const results = (raw.results ?? {}) as Record<string, Record<string, unknown>>;
+  const errors = (raw.errors ?? []) as { input: string; error: string }[];
+  const meta = (raw.meta ?? {}) as Record<string, unknown>;
+
+  const lines: string[] = [
+    `Resolved ${meta.resolved ?? Object.keys(results).length} of ${meta.requested ?? '?'} identifier(s) ` +
+    `(${meta.from_mirror ?? 0} from the local mirror, ${meta.id_batches ?? 0} ID batch request(s), ` +
+    `${meta.single_lookups ?? 0} single lookup(s), ${meta.elapsed_ms ?? '?'} ms).`,
+  ];
+
+  if (errors.length > 0) {
+    lines.push('', `Failed (${errors.length}):`);
+    errors.forEach((e) => lines.push(`   - ${e.input}: ${e.error}`));
+  }
+
+  lines.push('');
+  for (const [input, promoter] of Object.entries(results)) {
+    lines.push(`${input} → ${promoter.name || 'N/A'} (ID: ${promoter.id ?? 'N/A'}) | ` +
+      `Email: ${promoter.email || 'N/A'} | State: ${promoter.state || 'N/A'}`);
+  }
+
+  return lines.join('\n');
+}
+
 // ============================================================================
 // BATCH RESULT FORMATTER
 // ============================================================================
@@ -150,6 +401,7 @@ export function formatPromoters(data: unknown): string {
  */
 export function formatBatchResult(data: unknown): string {
   const batch = data as Record<string, unknown>;
+  if (Array.isArray(batch?.batches)) return formatChunkedBatchResult(batch);
   const lines: string[] = [];
 
   lines.push(`Batch operation: ${batch.action_label || 'N/A'}`);
@@ -170,6 +422,78 @@ export function formatBatchResult(data: unknown): string {
   return lines.join('\n');
 }
 
+/**
+ * Formats a batch sent in several chunks (see batch-executor.ts):
+ * { status, total, processed_count, failed_count, batch_ids, batches[], failed_chunks[] }
+ */
+function formatChunkedBatchResult(execution: Record<string, unknown>): string {
+  const batches = execution.batches as Record<string, unknown>[];
+  const failedChunks = (execution.failed_chunks ?? []) as { ids: number[]; error: string }[];
+
+  const lines: string[] = [
+    `Batch operation sent in ${batches.length + failedChunks.length} chunk(s)`,
+    `Status: ${execution.status || 'N/A'}`,
+    `Batch IDs: ${(execution.batch_ids as number[] | undefined)?.join(', ') || 'none'}`,
+    `Total: ${execution.total ?? 'N/A'} | Processed: ${execution.processed_count ?? 0} | Failed: ${execution.failed_count ?? 0}`,
+    '',
+  ];
+
+  batches.forEach((batch) => {
+    lines.push(`   Batch ${batch.id ?? 'N/A'}: ${batch.ids_count} ids | ${batch.status || 'N/A'} | ` +
+      `Processed: ${batch.processed_count ?? 0} | Failed: ${batch.failed_count ?? 0} | Progress: ${batch.progress ?? 'N/A'}%`);
+    const errors = batch.processing_errors as string[] | undefined;
+    if (errors && errors.length > 0) {
+      lines.push(`      Errors: ${errors.join(', ')}`);
+    }
+  });
+
+  failedChunks.forEach((chunk) => {
+    lines.push(`   Request failed for ${chunk.ids.length} ids (${chunk.ids[0]}…${chunk.ids[chunk.ids.length - 1]}): ${chunk.error}`);
+  });
+
+  return lines.join('\n');
+}
+
+/**
+ * Formats a wait_for_batch_processes result.
+ * Shape: { status, done, pending[], batches[], meta: { polls, detail_checks, elapsed_ms } }
+ */
+export function formatBatchWait(data: unknown): string {
+  const wait = data as Record<string, unknown>;
+  const batches = (wait.batches ?? []) as Record<string, unknown>[];
+  const pending = (wait.pending ?? []) as number[];
+  const meta = (wait.meta ?? {}) as Record<string, unknown>;
+
+  const lines: string[] = [
+    `Wait ${wait.status || 'N/A'}: ${wait.done ?? 0} of ${batches.length || (Number(wait.done ?? 0) + pending.length)} ` +
+    `batch(es) finished after ${Math.round(Number(meta.elapsed_ms ?? 0) / 1000)}s ` +
+    `(${meta.polls ?? 0} progress poll(s), ${meta.detail_checks ?? 0} detail check(s)).`,
+  ];
+  if (pending.length > 0) {
+    lines.push(`Still running: ${pending.join(', ')}`);
+  }
+  lines.push('');
+
+  batches.forEach((batch) => {
+    if (batch.error) {
+      lines.push(`  Batch #${batch.id}: ${batch.progress ?? 'N/A'}% — could not read details: ${batch.error}`);
+      return;
+    }
+    if (!('status' in batch)) {
+      lines.push(`  Batch #${batch.id}: ${batch.progress ?? 'N/A'}% (last progress poll; details not read)`);
+      return;
+    }
+    lines.push(`  Batch #${batch.id}: ${batch.status || 'N/A'} ${batch.progress ?? 'N/A'}% | ${batch.action_label || 'N/A'} | ` +
+      `Total: ${batch.total ?? 'N/A'} | Processed: ${batch.processed_count ?? 0} | Failed: ${batch.failed_count ?? 0}`);
+    const errors = batch.processing_errors as string[] | undefined;
+    if (errors && errors.length > 0) {
+      lines.push(`     Errors: ${errors.join(', ')}`);
+    }
+  });
+
+  return lines.join('\n');
+}
+
 // ============================================================================
 // BATCH PROGRESS FORMATTER
 // ============================================================================
@@ -524,6 +848,102 @@ export function formatUrlReport(data: unknown): string {
   return lines.join('\n');
 }
 
+/**
+ * Formats a get_reports_bundle result: the shared spec once, then each
+ * report through its own formatter, then skipped and failed reports.
+ * Shape: { spec: {...}, reports: { <type>: [...] }, skipped?: {...}, errors?: {...} }
+ */
+export function formatReportsBundle(data: unknown): string {
+  const bundle = data as {
+    spec: Record<string, unknown>;
+    reports: Record<string, unknown>;
+    skipped?: Record<string, string>;
+    errors?: Record<string, string>;
+  };
+  const formatters: Record<string, (report: unknown) => string> = {
+    overview: formatOverviewReport,
+    campaigns: formatCampaignReport,
+    promoters: formatPromoterReport,
+    traffic_sources: formatTrafficSourceReport,
+    urls: formatUrlReport,
+  };
+
+  const spec = bundle.spec;
+  const lines: string[] = [
+    `Report bundle: ${spec.start_date} to ${spec.end_date}, grouped by ${spec.group_by}` +
+    (spec.q ? `, search "${spec.q}"` : '') + '.',
+    `Reports: ${Object.keys(bundle.reports).join(', ') || 'none'}.\n`,
+  ];
+
+  for (const [type, report] of Object.entries(bundle.reports)) {
+    lines.push(`=== ${type} ===`);
+    lines.push((formatters[type] ?? formatOverviewReport)(report));
+  }
+  for (const [type, reason] of Object.entries(bundle.skipped ?? {})) {
+    lines.push(`Skipped ${type}: ${reason}`);
+  }
+  for (const [type, message] of Object.entries(bundle.errors ?? {})) {
+    lines.push(`Failed ${type}: ${message}`);
+  }
+
+  return lines.join('\n');
+}
+
+/**
+ * Formats a get_promoter_overview result as a compact text summary.
+ * Shape: { promoter, referrals?, commissions?, payouts?, promo_codes?, report?, errors?, meta }
+ */
+export function formatPromoterOverview(data: unknown): string {
+  const overview = data as Record<string, unknown>;
+  const promoter = (overview.promoter ?? {}) as Record<string, unknown>;
+  const stats = promoter.stats as Record<string, unknown> | undefined;
+  const campaigns = (promoter.promoter_campaigns ?? []) as Record<string, unknown>[];
+  const list = (key: string) => (overview[key] ?? []) as Record<string, unknown>[];
+  const meta = (overview.meta ?? {}) as Record<string, unknown>;
+
+  const lines: string[] = [
+    `Promoter overview: ${promoter.name || promoter.email || 'N/A'} (ID: ${promoter.id ?? 'N/A'})`,
+    `   Email: ${promoter.email || 'N/A'} | State: ${promoter.state || 'N/A'} | Joined: ${promoter.joined_at || 'N/A'}`,
+  ];
+  if (stats) {
+    lines.push(
+      `   Stats: Revenue: ${centsToUsd(stats.revenue_amount)} | Sales: ${stats.sales_count ?? 'N/A'} | ` +
+      `Customers: ${stats.customers_count ?? 'N/A'} | Clicks: ${stats.clicks_count ?? 'N/A'} | Referrals: ${stats.referrals_count ?? 'N/A'}`
+    );
+  }
+  campaigns.forEach((pc) => {
+    const campaign = pc.campaign as Record<string, unknown> | undefined;
+    lines.push(`   Campaign: ${campaign?.name || 'N/A'} (promoter_campaign ID: ${pc.id ?? 'N/A'}) | ` +
+      `State: ${pc.state || 'N/A'} | Coupon: ${pc.coupon || 'none'}`);
+  });
+  lines.push('');
+
+  lines.push(`Recent referrals: ${list('referrals').length}`);
+  list('referrals').forEach((r) => lines.push(`   - ${r.email || r.uid || 'N/A'} (ID: ${r.id ?? 'N/A'}) ${r.state || ''} ${r.created_at || ''}`.trimEnd()));
+  lines.push(`Recent commissions: ${list('commissions').length}`);
+  list('commissions').forEach((c) => {
+    const referral = c.referral as Record<string, unknown> | undefined;
+    lines.push(`   - ID ${c.id ?? 'N/A'}: ${centsToUsd(c.amount)} ${c.status || ''} | referral ${referral?.id ?? 'N/A'} | ${c.created_at || ''}`);
+  });
+  lines.push(`Recent payouts: ${list('payouts').length}`);
+  list('payouts').forEach((p) => lines.push(`   - ID ${p.id ?? 'N/A'}: ${centsToUsd(p.amount)} ${p.status || ''} | ${p.period_start || '?'} to ${p.period_end || '?'}`));
+  lines.push(`Promo codes: ${list('promo_codes').map((c) => c.code).join(', ') || 'none'}`);
+
+  const report = overview.report as Record<string, unknown> | undefined;
+  if (report) {
+    const totals = Object.entries((report.totals ?? {}) as Record<string, unknown>)
+      .map(([k, v]) => `${k}: ${typeof v === 'number' && k.includes('amount') ? centsToUsd(v) : v}`);
+    lines.push(`Report ${report.start_date} to ${report.end_date}: ${totals.join(', ') || 'no activity'}`);
+  }
+
+  for (const [section, message] of Object.entries((overview.errors ?? {}) as Record<string, string>)) {
+    lines.push(`Failed ${section}: ${message}`);
+  }
+  lines.push(`(promoter from ${meta.promoter_source || 'api'}, ${meta.elapsed_ms ?? '?'} ms)`);
+
+  return lines.join('\n');
+}
+
 // ============================================================================
 // PROMO CODE FORMATTER
 // ============================================================================
@@ -606,3 +1026,26 @@ export function formatPromoterCampaigns(data: unknown): string {
 
   return lines.join('\n');
 }
+
+// ============================================================================
+// SERVER STATS FORMATTER
+// ============================================================================
+
+/**
+ * Formats the diagnostics snapshot returned by get_server_stats.
+ * Each top-level key is a section (e.g. http_pool) holding flat counters.
+ */
+export function formatServerStats(data: unknown): string {
+  const sections = data as Record<string, Record<string, unknown>>;
+  const lines: string[] = ['Server Statistics:\n'];
+
+  for (const [section, values] of Object.entries(sections)) {
+    lines.push(`  ${section}:`);
+    for (const [k, v] of Object.entries(values ?? {})) {
+      const shown = typeof v === 'number' && !Number.isInteger(v) ? v.toFixed(3) : v;
+      lines.push(`    ${k}: ${typeof shown === 'object' && shown !== null ? JSON.stringify(shown) : shown}`);
+    }
+  }
+
+  return lines.join('\n');
+}
@@ -0,0 +1,279 @@
+/**
+ * HTTP Connection Pool
+ *
+ * Every tool talks to the same host (api.firstpromoter.com), so instead of
+ * letting each request open its own TLS connection we keep a small pool of
+ * warm sockets and reuse them. Think of it as keeping a few delivery vans
+ * idling at the curb instead of starting a cold engine for every trip.
+ *
+ * Includes:
+ * - A dedicated keep-alive https.Agent (socket cap, idle-socket eviction)
+ * - httpRequest() — a fetch-like helper that returns a standard Response
+ * - HttpRequestError — network failures, marked with whether the request
+ *   may have reached the server (so mutations are only replayed when not)
+ * - Pool statistics (open / active / idle / pending sockets, reuse ratio)
+ *
+ * Note: Node's core agent does not pipeline HTTP/1.1 — every socket carries
+ * one in-flight request at a time. Concurrency is therefore bounded by
+ * FP_HTTP_MAX_SOCKETS.
+ */
+
+import https from 'node:https';
+import zlib from 'node:zlib';
+import type { IncomingMessage } from 'node:http';
+import { logger } from './logger.js';
+import { abortError } from './request-context.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+/**
+ * Read a positive integer from the environment, falling back to a default.
+ */
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+// At 380 req/min (~6.3 req/s) and typical ~300ms latency, two or three
+// sockets are busy on average — 8 leaves headroom for bursts and fan-out.
+const HTTP_MAX_SOCKETS = envInt('FP_HTTP_MAX_SOCKETS', 8);
+const HTTP_MAX_FREE_SOCKETS = envInt('FP_HTTP_MAX_FREE_SOCKETS', 4);
+const HTTP_IDLE_TIMEOUT_MS = envInt('FP_HTTP_IDLE_TIMEOUT_MS', 30_000);
+const HTTP_REQUEST_TIMEOUT_MS = envInt('FP_HTTP_REQUEST_TIMEOUT_MS', 30_000);
+
+// ============================================================================
+// AGENT
+// ============================================================================
+
+/**
+ * The shared keep-alive agent used by every API call.
+ *
+ * - keepAlive: reuse sockets instead of closing them after each response
+ * - maxSockets: cap on concurrent connections to the API host
+ * - maxFreeSockets: how many idle sockets we keep warm
+ * - timeout: idle sockets are destroyed after this many ms of inactivity
+ * - scheduling 'lifo': reuse the most recently used socket, so rarely-used
+ *   sockets age out and get evicted instead of being kept alive forever
+ */
+const agent = new https.Agent({
+  keepAlive: true,
+  keepAliveMsecs: 1_000,
+  maxSockets: HTTP_MAX_SOCKETS,
+  maxFreeSockets: HTTP_MAX_FREE_SOCKETS,
+  timeout: HTTP_IDLE_TIMEOUT_MS,
+  scheduling: 'lifo',
+});
+
+// Counters for pool statistics
+let totalRequests = 0;
+let reusedRequests = 0;
+let socketsCreated = 0;
+
+// ============================================================================
+// REQUEST HELPER
+// ============================================================================
+
+/**
+ * A network-level failure of httpRequest.
+ *
+ * maybeSent is false only when the request certainly never reached the
+ * server: the connection failed before the TLS handshake completed, or a
+ * reused keep-alive socket turned out to be closed by the server
+ * (ECONNRESET before any response byte). Anything else — a timeout, a
+ * reset mid-request — may have been processed, so a mutation must not be
+ * sent again.
+ */
+export class HttpRequestError extends Error {
+  constructor(
+    message: string,
+    public readonly code: string | undefined,
+    public readonly maybeSent: boolean,
+  ) {
+    super(message);
+    this.name = 'HttpRequestError';
+  }
+}
+
+// Errors on a reused socket that mean the server had already closed it
+const STALE_SOCKET_CODES = new Set(['ECONNRESET', 'EPIPE']);
+
+/**
+ * Decompress a response body according to its Content-Encoding header.
+ */
+function decodeBody(buffer: Buffer, encoding: string | undefined): Buffer {
+  switch (encoding) {
+    case 'gzip':
+      return zlib.gunzipSync(buffer);
+    case 'deflate':
+      return zlib.inflateSync(buffer);
+    case 'br':
+      return zlib.brotliDecompressSync(buffer);
+    default:
+      return buffer;
+  }
+}
+
+/**
+ * Convert Node's IncomingMessage headers into a standard Headers object.
+ */
+function toHeaders(res: IncomingMessage): Headers {
+  const headers = new Headers();
+  for (const [key, value] of Object.entries(res.headers)) {
+    if (value === undefined || key === 'content-encoding' || key === 'content-length') continue;
+    headers.set(key, Array.isArray(value) ? value.join(', ') : value);
+  }
+  return headers;
+}
+
+/**
+ * Makes an HTTPS request through the shared keep-alive agent.
+ *
+ * Works like fetch() for our purposes: it resolves with a standard Response
+ * for any HTTP status and rejects only on network-level failures.
+ *
+ * @param url - Full request URL
+ * @param init - Method, headers, optional string body, and an optional
+ *               signal that destroys the request (and its socket) when aborted
+ * @returns A Response with the (decompressed) body fully buffered
+ */
+export function httpRequest(
+  url: string,
+  init: { method: string; headers: Record<string, string>; body?: string; signal?: AbortSignal },
+): Promise<Response> {
+  return new Promise((resolve, reject) => {
+    if (init.signal?.aborted) {
+      reject(abortError());
+      return;
+    }
+
+    const headers: Record<string, string> = {
+      ...init.headers,
+      'Accept-Encoding': 'gzip, deflate, br',
+    };
+    if (init.body !== undefined) {
+      headers['Content-Length'] = Buffer.byteLength(init.body).toString();
+    }
+
+    // Connection state, for deciding whether a failed request may have been sent
+    let connected = false;
+    let responded = false;
+
+    const fail = (err: Error & { code?: string }) => {
+      if (err.name === 'AbortError') {
+        reject(err);
+        return;
+      }
+      const notSent = !responded && (
+        !connected || (req.reusedSocket && err.code !== undefined && STALE_SOCKET_CODES.has(err.code))
+      );
+      reject(new HttpRequestError(err.message, err.code, !notSent));
+    };
+
+    const req = https.request(url, { method: init.method, headers, agent }, (res) => {
+      responded = true;
+      const chunks: Buffer[] = [];
+      res.on('data', (chunk: Buffer) => chunks.push(chunk));
+      res.on('error', fail);
+      res.on('end', () => {
+        try {
+          const status = res.statusCode ?? 500;
+          const body = decodeBody(Buffer.concat(chunks), res.headers['content-encoding']);
+          // Response forbids a body on "null body" statuses
+          const nullBody = status === 204 || status === 205 || status === 304;
+          resolve(new Response(nullBody ? null : body, {
+            status,
+            statusText: res.statusMessage,
+            headers: toHeaders(res),
+          }));
+        } catch (err) {
+          reject(err);
+        }
+      });
+    });
+
+    totalRequests++;
+    req.on('socket', (socket) => {
+      if (req.reusedSocket) {
+        reusedRequests++;
+        connected = true;
+      } else {
+        socketsCreated++;
+        socket.once('secureConnect', () => { connected = true; });
+      }
+      logger.debug(`HTTP pool: ${req.reusedSocket ? 'reused' : 'opened'} socket`);
+    });
+
+    // Abort requests that hang on a live socket (idle eviction is handled by the agent)
+    req.setTimeout(HTTP_REQUEST_TIMEOUT_MS, () => {
+      req.destroy(new Error(`Request timed out after ${HTTP_REQUEST_TIMEOUT_MS}ms`));
+    });
+
+    req.on('error', fail);
+
+    // Cancelled by the client: drop the request instead of waiting for it
+    const signal = init.signal;
+    if (signal) {
+      const onAbort = () => req.destroy(abortError());
+      signal.addEventListener('abort', onAbort, { once: true });
+      req.on('close', () => signal.removeEventListener('abort', onAbort));
+    }
+
+    if (init.body !== undefined) {
+      req.write(init.body);
+    }
+    req.end();
+  });
+}
+
+// ============================================================================
+// POOL STATISTICS
+// ============================================================================
+
+export interface HttpPoolStats {
+  open: number;          // active + idle sockets
+  active: number;        // sockets currently carrying a request
+  idle: number;          // keep-alive sockets waiting for reuse
+  pending: number;       // requests queued waiting for a free socket
+  maxSockets: number;
+  maxFreeSockets: number;
+  idleTimeoutMs: number;
+  totalRequests: number;
+  reusedRequests: number;
+  socketsCreated: number;
+  reuseRatio: number;    // share of requests that skipped a new TLS handshake
+}
+
+/**
+ * Count the entries of an agent's per-host socket/request map.
+ */
+function countEntries(map: NodeJS.ReadOnlyDict<unknown[]>): number {
+  let count = 0;
+  for (const list of Object.values(map)) {
+    count += list?.length ?? 0;
+  }
+  return count;
+}
+
+/**
+ * Returns a snapshot of the connection pool, for sizing and diagnostics.
+ */
+export function getHttpPoolStats(): HttpPoolStats {
+  const active = countEntries(agent.sockets);
+  const idle = countEntries(agent.freeSockets);
+
+  return {
+    open: active + idle,
+    active,
+    idle,
+    pending: countEntries(agent.requests),
+    maxSockets: HTTP_MAX_SOCKETS,
+    maxFreeSockets: HTTP_MAX_FREE_SOCKETS,
+    idleTimeoutMs: HTTP_IDLE_TIMEOUT_MS,
+    totalRequests,
+    reusedRequests,
+    socketsCreated,
+    reuseRatio: totalRequests > 0 ? reusedRequests / totalRequests : 0,
+  };
+}
@@ -11,6 +11,7 @@
  * - src/api.ts          — API communication helper
  * - src/formatters.ts   — Response formatting for AI clients
  * - src/tools/          — Tool definitions (one file per resource)
+ * - src/resources.ts    — MCP resources (chunked reads of oversized results)
  */
 
 // ============================================================================
@@ -27,9 +28,18 @@ import { StdioServerTransport } from "@modelcontextprotocol/sdk/server/stdio.js"
 // Tool registry — registers all tools with the server
 import { registerAllTools } from './tools/index.js';
 
+// Resource registry — serves oversized tool results chunk by chunk
+import { registerResources } from './resources.js';
+
 // Logger — outputs to stderr (stdout is reserved for MCP protocol)
 import { logger } from './logger.js';
 
+// Optional persistent cache — only active when FP_CACHE_DB is set
+import { diskCache } from './disk-cache.js';
+
+// Optional local promoter mirror — only active when FP_PROMOTER_MIRROR is set
+import { promoterMirror } from './promoter-mirror.js';
+
 // ============================================================================
 // CREATE THE MCP SERVER
 // ============================================================================
@@ -44,6 +54,9 @@ const server = new McpServer({
 // Register all tools (promoters, and future: referrals, commissions, etc.)
 registerAllTools(server);
 
+// Register resources (stored results of oversized tool responses)
+registerResources(server);
+
 // ============================================================================
 // START THE SERVER
 // ============================================================================
@@ -62,6 +75,12 @@ async function main() {
   // For Phase 1, we only support stdio transport (local testing)
   // In Phase 2, we'll add HTTP transport for remote access
   if (args.includes('--stdio') || args.length === 0) {
+    // Open the on-disk cache (no-op unless FP_CACHE_DB is configured)
+    await diskCache.open();
+
+    // Start loading the promoter mirror in the background (no-op unless enabled)
+    promoterMirror.start();
+
     // Create a stdio transport (communicates through standard input/output)
     const transport = new StdioServerTransport();
 
@@ -0,0 +1,386 @@
+/**
+ * In-Memory Index Structures
+ *
+ * Building blocks for querying a local record store (see promoter-mirror.ts)
+ * without scanning every record. Think of a library: instead of walking every
+ * shelf, you check the catalogue cards — by author (hash), by year
+ * (sorted), or by "is it a paperback?" (bitmap).
+ *
+ * Every record lives in a numbered "slot" (0, 1, 2, ...). The indexes store
+ * slot numbers in typed arrays, so 100k records cost a few hundred KB of
+ * index memory rather than millions of small objects.
+ *
+ * Includes:
+ * - Bitset       — one bit per slot; AND/OR/AND-NOT combine filters
+ * - HashIndex    — exact-match lookup (id, email, ref_token, cust_id)
+ * - BitmapIndex  — one Bitset per low-cardinality value (state, campaign)
+ * - SortedIndex  — values sorted in a Float64Array for range filters and ordering
+ * - TopK         — the best k of many scored slots, without sorting them all
+ */
+
+// ============================================================================
+// BITSET
+// ============================================================================
+
+/**
+ * A growable set of small non-negative integers, 32 per Uint32 word.
+ */
+export class Bitset {
+  private words: Uint32Array;
+
+  constructor(capacity = 0) {
+    this.words = new Uint32Array(Math.max(1, Math.ceil(capacity / 32)));
+  }
+
+  /** A set holding every slot in [0, count). */
+  static full(count: number): Bitset {
+    const bits = new Bitset(count);
+    const whole = count >>> 5;
+    bits.words.fill(0xffffffff, 0, whole);
+    if (count & 31) bits.words[whole] = (1 << (count & 31)) - 1;
+    return bits;
+  }
+
+  set(slot: number): void {
+    const word = slot >>> 5;
+    if (word >= this.words.length) this.grow(word + 1);
+    this.words[word] |= 1 << (slot & 31);
+  }
+
+  clear(slot: number): void {
+    const word = slot >>> 5;
+    if (word < this.words.length) this.words[word] &= ~(1 << (slot & 31));
+  }
+
+  has(slot: number): boolean {
+    const word = slot >>> 5;
+    return word < this.words.length && (this.words[word] & (1 << (slot & 31))) !== 0;
+  }
+
+  /** Keep only slots also in `other` (in place). */
+  and(other: Bitset): this {
+    const w = this.words;
+    const o = other.words;
+    for (let i = 0; i < w.length; i++) w[i] &= i < o.length ? o[i] : 0;
+    return this;
+  }
+
+  /** Add every slot of `other` (in place). */
+  or(other: Bitset): this {
+    if (other.words.length > this.words.length) this.grow(other.words.length);
+    const w = this.words;
+    const o = other.words;
+    for (let i = 0; i < o.length; i++) w[i] |= o[i];
+    return this;
+  }
+
+  /** Remove every slot of `other` (in place). */
+  andNot(other: Bitset): this {
+    const w = this.words;
+    const o = other.words;
+    const n = Math.min(w.length, o.length);
+    for (let i = 0; i < n; i++) w[i] &= ~o[i];
+    return this;
+  }
+
+  clone(): Bitset {
+    const copy = new Bitset(0);
+    copy.words = this.words.slice();
+    return copy;
+  }
+
+  /** Number of slots in the set (population count). */
+  count(): number {
+    let total = 0;
+    for (let i = 0; i < this.words.length; i++) {
+      let v = this.words[i];
+      v = v - ((v >>> 1) & 0x55555555);
+      v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+      total += (((v + (v >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+    }
+    return total;
+  }
+
+  /** Number of slots in this set but not in `other`, without a copy. */
+  countAndNot(other: Bitset): number {
+    let total = 0;
+    for (let i = 0; i < this.words.length; i++) {
+      let v = i < other.words.length ? this.words[i] & ~other.words[i] : this.words[i];
+      v = v - ((v >>> 1) & 0x55555555);
+      v = (v & 0x33333333) + ((v >>> 2) & 0x33333333);
+      total += (((v + (v >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+    }
+    return total;
+  }
+
+  /** The slots in the set, ascending; skips empty words, so sparse sets are cheap. */
+  toArray(): number[] {
+    const slots: number[] = [];
+    for (let i = 0; i < this.words.length; i++) {
+      let v = this.words[i];
+      while (v !== 0) {
+        const low = v & -v;
+        slots.push(i * 32 + 31 - Math.clz32(low));
+        v ^= low;
+      }
+    }
+    return slots;
+  }
+
+  private grow(words: number): void {
+    const next = new Uint32Array(Math.max(words, this.words.length * 2));
+    next.set(this.words);
+    this.words = next;
+  }
+}
+
+// ============================================================================
+// HASH INDEX
+// ============================================================================
+
+/**
+ * Exact-match index from a key to the slots holding it. Most keys map to a
+ * single slot, stored as a plain number; duplicates upgrade to an array.
+ */
+export class HashIndex<K> {
+  private readonly map = new Map<K, number | number[]>();
+
+  add(key: K, slot: number): void {
+    const current = this.map.get(key);
+    if (current === undefined) {
+      this.map.set(key, slot);
+    } else if (typeof current === 'number') {
+      if (current !== slot) this.map.set(key, [current, slot]);
+    } else if (!current.includes(slot)) {
+      current.push(slot);
+    }
+  }
+
+  remove(key: K, slot: number): void {
+    const current = this.map.get(key);
+    if (current === slot) {
+      this.map.delete(key);
+    } else if (Array.isArray(current)) {
+      const rest = current.filter((s) => s !== slot);
+      this.map.set(key, rest.length === 1 ? rest[0] : rest);
+    }
+  }
+
+  get(key: K): readonly number[] {
+    const current = this.map.get(key);
+    if (current === undefined) return [];
+    return typeof current === 'number' ? [current] : current;
+  }
+
+  get size(): number {
+    return this.map.size;
+  }
+}
+
+// ============================================================================
+// BITMAP INDEX
+// ============================================================================
+
+/**
+ * One Bitset per distinct value — ideal for fields with few values
+ * (state, campaign membership, fraud flags). A slot may carry several values.
+ */
+export class BitmapIndex<K> {
+  private readonly bitmaps = new Map<K, Bitset>();
+
+  add(key: K, slot: number): void {
+    let bits = this.bitmaps.get(key);
+    if (!bits) {
+      bits = new Bitset(slot + 1);
+      this.bitmaps.set(key, bits);
+    }
+    bits.set(slot);
+  }
+
+  remove(key: K, slot: number): void {
+    this.bitmaps.get(key)?.clear(slot);
+  }
+
+  /** Slots with this value; an empty set for unknown values. */
+  get(key: K): Bitset {
+    return this.bitmaps.get(key) ?? new Bitset(0);
+  }
+
+  /** Slots having any of the given values. */
+  any(keys: Iterable<K>): Bitset {
+    const result = new Bitset(0);
+    for (const key of keys) {
+      const bits = this.bitmaps.get(key);
+      if (bits) result.or(bits);
+    }
+    return result;
+  }
+}
+
+// ============================================================================
+// SORTED INDEX
+// ============================================================================
+
+/**
+ * Slots ordered by a numeric value (ties broken by a secondary key), kept as
+ * parallel typed arrays. Slots whose value is NaN (missing) are left out.
+ *
+ * Rebuilt in one O(n log n) pass rather than maintained per insert: callers
+ * mark it dirty on change and rebuild lazily before the next query.
+ */
+export class SortedIndex {
+  private values = new Float64Array(0);
+  private slots = new Uint32Array(0);
+  private present = new Bitset(0);
+  dirty = true;
+
+  /**
+   * @param slotCount - Number of slots to consider (0 .. slotCount-1)
+   * @param valueOf - Value for a slot, or NaN if missing / slot unused
+   * @param tieBreak - Secondary ascending key for equal values (e.g. record id)
+   */
+  build(slotCount: number, valueOf: (slot: number) => number, tieBreak: (slot: number) => number): void {
+    const raw = new Float64Array(slotCount);
+    const order: number[] = [];
+    const present = new Bitset(slotCount);
+
+    for (let slot = 0; slot < slotCount; slot++) {
+      const value = valueOf(slot);
+      raw[slot] = value;
+      if (!Number.isNaN(value)) {
+        order.push(slot);
+        present.set(slot);
+      }
+    }
+    order.sort((a, b) => raw[a] - raw[b] || tieBreak(a) - tieBreak(b));
+
+    this.slots = Uint32Array.from(order);
+    this.values = new Float64Array(order.length);
+    for (let i = 0; i < order.length; i++) this.values[i] = raw[order[i]];
+    this.present = present;
+    this.dirty = false;
+  }
+
+  get size(): number {
+    return this.slots.length;
+  }
+
+  /** True if the slot has a (non-missing) value. */
+  has(slot: number): boolean {
+    return this.present.has(slot);
+  }
+
+  /** Slots whose value lies in [from, to] (either bound optional). */
+  range(from?: number, to?: number): Bitset {
+    const start = from === undefined ? 0 : this.lowerBound(from);
+    const end = to === undefined ? this.values.length : this.upperBound(to);
+    const result = new Bitset(0);
+    for (let i = start; i < end; i++) result.set(this.slots[i]);
+    return result;
+  }
+
+  /**
+   * Visit slots in value order until the callback returns false.
+   */
+  scan(direction: 'asc' | 'desc', visit: (slot: number) => boolean): void {
+    if (direction === 'asc') {
+      for (let i = 0; i < this.slots.length; i++) if (!visit(this.slots[i])) return;
+    } else {
+      for (let i = this.slots.length - 1; i >= 0; i--) if (!visit(this.slots[i])) return;
+    }
+  }
+
+  /** First position with value >= target. */
+  private lowerBound(target: number): number {
+    let lo = 0;
+    let hi = this.values.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      if (this.values[mid] < target) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+
+  /** First position with value > target. */
+  private upperBound(target: number): number {
+    let lo = 0;
+    let hi = this.values.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      if (this.values[mid] <= target) lo = mid + 1; else hi = mid;
+    }
+    return lo;
+  }
+}
+
+// ============================================================================
+// TOP-K
+// ============================================================================
+
+/**
+ * The k best slots by score (ties: higher tie-break first), kept in a
+ * min-heap of size k — like a podium that only lets someone on by pushing
+ * the current last place off. O(n log k) instead of sorting all n matches.
+ */
+export class TopK {
+  private readonly slots: number[] = [];
+  private readonly scores: number[] = [];
+  private readonly ties: number[] = [];
+
+  constructor(private readonly k: number) {}
+
+  offer(slot: number, score: number, tie: number): void {
+    if (this.k <= 0) return;
+    if (this.slots.length < this.k) {
+      this.slots.push(slot);
+      this.scores.push(score);
+      this.ties.push(tie);
+      this.siftUp(this.slots.length - 1);
+    } else if (score > this.scores[0] || (score === this.scores[0] && tie > this.ties[0])) {
+      this.slots[0] = slot;
+      this.scores[0] = score;
+      this.ties[0] = tie;
+      this.siftDown(0);
+    }
+  }
+
+  /** The kept slots, best first. */
+  sorted(): number[] {
+    return this.slots
+      .map((_, i) => i)
+      .sort((a, b) => this.scores[b] - this.scores[a] || this.ties[b] - this.ties[a])
+      .map((i) => this.slots[i]);
+  }
+
+  private worse(a: number, b: number): boolean {
+    return this.scores[a] < this.scores[b] || (this.scores[a] === this.scores[b] && this.ties[a] < this.ties[b]);
+  }
+
+  private swap(a: number, b: number): void {
+    [this.slots[a], this.slots[b]] = [this.slots[b], this.slots[a]];
+    [this.scores[a], this.scores[b]] = [this.scores[b], this.scores[a]];
+    [this.ties[a], this.ties[b]] = [this.ties[b], this.ties[a]];
+  }
+
+  private siftUp(i: number): void {
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!this.worse(i, parent)) return;
+      this.swap(i, parent);
+      i = parent;
+    }
+  }
+
+  private siftDown(i: number): void {
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let worst = i;
+      if (left < this.slots.length && this.worse(left, worst)) worst = left;
+      if (right < this.slots.length && this.worse(right, worst)) worst = right;
+      if (worst === i) return;
+      this.swap(i, worst);
+      i = worst;
+    }
+  }
+}
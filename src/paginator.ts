@@ -0,0 +1,315 @@
+/**
+ * Auto-Pagination
+ *
+ * FirstPromoter list endpoints return one page at a time. This file walks
+ * through the pages for you and hands back records one by one, like a
+ * conveyor belt that keeps bringing plates until you say "enough".
+ *
+ * Includes:
+ * - Paginator — an async iterator over records across all pages
+ * - Stops at a record limit or a byte limit (whichever comes first), or
+ *   when a page repeats the previous one (an endpoint that ignores `page`)
+ * - fetchAllPages() — collects everything into one aggregated result
+ * - Parallel prefetching of upcoming pages once total_pages is known,
+ *   with concurrency sized by the remaining rate-limit budget; pages still
+ *   in flight when the walk stops early are cancelled
+ * - mapConcurrent() — a small worker pool for bulk tools that fire many
+ *   independent requests (one per identifier, one per chunk of IDs)
+ *
+ * Every page goes through callFirstPromoterAPI, so the shared rate limiter,
+ * cache, retry logic and cancellation apply to each page request. Both
+ * report MCP progress (pages, or items done) when the tool call asked for it.
+ */
+
+import { callFirstPromoterAPI, getRateLimitHeadroom } from './api.js';
+import { startProgress, withPriority, withSignal } from './request-context.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// The API allows up to 100 records per page
+const PAGE_SIZE = 100;
+
+// Safety caps for fetch_all mode when the caller does not pass limits
+export const DEFAULT_MAX_RECORDS = 10_000;
+export const DEFAULT_MAX_BYTES = 20 * 1024 * 1024; // 20 MB of raw JSON
+
+// Upper bound on pages fetched ahead of the one being consumed
+const MAX_PREFETCH = 8;
+
+// Prefetching may use at most this share of the currently free rate budget,
+// leaving the rest for interactive tool calls
+const PREFETCH_BUDGET_SHARE = 0.25;
+
+/**
+ * How many pages to fetch ahead, based on the rate-limit headroom.
+ * With a full budget (380 free) this is MAX_PREFETCH; near the limit it
+ * drops to 0 and pages are fetched one at a time.
+ */
+function prefetchDepth(): number {
+  const headroom = Math.floor(getRateLimitHeadroom('bulk') * PREFETCH_BUDGET_SHARE);
+  return Math.max(0, Math.min(MAX_PREFETCH, headroom));
+}
+
+// ============================================================================
+// PAGINATOR
+// ============================================================================
+
+export interface PaginateOptions {
+  queryParams?: Record<string, string>;
+  maxRecords?: number;
+  maxBytes?: number;
+  cache?: boolean;      // false: pages bypass the response caches
+}
+
+/**
+ * Extracts the record array from either response shape the API uses:
+ * a flat array, or { data: [...], meta: {...} } (promoters).
+ */
+function extractPage(result: unknown): { records: Record<string, unknown>[]; meta?: Record<string, unknown> } {
+  if (Array.isArray(result)) {
+    return { records: result as Record<string, unknown>[] };
+  }
+  const raw = result as Record<string, unknown> | null;
+  return {
+    records: Array.isArray(raw?.data) ? raw.data as Record<string, unknown>[] : [],
+    meta: raw?.meta as Record<string, unknown> | undefined,
+  };
+}
+
+/**
+ * The page's record ids in order, to tell a repeated page from a new one;
+ * undefined when the page is empty or a record has no id.
+ */
+function pageIds(records: Record<string, unknown>[]): string | undefined {
+  if (records.length === 0 || records.some((record) => record.id === undefined)) return undefined;
+  return records.map((record) => String(record.id)).join(',');
+}
+
+/**
+ * Iterates over every record of a list endpoint, page by page.
+ *
+ * Usage:
+ *   const pager = new Paginator('/promoters', { queryParams, maxRecords: 500 });
+ *   for await (const promoter of pager) { ... }
+ *   pager.truncated // true if a limit stopped us before the last page
+ */
+export class Paginator implements AsyncIterable<Record<string, unknown>> {
+  pages = 0;            // pages fetched so far
+  records = 0;          // records yielded so far
+  bytes = 0;            // approximate JSON size of yielded records
+  truncated = false;    // stopped by maxRecords / maxBytes, or a repeated page
+  prefetched = 0;       // pages requested ahead of consumption
+  prefetchCancelled = 0; // prefetched pages dropped because the walk stopped early
+  lastMeta: Record<string, unknown> | undefined;
+
+  private readonly maxRecords: number;
+  private readonly maxBytes: number;
+
+  constructor(
+    private readonly endpoint: string,
+    private readonly options: PaginateOptions = {},
+  ) {
+    this.maxRecords = options.maxRecords ?? Infinity;
+    this.maxBytes = options.maxBytes ?? Infinity;
+  }
+
+  async *[Symbol.asyncIterator](): AsyncGenerator<Record<string, unknown>> {
+    const trackBytes = Number.isFinite(this.maxBytes);
+
+    // Never fetch pages beyond what maxRecords could possibly need
+    const pageLimit = Number.isFinite(this.maxRecords)
+      ? Math.ceil(this.maxRecords / PAGE_SIZE)
+      : Infinity;
+
+    // Pages requested ahead of time, keyed by page number. Aborted once the
+    // walk ends, so a limit or an early break does not leave them running.
+    const inFlight = new Map<number, Promise<unknown>>();
+    const prefetch = new AbortController();
+    const progress = startProgress();
+
+    // Largest page seen so far: the endpoint's real page size, in case it
+    // does not honour per_page
+    let pageSize = 0;
+
+    // Ids of the previous page: an endpoint that ignores `page` hands back
+    // the same records every time, which would otherwise repeat them until
+    // the record or byte cap
+    let previousIds: string | undefined;
+
+    try {
+      for (let page = 1; ; page++) {
+        const result = await (inFlight.get(page) ?? this.fetchPage(page));
+        inFlight.delete(page);
+
+        const { records, meta } = extractPage(result);
+        this.pages++;
+        this.lastMeta = meta;
+
+        const ids = pageIds(records);
+        if (ids !== undefined && ids === previousIds) {
+          this.truncated = true;
+          return;
+        }
+        previousIds = ids;
+
+        // Once total_pages is known, start pulling the next pages concurrently
+        // while the caller is still consuming this one
+        const totalPages = typeof meta?.total_pages === 'number' ? meta.total_pages : undefined;
+        const expectedPages = totalPages !== undefined ? Math.min(totalPages, pageLimit) : undefined;
+        progress.update(page, expectedPages, `Fetched page ${page} of ${expectedPages ?? '?'}`);
+        if (totalPages !== undefined) {
+          const lastPage = Math.min(totalPages, pageLimit, page + prefetchDepth());
+          for (let next = page + 1; next <= lastPage; next++) {
+            if (inFlight.has(next)) continue;
+            const request = withSignal(prefetch.signal, () => this.fetchPage(next));
+            // Avoid unhandled rejections if we stop before awaiting this page;
+            // the error still surfaces when (and if) the page is awaited
+            request.catch(() => {});
+            inFlight.set(next, request);
+            this.prefetched++;
+          }
+        }
+
+        for (const record of records) {
+          if (this.records >= this.maxRecords) {
+            this.truncated = true;
+            return;
+          }
+          if (trackBytes) {
+            const size = Buffer.byteLength(JSON.stringify(record));
+            if (this.bytes + size > this.maxBytes) {
+              this.truncated = true;
+              return;
+            }
+            this.bytes += size;
+          }
+          this.records++;
+          yield record;
+        }
+
+        // The last page: as counted by meta, else an empty page or one
+        // shorter than those before it (a short first page is not trusted,
+        // since not every endpoint is known to honour per_page)
+        const isLast = totalPages !== undefined
+          ? page >= totalPages
+          : records.length === 0 || records.length < pageSize;
+        if (isLast) return;
+        pageSize = Math.max(pageSize, records.length);
+
+        // Limit reached exactly at a page boundary — don't fetch another page just to find out
+        if (this.records >= this.maxRecords) {
+          this.truncated = true;
+          return;
+        }
+      }
+    } finally {
+      this.prefetchCancelled += inFlight.size;
+      prefetch.abort();
+      progress.end();
+    }
+  }
+
+  /**
+   * Page 1 runs at the caller's priority; later pages and prefetches are
+   * bulk work, so they yield to interactive calls near the rate limit.
+   */
+  private fetchPage(page: number): Promise<unknown> {
+    const fetch = () => callFirstPromoterAPI(this.endpoint, {
+      queryParams: {
+        ...this.options.queryParams,
+        page: page.toString(),
+        per_page: PAGE_SIZE.toString(),
+      },
+      cache: this.options.cache,
+    });
+    return page === 1 ? fetch() : withPriority('bulk', fetch);
+  }
+}
+
+// ============================================================================
+// FETCH ALL
+// ============================================================================
+
+export interface FetchAllResult {
+  records: Record<string, unknown>[];
+  pages: number;
+  truncated: boolean;
+  meta?: Record<string, unknown>;
+}
+
+/**
+ * Collects every record of a list endpoint into a single array,
+ * applying the default safety caps unless the caller overrides them.
+ */
+export async function fetchAllPages(endpoint: string, options: PaginateOptions = {}): Promise<FetchAllResult> {
+  const pager = new Paginator(endpoint, {
+    ...options,
+    maxRecords: options.maxRecords ?? DEFAULT_MAX_RECORDS,
+    maxBytes: options.maxBytes ?? DEFAULT_MAX_BYTES,
+  });
+
+  const records: Record<string, unknown>[] = [];
+  for await (const record of pager) {
+    records.push(record);
+  }
+
+  return {
+    records,
+    pages: pager.pages,
+    truncated: pager.truncated,
+    meta: pager.lastMeta,
+  };
+}
+
+// ============================================================================
+// BULK REQUESTS
+// ============================================================================
+
+// Upper bound on independent requests a bulk tool keeps in flight
+const MAX_BULK_CONCURRENCY = 8;
+
+/**
+ * How many bulk requests to run at once: like prefetchDepth, a share of the
+ * free rate budget, but always at least 1 so the work still progresses.
+ */
+export function bulkConcurrency(): number {
+  const headroom = Math.floor(getRateLimitHeadroom('bulk') * PREFETCH_BUDGET_SHARE);
+  return Math.max(1, Math.min(MAX_BULK_CONCURRENCY, headroom));
+}
+
+/**
+ * Runs fn over every item with at most `concurrency` calls in flight —
+ * like a few checkout lanes serving one queue. One failure does not stop
+ * the others. The calls run as bulk work in the rate limiter.
+ *
+ * @returns One settled result per item, in input order
+ */
+export async function mapConcurrent<T, R>(
+  items: readonly T[],
+  concurrency: number,
+  fn: (item: T, index: number) => Promise<R>,
+): Promise<PromiseSettledResult<R>[]> {
+  const results: PromiseSettledResult<R>[] = new Array(items.length);
+  const progress = startProgress();
+  let next = 0;
+  let finished = 0;
+
+  const worker = async (): Promise<void> => {
+    while (next < items.length) {
+      const index = next++;
+      try {
+        results[index] = { status: 'fulfilled', value: await withPriority('bulk', () => fn(items[index], index)) };
+      } catch (reason) {
+        results[index] = { status: 'rejected', reason };
+      }
+      progress.update(++finished, items.length, `${finished} of ${items.length} done`);
+    }
+  };
+
+  const workers = Math.max(1, Math.min(concurrency, items.length));
+  await Promise.all(Array.from({ length: workers }, worker));
+  progress.end();
+  return results;
+}
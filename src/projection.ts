@@ -0,0 +1,144 @@
+/**
+ * Field Projection (sparse fieldsets)
+ *
+ * Promoter, referral, commission and payout objects carry many nested
+ * fields, but most questions only need a handful. A projection keeps just
+ * the requested paths — like cutting the relevant columns out of a big
+ * spreadsheet before handing it over.
+ *
+ * Paths use dot notation and step through arrays transparently:
+ *   "email"                          → record.email
+ *   "stats.revenue_amount"           → record.stats.revenue_amount
+ *   "promoter_campaigns.campaign.name" → name of every campaign in the array
+ *
+ * A list of paths is compiled once into a tree of small closures, so
+ * projecting a 100-record page is a straight walk with no string parsing.
+ * Compiled projectors are memoized by their path list.
+ */
+
+// ============================================================================
+// TYPES
+// ============================================================================
+
+export type Projector = (value: unknown) => unknown;
+
+// A path tree: each key maps to a subtree, or to null meaning "keep whole value"
+interface PathTree {
+  [key: string]: PathTree | null;
+}
+
+// Fields that are always kept so projected records stay identifiable
+const ALWAYS_KEPT = ['id'];
+
+// Memoized projectors; cleared wholesale if it ever grows this large
+const MAX_COMPILED = 128;
+const compiled = new Map<string, Projector>();
+
+// ============================================================================
+// COMPILATION
+// ============================================================================
+
+/**
+ * Builds a path tree. A shorter path wins over a longer one that it
+ * contains ("stats" + "stats.sales_count" keeps all of stats).
+ */
+function buildTree(paths: string[]): PathTree {
+  const root: PathTree = {};
+
+  for (const path of paths) {
+    const segments = path.split('.').map((s) => s.trim()).filter(Boolean);
+    let node: PathTree = root;
+
+    for (let i = 0; i < segments.length; i++) {
+      const key = segments[i];
+      if (i === segments.length - 1) {
+        node[key] = null;
+        break;
+      }
+      const child = node[key];
+      if (child === null) break;  // an ancestor is already kept whole
+      node = child ?? (node[key] = {});
+    }
+  }
+
+  return root;
+}
+
+/**
+ * Turns a path tree into a projector closure. Arrays are mapped element by
+ * element; primitives pass through unchanged; missing keys are skipped.
+ */
+function compileTree(tree: PathTree): Projector {
+  const steps: [string, Projector | null][] = Object.entries(tree)
+    .map(([key, child]) => [key, child ? compileTree(child) : null]);
+
+  const project: Projector = (value) => {
+    if (Array.isArray(value)) return value.map(project);
+    if (value === null || typeof value !== 'object') return value;
+
+    const source = value as Record<string, unknown>;
+    const result: Record<string, unknown> = {};
+    for (const [key, child] of steps) {
+      if (!(key in source)) continue;
+      result[key] = child ? child(source[key]) : source[key];
+    }
+    return result;
+  };
+
+  return project;
+}
+
+/**
+ * Compiles (or reuses) a projector for the given paths.
+ * "id" is always kept so records can still be told apart.
+ */
+export function compileProjection(paths: string[]): Projector {
+  const normalized = [...new Set([...ALWAYS_KEPT, ...paths.map((p) => p.trim())])]
+    .filter(Boolean)
+    .sort();
+  const key = normalized.join(',');
+
+  let projector = compiled.get(key);
+  if (!projector) {
+    if (compiled.size >= MAX_COMPILED) compiled.clear();
+    projector = compileTree(buildTree(normalized));
+    compiled.set(key, projector);
+  }
+  return projector;
+}
+
+// ============================================================================
+// HELPERS
+// ============================================================================
+
+/**
+ * Applies a projector to the records of a list response, leaving
+ * pagination metadata untouched. Handles a flat array or { data, meta }.
+ */
+export function projectRecords(result: unknown, projector: Projector): unknown {
+  if (Array.isArray(result)) return result.map(projector);
+
+  const raw = result as Record<string, unknown> | null;
+  if (raw && Array.isArray(raw.data)) {
+    return { ...raw, data: raw.data.map(projector) };
+  }
+  return projector(result);
+}
+
+/**
+ * Reads a dot path from a value, stepping through arrays.
+ * Returns an array of values when the path crosses an array.
+ */
+export function readPath(value: unknown, path: string): unknown {
+  let current: unknown = value;
+  for (const segment of path.split('.')) {
+    if (Array.isArray(current)) {
+      current = current.map((item) => readPath(item, segment));
+    } else if (current !== null && typeof current === 'object') {
+      current = (current as Record<string, unknown>)[segment];
+    } else {
+      return undefined;
+    }
+  }
+  return current;
+}
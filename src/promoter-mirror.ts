@@ -0,0 +1,791 @@
+/**
+ * Local Promoter Mirror (optional)
+ *
+ * Keeps a copy of every promoter in memory and answers get_promoters
+ * filters locally — like keeping a printed phone book on your desk instead
+ * of calling directory assistance each time. The book is refreshed
+ * regularly, and if it is too old we call the real directory again.
+ *
+ * Enabled with FP_PROMOTER_MIRROR=true. How it stays current:
+ * - Initial bulk load through the paginator (all pages, active + archived)
+ * - Incremental syncs every FP_MIRROR_SYNC_INTERVAL_MS that only fetch
+ *   promoters whose updated_at moved since the last sync
+ * - A full reload every FP_MIRROR_FULL_SYNC_INTERVAL_MS, which also drops
+ *   promoters that were deleted upstream
+ * - Mutations made through this server (any family that affects promoters)
+ *   mark the mirror stale and trigger an immediate incremental sync
+ *
+ * Syncs run at background priority in the rate limiter, detached from the
+ * tool call that may have triggered them (see request-context.ts), and
+ * bypass the response caches so a full load does not evict interactive
+ * entries.
+ *
+ * Promoter stats (revenue, customers, referrals, clicks) change without
+ * bumping updated_at, so incremental syncs miss them. Filters and sorts on
+ * stats are only answered locally while the last full sync is recent
+ * enough, and their meta reports the full sync's age.
+ *
+ * Queries run against secondary indexes (see PromoterTable and indexes.ts)
+ * rather than scanning every promoter, so they stay fast at 100k+ rows.
+ *
+ * Free-text `q` searches use a local inverted index (search-index.ts) with
+ * prefix and typo-tolerant matching, ranked by relevance. Searches it
+ * cannot answer in full (a one- or two-letter prefix matching hundreds of
+ * words, or no searchable terms) go to the API rather than return a subset.
+ *
+ * Queries the mirror cannot answer faithfully (W-form, custom field or
+ * parent filters) or arriving while it is stale return
+ * undefined, and the caller falls back to the live API.
+ */
+
+import { Paginator } from './paginator.js';
+import { Bitset, HashIndex, BitmapIndex, SortedIndex, TopK } from './indexes.js';
+import { SearchIndex, type SearchField, type SearchIndexStats } from './search-index.js';
+import { responseCache } from './cache.js';
+import { logger } from './logger.js';
+import { runInBackground } from './request-context.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : fallback;
+}
+
+const MIRROR_ENABLED = ['1', 'true', 'yes'].includes((process.env.FP_PROMOTER_MIRROR || '').toLowerCase());
+
+const SYNC_INTERVAL_MS = envInt('FP_MIRROR_SYNC_INTERVAL_MS', 5 * 60_000);
+const FULL_SYNC_INTERVAL_MS = envInt('FP_MIRROR_FULL_SYNC_INTERVAL_MS', 24 * 60 * 60_000);
+
+// Older than this, queries go to the live API instead
+const MAX_STALENESS_MS = envInt('FP_MIRROR_MAX_STALENESS_MS', 15 * 60_000);
+
+// Safety cap on mirrored promoters
+const MAX_RECORDS = envInt('FP_MIRROR_MAX_RECORDS', 200_000);
+
+// Incremental syncs re-read a little before the last sync started, so
+// updates committed while the previous sync was running are not missed
+const SYNC_OVERLAP_MS = 60_000;
+
+// The API's default page size for get_promoters
+const DEFAULT_PER_PAGE = 20;
+
+// Matches up to this many are sorted directly; larger sets walk a sort
+// index, which stops as soon as the page is full
+const SMALL_RESULT_SET = 4096;
+
+// ============================================================================
+// ROW MODEL
+// ============================================================================
+
+/**
+ * A promoter plus the fields queries filter on, pre-extracted once at
+ * sync time so indexing never has to dig through nested objects.
+ */
+export interface PromoterRow {
+  id: number;
+  record: Record<string, unknown>;
+  email: string;        // lowercased
+  custId: string;
+  refTokens: string[];
+  state: string;
+  archived: boolean;
+  campaignIds: number[];
+  fraudSuspicions: string[];
+  revenue: number;
+  customers: number;
+  referrals: number;
+  clicks: number;
+  joinedAt: number;     // epoch ms, NaN if missing
+  lastLoginAt: number;  // epoch ms, NaN if missing
+}
+
+function toNumber(value: unknown): number {
+  return typeof value === 'number' ? value : NaN;
+}
+
+/**
+ * Parses API timestamps and filter values alike ("2024-01-01 10:00:00",
+ * "2024-01-01T10:00:00Z", "2024-01-01"). Values without a zone are UTC.
+ */
+function toTime(value: unknown): number {
+  if (typeof value !== 'string' || !value) return NaN;
+  const iso = value.includes('T') ? value : value.replace(' ', 'T');
+  return Date.parse(/[zZ]|[+-]\d\d:?\d\d$/.test(iso) || iso.length <= 10 ? iso : `${iso}Z`);
+}
+
+/**
+ * Text fields searched by `q`, weighted by how strongly a hit identifies
+ * the promoter (an email or ref_token match beats a custom field match).
+ */
+function searchFields(record: Record<string, unknown>): SearchField[] {
+  const profile = (record.profile ?? {}) as Record<string, unknown>;
+  const campaigns = Array.isArray(record.promoter_campaigns)
+    ? record.promoter_campaigns as Record<string, unknown>[]
+    : [];
+  const customFields = (record.custom_fields ?? {}) as Record<string, unknown>;
+  const text = (value: unknown) => (typeof value === 'string' || typeof value === 'number' ? String(value) : '');
+
+  return [
+    { text: text(record.email), weight: 3 },
+    ...campaigns.map((pc) => ({ text: text(pc.ref_token), weight: 3 })),
+    { text: text(record.name), weight: 2.5 },
+    { text: text(profile.company_name ?? profile.company), weight: 2 },
+    ...campaigns.map((pc) => ({ text: text(pc.coupon), weight: 2 })),
+    { text: text(profile.website), weight: 1.5 },
+    ...Object.values(customFields).map((value) => ({ text: text(value), weight: 1 })),
+  ].filter((field) => field.text !== '');
+}
+
+export function toRow(record: Record<string, unknown>): PromoterRow | undefined {
+  const id = record.id;
+  if (typeof id !== 'number') return undefined;
+
+  const stats = (record.stats ?? {}) as Record<string, unknown>;
+  const campaigns = Array.isArray(record.promoter_campaigns)
+    ? record.promoter_campaigns as Record<string, unknown>[]
+    : [];
+
+  return {
+    id,
+    record,
+    email: typeof record.email === 'string' ? record.email.toLowerCase() : '',
+    custId: typeof record.cust_id === 'string' ? record.cust_id : '',
+    refTokens: campaigns
+      .map((pc) => pc.ref_token)
+      .filter((token): token is string => typeof token === 'string' && token !== ''),
+    state: typeof record.state === 'string' ? record.state : 'not_set',
+    archived: record.archived_at != null,
+    campaignIds: campaigns
+      .map((pc) => toNumber((pc.campaign as Record<string, unknown> | undefined)?.id ?? pc.campaign_id))
+      .filter((cid) => !Number.isNaN(cid)),
+    fraudSuspicions: Array.isArray(record.fraud_suspicions) ? record.fraud_suspicions as string[] : [],
+    revenue: toNumber(stats.revenue_amount),
+    customers: toNumber(stats.customers_count),
+    referrals: toNumber(stats.referrals_count),
+    clicks: toNumber(stats.clicks_count),
+    joinedAt: toTime(record.joined_at),
+    lastLoginAt: toTime(record.last_login_at),
+  };
+}
+
+// ============================================================================
+// QUERY
+// ============================================================================
+
+/**
+ * The get_promoters arguments the mirror understands. Field names match the
+ * tool's input schema so the handler can pass its args straight through.
+ */
+export interface PromoterQuery {
+  q?: string;
+  ids?: number[];
+  page?: number;
+  per_page?: number;
+  state?: string;
+  campaign_id?: number;
+  parent_promoter_id?: number;
+  archived?: boolean;
+  has_wform?: string;
+  subscribed_to_email?: boolean;
+  custom_field1?: string;
+  custom_field2?: string;
+  fraud_suspicions?: string[];
+  revenue_amount_from?: number;
+  revenue_amount_to?: number;
+  customers_count_from?: number;
+  customers_count_to?: number;
+  referrals_count_from?: number;
+  referrals_count_to?: number;
+  clicks_count_from?: number;
+  clicks_count_to?: number;
+  joined_at_from?: string;
+  joined_at_to?: string;
+  last_login_at_from?: string;
+  last_login_at_to?: string;
+  sort_by?: 'clicks_count' | 'referrals_count' | 'customers_count' | 'revenue_amount' | 'joined_at';
+  sort_direction?: 'asc' | 'desc';
+}
+
+// Filters only the live API can evaluate
+const UNSUPPORTED_FILTERS: (keyof PromoterQuery)[] = [
+  'parent_promoter_id', 'has_wform', 'subscribed_to_email', 'custom_field1', 'custom_field2',
+];
+
+// Filters and sorts on promoter stats, which only full syncs refresh
+const STATS_FILTERS: (keyof PromoterQuery)[] = [
+  'revenue_amount_from', 'revenue_amount_to', 'customers_count_from', 'customers_count_to',
+  'referrals_count_from', 'referrals_count_to', 'clicks_count_from', 'clicks_count_to',
+];
+const STATS_SORTS = new Set<PromoterQuery['sort_by']>(['clicks_count', 'referrals_count', 'customers_count', 'revenue_amount']);
+
+function readsStats(query: PromoterQuery): boolean {
+  return STATS_SORTS.has(query.sort_by) || STATS_FILTERS.some((f) => query[f] !== undefined);
+}
+
+// Numeric row fields with a sorted index
+type SortedField = 'id' | 'revenue' | 'customers' | 'referrals' | 'clicks' | 'joinedAt' | 'lastLoginAt';
+const SORTED_FIELDS: SortedField[] = ['id', 'revenue', 'customers', 'referrals', 'clicks', 'joinedAt', 'lastLoginAt'];
+
+const SORT_KEYS: Record<NonNullable<PromoterQuery['sort_by']>, SortedField> = {
+  clicks_count: 'clicks',
+  referrals_count: 'referrals',
+  customers_count: 'customers',
+  revenue_amount: 'revenue',
+  joined_at: 'joinedAt',
+};
+
+// Exact-match lookups backed by a hash index
+export type PromoterLookupField = 'id' | 'email' | 'ref_token' | 'cust_id';
+
+/**
+ * Range filters of a query as [sorted field, from, to] — dates already
+ * parsed to epoch ms. Returns undefined if a date cannot be parsed, so the
+ * live API can report the problem instead.
+ */
+function rangeFilters(query: PromoterQuery): [SortedField, number | undefined, number | undefined][] | undefined {
+  const time = (value: string | undefined) => (value ? toTime(value) : undefined);
+  const ranges: [SortedField, number | undefined, number | undefined][] = [
+    ['revenue', query.revenue_amount_from, query.revenue_amount_to],
+    ['customers', query.customers_count_from, query.customers_count_to],
+    ['referrals', query.referrals_count_from, query.referrals_count_to],
+    ['clicks', query.clicks_count_from, query.clicks_count_to],
+    ['joinedAt', time(query.joined_at_from), time(query.joined_at_to)],
+    ['lastLoginAt', time(query.last_login_at_from), time(query.last_login_at_to)],
+  ];
+  if (ranges.some(([, from, to]) => Number.isNaN(from) || Number.isNaN(to))) return undefined;
+  return ranges.filter(([, from, to]) => from !== undefined || to !== undefined);
+}
+
+// ============================================================================
+// PROMOTER TABLE
+// ============================================================================
+
+/**
+ * Promoter rows stored in numbered slots, with secondary indexes:
+ * - hash: id, email, ref_token, cust_id
+ * - bitmap: state, archived, campaign membership, fraud suspicions
+ * - full text: name, email, company, website, ref_token, coupon, custom fields
+ * - sorted: revenue, customers, referrals, clicks, joined_at, last_login_at, id
+ *
+ * Hash and bitmap indexes are updated on every upsert; sorted indexes are
+ * rebuilt lazily by the first query after a change.
+ *
+ * Exported for scripts/bench-promoter-indexes.ts; the server only uses it
+ * through PromoterMirror.
+ */
+export class PromoterTable {
+  private readonly slots: PromoterRow[] = [];
+  private readonly byId = new Map<number, number>();
+  private readonly byEmail = new HashIndex<string>();
+  private readonly byRefToken = new HashIndex<string>();
+  private readonly byCustId = new HashIndex<string>();
+  private readonly state = new BitmapIndex<string>();
+  private readonly campaign = new BitmapIndex<number>();
+  private readonly fraud = new BitmapIndex<string>();
+  private readonly archived = new Bitset();
+  private readonly search = new SearchIndex();
+  private readonly sorted = new Map<SortedField, SortedIndex>(
+    SORTED_FIELDS.map((field) => [field, new SortedIndex()])
+  );
+  private pendingCount: number | undefined;
+  lastIndexBuildMs = 0;
+
+  get size(): number {
+    return this.slots.length;
+  }
+
+  /**
+   * Insert a promoter, or replace it in its existing slot.
+   */
+  upsert(row: PromoterRow): void {
+    let slot = this.byId.get(row.id);
+    if (slot === undefined) {
+      slot = this.slots.length;
+      this.byId.set(row.id, slot);
+    } else {
+      this.unindex(this.slots[slot], slot);
+    }
+    this.slots[slot] = row;
+    this.index(row, slot);
+    for (const index of this.sorted.values()) index.dirty = true;
+    this.pendingCount = undefined;
+  }
+
+  /**
+   * Exact-match lookup through a hash index.
+   */
+  lookup(field: PromoterLookupField, value: string | number): Record<string, unknown>[] {
+    let slots: readonly number[];
+    switch (field) {
+      case 'id': {
+        const slot = this.byId.get(Number(value));
+        slots = slot === undefined ? [] : [slot];
+        break;
+      }
+      case 'email': slots = this.byEmail.get(String(value).toLowerCase()); break;
+      case 'ref_token': slots = this.byRefToken.get(String(value)); break;
+      case 'cust_id': slots = this.byCustId.get(String(value)); break;
+    }
+    return slots.map((slot) => this.slots[slot].record);
+  }
+
+  /**
+   * Evaluate the filters with the indexes, then walk the sort index only as
+   * far as the requested page needs.
+   * @returns undefined if a filter value or the search cannot be evaluated
+   *          locally (no searchable terms, or a prefix too broad for the index)
+   */
+  query(query: PromoterQuery, page: number, perPage: number):
+    { rows: PromoterRow[]; total: number; pending: number } | undefined {
+    const ranges = rangeFilters(query);
+    if (!ranges) return undefined;
+
+    // Full-text search: matches are also the default ranking
+    let scores: Map<number, number> | undefined;
+    if (query.q) {
+      scores = this.search.search(query.q);
+      if (!scores) return undefined;
+    }
+
+    // Unarchived pending promoters, for meta.pending_count; kept until the
+    // next upsert so a selective query does not pay for a full-table count
+    this.pendingCount ??= this.state.get('pending').countAndNot(this.archived);
+    const pending = this.pendingCount;
+
+    // An ids list names its few candidates: take them from the hash index
+    // and check each filter on the row, without touching the other rows
+    if (query.ids) {
+      const slots = new Set(query.ids.map((id) => this.byId.get(id))
+        .filter((slot): slot is number => slot !== undefined && this.matches(this.slots[slot], query, ranges)));
+      if (scores && !query.sort_by) return this.ranked(scores, (slot) => slots.has(slot), page, perPage, pending);
+      const matched = [...slots].filter((slot) => !scores || scores.has(slot));
+      return this.page(matched, matched.length, query, page, perPage, pending);
+    }
+
+    // Candidate set: start from archived / not archived, then AND each filter
+    const candidates = Bitset.full(this.slots.length);
+    if (query.archived) candidates.and(this.archived); else candidates.andNot(this.archived);
+    if (scores && query.sort_by) {
+      const matched = new Bitset(this.slots.length);
+      for (const slot of scores.keys()) matched.set(slot);
+      candidates.and(matched);
+    }
+    if (query.state) candidates.and(this.state.get(query.state));
+    if (query.campaign_id !== undefined) candidates.and(this.campaign.get(query.campaign_id));
+    if (query.fraud_suspicions) candidates.and(this.fraud.any(query.fraud_suspicions));
+    for (const [field, from, to] of ranges) {
+      candidates.and(this.sortedIndex(field).range(from, to));
+    }
+
+    // Search without an explicit sort: best matches first
+    if (scores && !query.sort_by) return this.ranked(scores, (slot) => candidates.has(slot), page, perPage, pending);
+
+    // Few candidates (a rare state, a narrow range): sort just those,
+    // instead of walking the whole sort index past rows that do not match
+    const total = candidates.count();
+    if (total <= SMALL_RESULT_SET) {
+      return this.page(candidates.toArray(), total, query, page, perPage, pending);
+    }
+
+    const field = query.sort_by ? SORT_KEYS[query.sort_by] : 'id';
+    const direction = query.sort_direction ?? 'desc';
+
+    // Otherwise walk the sort order, skipping to the requested page
+    const order = this.sortedIndex(field);
+    const skip = (page - 1) * perPage;
+    const rows: PromoterRow[] = [];
+    let seen = 0;
+    const visit = (slot: number): boolean => {
+      if (!candidates.has(slot)) return true;
+      if (seen++ >= skip) rows.push(this.slots[slot]);
+      return rows.length < perPage;
+    };
+    order.scan(direction, visit);
+
+    // Rows missing the sort value come last, newest first
+    if (rows.length < perPage && query.sort_by) {
+      this.sortedIndex('id').scan('desc', (slot) => order.has(slot) || visit(slot));
+    }
+
+    return { rows, total, pending };
+  }
+
+  stats(): PromoterMirrorStats['indexes'] {
+    return {
+      slots: this.slots.length,
+      emails: this.byEmail.size,
+      refTokens: this.byRefToken.size,
+      custIds: this.byCustId.size,
+      lastIndexBuildMs: this.lastIndexBuildMs,
+      search: this.search.stats(),
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  /**
+   * One page of the given matching slots, in sort order.
+   */
+  private page(
+    slots: number[], total: number, query: PromoterQuery, page: number, perPage: number, pending: number,
+  ): { rows: PromoterRow[]; total: number; pending: number } {
+    const ordered = this.sortSlots(slots, query.sort_by ? SORT_KEYS[query.sort_by] : 'id', query.sort_direction ?? 'desc');
+    const rows = ordered.slice((page - 1) * perPage, page * perPage).map((slot) => this.slots[slot]);
+    return { rows, total, pending };
+  }
+
+  /**
+   * One page of search matches by relevance, newest first on ties. Only the
+   * best page × perPage are kept while counting, so a broad search does not
+   * sort every match to return twenty.
+   */
+  private ranked(
+    scores: Map<number, number>, accept: (slot: number) => boolean, page: number, perPage: number, pending: number,
+  ): { rows: PromoterRow[]; total: number; pending: number } {
+    const best = new TopK(page * perPage);
+    let total = 0;
+    for (const [slot, score] of scores) {
+      if (!accept(slot)) continue;
+      total++;
+      best.offer(slot, score, this.slots[slot].id);
+    }
+    const rows = best.sorted().slice((page - 1) * perPage).map((slot) => this.slots[slot]);
+    return { rows, total, pending };
+  }
+
+  /**
+   * The query's filters checked on a single row — the same conditions the
+   * bitmap and sorted indexes evaluate for the whole table.
+   */
+  private matches(row: PromoterRow, query: PromoterQuery, ranges: [SortedField, number | undefined, number | undefined][]): boolean {
+    if (row.archived !== Boolean(query.archived)) return false;
+    if (query.state && row.state !== query.state) return false;
+    if (query.campaign_id !== undefined && !row.campaignIds.includes(query.campaign_id)) return false;
+    if (query.fraud_suspicions && !query.fraud_suspicions.some((f) =>
+      f === 'no_suspicion' ? row.fraudSuspicions.length === 0 : row.fraudSuspicions.includes(f))) {
+      return false;
+    }
+    return ranges.every(([field, from, to]) => {
+      const value = row[field];
+      return !Number.isNaN(value) && (from === undefined || value >= from) && (to === undefined || value <= to);
+    });
+  }
+
+  /**
+   * Slots in the order a walk of the sort index would give: by value in
+   * the given direction, ties by id the same way, and rows missing the
+   * value last, newest first.
+   */
+  private sortSlots(slots: number[], field: SortedField, direction: 'asc' | 'desc'): number[] {
+    const sign = direction === 'asc' ? 1 : -1;
+    return slots.sort((a, b) => {
+      const rowA = this.slots[a];
+      const rowB = this.slots[b];
+      const missingA = Number.isNaN(rowA[field]);
+      const missingB = Number.isNaN(rowB[field]);
+      if (missingA || missingB) {
+        return missingA && missingB ? rowB.id - rowA.id : missingA ? 1 : -1;
+      }
+      return sign * (rowA[field] - rowB[field] || rowA.id - rowB.id);
+    });
+  }
+
+  private index(row: PromoterRow, slot: number): void {
+    this.search.add(slot, searchFields(row.record));
+    if (row.email) this.byEmail.add(row.email, slot);
+    if (row.custId) this.byCustId.add(row.custId, slot);
+    for (const token of row.refTokens) this.byRefToken.add(token, slot);
+    this.state.add(row.state, slot);
+    for (const cid of row.campaignIds) this.campaign.add(cid, slot);
+    if (row.fraudSuspicions.length === 0) this.fraud.add('no_suspicion', slot);
+    for (const f of row.fraudSuspicions) this.fraud.add(f, slot);
+    if (row.archived) this.archived.set(slot); else this.archived.clear(slot);
+  }
+
+  private unindex(row: PromoterRow, slot: number): void {
+    if (row.email) this.byEmail.remove(row.email, slot);
+    if (row.custId) this.byCustId.remove(row.custId, slot);
+    for (const token of row.refTokens) this.byRefToken.remove(token, slot);
+    this.state.remove(row.state, slot);
+    for (const cid of row.campaignIds) this.campaign.remove(cid, slot);
+    this.fraud.remove('no_suspicion', slot);
+    for (const f of row.fraudSuspicions) this.fraud.remove(f, slot);
+    this.archived.clear(slot);
+  }
+
+  /**
+   * Sorted index for a field, rebuilt first if rows changed since the last build.
+   */
+  private sortedIndex(field: SortedField): SortedIndex {
+    const index = this.sorted.get(field)!;
+    if (index.dirty) {
+      const started = performance.now();
+      index.build(this.slots.length, (slot) => this.slots[slot][field], (slot) => this.slots[slot].id);
+      this.lastIndexBuildMs = performance.now() - started;
+    }
+    return index;
+  }
+}
+
+// ============================================================================
+// MIRROR
+// ============================================================================
+
+export interface MirrorResult {
+  data: Record<string, unknown>[];
+  meta: {
+    current_page: number;
+    total_pages: number;
+    total_count: number;
+    pending_count: number;
+    source: 'local_mirror';
+    synced_at: string;
+    age_seconds: number;
+  };
+}
+
+export interface PromoterMirrorStats {
+  enabled: boolean;
+  status: 'disabled' | 'loading' | 'ready' | 'error';
+  records: number;
+  fresh: boolean;
+  ageMs: number | null;
+  lastSyncAt: string | null;
+  lastFullSyncAt: string | null;
+  fullSyncs: number;
+  incrementalSyncs: number;
+  upserts: number;
+  localQueries: number;
+  fallbacks: number;
+  avgQueryMs: number;
+  lastError: string | null;
+  indexes: {
+    slots: number;
+    emails: number;
+    refTokens: number;
+    custIds: number;
+    lastIndexBuildMs: number;
+    search: SearchIndexStats;
+  };
+}
+
+export class PromoterMirror {
+  private table = new PromoterTable();
+  private status: PromoterMirrorStats['status'];
+  private lastSyncAt = 0;          // when the last successful sync started
+  private lastFullSyncAt = 0;
+  private syncedGeneration = 0;    // promoters cache generation at last sync
+  private syncing: Promise<void> | null = null;
+  private fullSyncs = 0;
+  private incrementalSyncs = 0;
+  private upserts = 0;
+  private localQueries = 0;
+  private fallbacks = 0;
+  private totalQueryMs = 0;
+  private lastError: string | null = null;
+
+  constructor(readonly enabled: boolean) {
+    this.status = enabled ? 'loading' : 'disabled';
+  }
+
+  /**
+   * Start the initial load and the periodic sync timer. Returns immediately;
+   * queries fall back to the API until the first load completes.
+   */
+  start(): void {
+    if (!this.enabled) return;
+
+    void this.sync();
+    const timer = setInterval(() => void this.sync(), SYNC_INTERVAL_MS);
+    timer.unref(); // don't keep the process alive just for syncing
+  }
+
+  /**
+   * True when the data is recent enough and no mutation made through this
+   * server has touched promoters since the last sync.
+   */
+  isFresh(now = Date.now()): boolean {
+    return this.status === 'ready'
+      && now - this.lastSyncAt <= MAX_STALENESS_MS
+      && responseCache.generation('promoters') === this.syncedGeneration;
+  }
+
+  /**
+   * Answer a get_promoters query locally.
+   * @returns The page in the API's { data, meta } shape, or undefined if the
+   *          caller must use the live API (disabled, stale, unsupported
+   *          filter, or a search the local index cannot answer in full)
+   */
+  query(query: PromoterQuery, options: { maxRecords?: number } = {}): MirrorResult | undefined {
+    if (!this.enabled) return undefined;
+
+    // Stats are as old as the last full sync, everything else as the last sync
+    const now = Date.now();
+    const dataAt = readsStats(query) ? this.lastFullSyncAt : this.lastSyncAt;
+    if (!this.isFresh(now) || now - dataAt > MAX_STALENESS_MS
+      || UNSUPPORTED_FILTERS.some((f) => query[f] !== undefined)) {
+      this.fallbacks++;
+      // A mutation made the data stale — catch up in the background
+      if (this.status === 'ready' && responseCache.generation('promoters') !== this.syncedGeneration) {
+        void this.sync();
+      }
+      return undefined;
+    }
+
+    // maxRecords = fetch_all mode: everything in one page
+    const perPage = options.maxRecords ?? query.per_page ?? DEFAULT_PER_PAGE;
+    const page = options.maxRecords ? 1 : query.page ?? 1;
+
+    const started = performance.now();
+    const result = this.table.query(query, page, perPage);
+    if (!result) {
+      this.fallbacks++;
+      return undefined;
+    }
+    this.localQueries++;
+    this.totalQueryMs += performance.now() - started;
+
+    return {
+      data: result.rows.map((row) => row.record),
+      meta: {
+        current_page: page,
+        total_pages: Math.max(1, Math.ceil(result.total / perPage)),
+        total_count: result.total,
+        pending_count: result.pending,
+        source: 'local_mirror',
+        synced_at: new Date(dataAt).toISOString(),
+        age_seconds: Math.round((now - dataAt) / 1000),
+      },
+    };
+  }
+
+  /**
+   * Exact-match lookup by id, email, ref_token or cust_id through the hash
+   * indexes. Returns undefined (not []) when the mirror cannot be trusted,
+   * so "not found" and "don't know" stay distinguishable.
+   */
+  lookup(field: PromoterLookupField, value: string | number): Record<string, unknown>[] | undefined {
+    if (!this.enabled || !this.isFresh()) return undefined;
+    return this.table.lookup(field, value);
+  }
+
+  /**
+   * Run a sync now: a full reload if none has happened recently, otherwise
+   * an incremental one. Concurrent calls share the running sync.
+   */
+  sync(): Promise<void> {
+    if (!this.enabled) return Promise.resolve();
+    if (!this.syncing) {
+      const full = Date.now() - this.lastFullSyncAt > FULL_SYNC_INTERVAL_MS;
+      this.syncing = runInBackground(() => full ? this.fullSync() : this.incrementalSync())
+        .catch((err) => {
+          this.lastError = err instanceof Error ? err.message : String(err);
+          if (this.table.size === 0) this.status = 'error';
+          logger.warn('Promoter mirror: sync failed', { error: this.lastError });
+        })
+        .finally(() => { this.syncing = null; });
+    }
+    return this.syncing;
+  }
+
+  stats(): PromoterMirrorStats {
+    const now = Date.now();
+    return {
+      enabled: this.enabled,
+      status: this.status,
+      records: this.table.size,
+      fresh: this.isFresh(now),
+      ageMs: this.lastSyncAt ? now - this.lastSyncAt : null,
+      lastSyncAt: this.lastSyncAt ? new Date(this.lastSyncAt).toISOString() : null,
+      lastFullSyncAt: this.lastFullSyncAt ? new Date(this.lastFullSyncAt).toISOString() : null,
+      fullSyncs: this.fullSyncs,
+      incrementalSyncs: this.incrementalSyncs,
+      upserts: this.upserts,
+      localQueries: this.localQueries,
+      fallbacks: this.fallbacks,
+      avgQueryMs: this.localQueries > 0 ? this.totalQueryMs / this.localQueries : 0,
+      lastError: this.lastError,
+      indexes: this.table.stats(),
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  /**
+   * Reload everything into a fresh table and swap it in, so promoters deleted
+   * upstream disappear and queries never see a half-loaded mirror.
+   */
+  private async fullSync(): Promise<void> {
+    const started = Date.now();
+    const generation = responseCache.generation('promoters');
+    const table = new PromoterTable();
+
+    await this.load({}, (row) => table.upsert(row));
+
+    this.table = table;
+    this.upserts += table.size;
+    this.markSynced(started, generation);
+    this.lastFullSyncAt = started;
+    this.fullSyncs++;
+    logger.info(`Promoter mirror: loaded ${table.size} promoter(s)`, { durationMs: Date.now() - started });
+  }
+
+  /**
+   * Fetch only promoters updated since the last sync (minus a small overlap).
+   */
+  private async incrementalSync(): Promise<void> {
+    const started = Date.now();
+    const generation = responseCache.generation('promoters');
+    const since = new Date(this.lastSyncAt - SYNC_OVERLAP_MS).toISOString();
+
+    let changed = 0;
+    await this.load({ 'filters[updated_at][from]': since }, (row) => {
+      this.table.upsert(row);
+      changed++;
+    });
+
+    this.upserts += changed;
+    this.markSynced(started, generation);
+    this.incrementalSyncs++;
+    logger.debug(`Promoter mirror: ${changed} promoter(s) changed since ${since}`);
+  }
+
+  /**
+   * Walk every page of /promoters for the given filters — once for active and
+   * once for archived promoters, since the default listing may hide the latter.
+   */
+  private async load(filters: Record<string, string>, onRow: (row: PromoterRow) => void): Promise<void> {
+    for (const archived of ['false', 'true']) {
+      const pager = new Paginator('/promoters', {
+        queryParams: { ...filters, 'filters[archived]': archived },
+        maxRecords: MAX_RECORDS,
+        cache: false,
+      });
+      for await (const record of pager) {
+        const row = toRow(record);
+        if (row) onRow(row);
+      }
+      if (pager.truncated) {
+        logger.warn(`Promoter mirror: stopped at FP_MIRROR_MAX_RECORDS (${MAX_RECORDS})`);
+      }
+    }
+  }
+
+  private markSynced(started: number, generation: number): void {
+    this.lastSyncAt = started;
+    // If a mutation landed during the sync, stay stale so the next query re-syncs
+    this.syncedGeneration = generation;
+    this.status = 'ready';
+    this.lastError = null;
+  }
+}
+
+// Shared mirror instance — started once by index.ts
+export const promoterMirror = new PromoterMirror(MIRROR_ENABLED);
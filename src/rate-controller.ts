@@ -0,0 +1,291 @@
+/**
+ * Adaptive Rate Controller
+ *
+ * Tunes the rate limiter's budget from what the API tells us, instead of a
+ * fixed safety margin. Like a driver who speeds up a little at a time on
+ * an empty road and brakes firmly when the brake lights keep coming (AIMD:
+ * additive increase, multiplicative decrease).
+ *
+ * Includes:
+ * - Additive increase: every clean interval of successful responses raises
+ *   the limit by a small step, up to the ceiling
+ * - Multiplicative decrease after repeated 429s (hard) or a run of 5xx
+ *   responses (gentle) within one interval; a lone 429 at the window edge
+ *   only holds the limit where it is
+ * - Rate-limit headers (X-RateLimit-Limit / -Remaining / -Reset and the
+ *   IETF RateLimit-* variants) when the API sends them: the advertised limit
+ *   becomes the ceiling, and remaining = 0 with a reset time pauses every
+ *   caller until the reset instead of collecting 429s
+ * - Retry delays from Retry-After or the reset header (retryAfterMs)
+ *
+ * Enabled by default; FP_RATE_ADAPTIVE=false keeps the limit fixed at
+ * FP_RATE_LIMIT (a server-announced reset still pauses permits).
+ */
+
+import { logger } from './logger.js';
+import type { RateLimiter } from './rate-limiter.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// Share of the limit kept after repeated 429s / a run of 5xx responses
+const THROTTLE_DECREASE = 0.85;
+const SERVER_ERROR_DECREASE = 0.9;
+
+// 429s within one interval before the limit is lowered. A single one is
+// usually a request racing the window edge, not a limit that is too high.
+const THROTTLE_TOLERANCE = 2;
+
+// 5xx responses within one interval (and share of its responses) before
+// the limit is lowered — the server struggling, not one bad request
+const SERVER_ERROR_TOLERANCE = 3;
+const SERVER_ERROR_SHARE = 0.1;
+
+// Additive step as a share of the ceiling (380 → 400 takes three steps,
+// i.e. 45 seconds without 429s)
+const INCREASE_STEP_SHARE = 0.02;
+
+// Never go below this share of the ceiling
+const MIN_LIMIT_SHARE = 0.1;
+
+// Length of one evaluation interval relative to the rate window (15s for a
+// 60s window): a clean interval raises the limit by one step. A new limit
+// only shows its effect over a whole window, so shorter intervals overshoot.
+const INTERVAL_SHARE = 1 / 4;
+
+// Header values this large are Unix timestamps rather than seconds from now
+const EPOCH_THRESHOLD_SECONDS = 1_000_000_000;
+
+// ============================================================================
+// HEADERS
+// ============================================================================
+
+/**
+ * First parseable integer among the given headers. IETF-style values like
+ * "400, 400;w=60" yield their leading number.
+ */
+function headerNumber(headers: Headers, names: string[]): number | undefined {
+  for (const name of names) {
+    const value = headers.get(name);
+    if (value === null) continue;
+    const parsed = parseInt(value, 10);
+    if (!isNaN(parsed) && parsed >= 0) return parsed;
+  }
+  return undefined;
+}
+
+/**
+ * How long the server asks us to wait: Retry-After (seconds or HTTP date),
+ * else the rate-limit reset header (seconds from now or a Unix timestamp).
+ */
+export function retryAfterMs(headers: Headers, now = Date.now()): number | undefined {
+  const retryAfter = headers.get('Retry-After');
+  if (retryAfter) {
+    const seconds = parseInt(retryAfter, 10);
+    if (!isNaN(seconds)) return seconds * 1000;
+    const date = Date.parse(retryAfter);
+    if (!isNaN(date)) return Math.max(0, date - now);
+  }
+
+  return resetMs(headers, now);
+}
+
+/**
+ * Time until the server's rate-limit window resets, from a reset header
+ * holding seconds from now or a Unix timestamp.
+ */
+function resetMs(headers: Headers, now: number): number | undefined {
+  const reset = headerNumber(headers, ['X-RateLimit-Reset', 'RateLimit-Reset', 'X-Rate-Limit-Reset']);
+  if (reset === undefined) return undefined;
+  return reset >= EPOCH_THRESHOLD_SECONDS ? Math.max(0, reset * 1000 - now) : reset * 1000;
+}
+
+// ============================================================================
+// CONTROLLER
+// ============================================================================
+
+export interface RateControllerStats {
+  adaptive: boolean;
+  limit: number;
+  floor: number;
+  ceiling: number;          // configured maximum, or the API's advertised limit
+  headerLimit: number | null;
+  headerRemaining: number | null;
+  increases: number;
+  decreases: number;
+  throttled: number;        // 429 responses seen
+  serverErrors: number;     // 5xx responses seen
+  pauses: number;           // times permits were paused by the server
+}
+
+export class AdaptiveRateController {
+  private readonly floor: number;
+  private readonly intervalMs: number;
+  private ceiling: number;
+  private headerLimit: number | null = null;
+  private headerRemaining: number | null = null;
+  private increases = 0;
+  private decreases = 0;
+  private throttled = 0;
+  private serverErrors = 0;
+  private pauses = 0;
+  private lastDecreaseAt = 0;
+
+  // Responses in the current evaluation interval
+  private intervalStart = Date.now();
+  private intervalOk = 0;
+  private intervalThrottled = 0;
+  private intervalServerErrors = 0;
+
+  /**
+   * @param limiter - The limiter whose limit is tuned
+   * @param options.ceiling - Highest limit to probe for (≤ the limiter's capacity)
+   * @param options.windowMs - The limiter's window, for the interval length
+   * @param options.adaptive - false = never change the limit
+   */
+  constructor(
+    private readonly limiter: RateLimiter,
+    private readonly options: { ceiling: number; windowMs: number; adaptive: boolean },
+  ) {
+    this.ceiling = options.ceiling;
+    this.floor = Math.max(1, Math.round(options.ceiling * MIN_LIMIT_SHARE));
+    this.intervalMs = options.windowMs * INTERVAL_SHARE;
+  }
+
+  /**
+   * Feed one API response (any status) into the controller.
+   *
+   * @param sentAt - When the request was sent. Responses to requests sent
+   *                 before the last decrease describe the old limit and do
+   *                 not count, so one burst of 429s lowers it only once.
+   */
+  onResponse(status: number, headers: Headers, sentAt: number): void {
+    const now = Date.now();
+    this.readHeaders(headers, now);
+
+    if (status === 429) this.throttled++;
+    if (status >= 500) this.serverErrors++;
+    if (sentAt < this.lastDecreaseAt) return;
+
+    if (status === 429) {
+      this.intervalThrottled++;
+    } else if (status >= 500) {
+      this.intervalServerErrors++;
+    } else if (status < 400) {
+      this.intervalOk++;
+    }
+
+    this.evaluate(now);
+  }
+
+  stats(): RateControllerStats {
+    return {
+      adaptive: this.options.adaptive,
+      limit: this.limiter.currentLimit(),
+      floor: this.floor,
+      ceiling: this.ceiling,
+      headerLimit: this.headerLimit,
+      headerRemaining: this.headerRemaining,
+      increases: this.increases,
+      decreases: this.decreases,
+      throttled: this.throttled,
+      serverErrors: this.serverErrors,
+      pauses: this.pauses,
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  /**
+   * Decrease as soon as an interval has seen too many errors; otherwise,
+   * once the interval is over, increase by one step if it was clean. An
+   * interval stretched by idle time still earns one step: quiet minutes say
+   * nothing about whether a higher limit would hold under load.
+   */
+  private evaluate(now: number): void {
+    const responses = this.intervalOk + this.intervalThrottled + this.intervalServerErrors;
+
+    if (this.intervalThrottled >= THROTTLE_TOLERANCE) {
+      this.decrease(THROTTLE_DECREASE, `${this.intervalThrottled} × 429`);
+      this.startInterval(now);
+      return;
+    }
+    if (this.intervalServerErrors >= SERVER_ERROR_TOLERANCE
+      && this.intervalServerErrors >= responses * SERVER_ERROR_SHARE) {
+      this.decrease(SERVER_ERROR_DECREASE, `${this.intervalServerErrors} × 5xx`);
+      this.startInterval(now);
+      return;
+    }
+
+    if (now - this.intervalStart < this.intervalMs) return;
+    if (this.intervalThrottled === 0 && this.intervalServerErrors === 0 && this.intervalOk > 0) {
+      this.increase();
+    }
+    this.startInterval(now);
+  }
+
+  private startInterval(now: number): void {
+    this.intervalStart = now;
+    this.intervalOk = 0;
+    this.intervalThrottled = 0;
+    this.intervalServerErrors = 0;
+  }
+
+  private readHeaders(headers: Headers, now: number): void {
+    const limit = headerNumber(headers, ['X-RateLimit-Limit', 'RateLimit-Limit', 'X-Rate-Limit-Limit']);
+    const remaining = headerNumber(headers, ['X-RateLimit-Remaining', 'RateLimit-Remaining', 'X-Rate-Limit-Remaining']);
+
+    if (limit !== undefined && limit > 0) {
+      this.headerLimit = limit;
+      // The advertised limit is the real ceiling (never above what the ring holds)
+      this.ceiling = Math.min(this.options.ceiling, limit);
+      if (this.options.adaptive && this.limiter.currentLimit() > this.ceiling) {
+        this.setLimit(this.ceiling, `advertised limit ${limit}`);
+      }
+    }
+
+    if (remaining === undefined) return;
+    this.headerRemaining = remaining;
+
+    // Out of budget on the server's side: nobody gets through before the
+    // reset, so hold every caller instead of collecting 429s
+    if (remaining === 0) {
+      const waitMs = resetMs(headers, now);
+      if (waitMs !== undefined && waitMs > 0) this.pause(waitMs);
+    }
+  }
+
+  private increase(): void {
+    if (!this.options.adaptive) return;
+    const limit = this.limiter.currentLimit();
+    if (limit >= this.ceiling) return;
+    const step = Math.max(1, Math.round(this.ceiling * INCREASE_STEP_SHARE));
+    this.increases++;
+    this.setLimit(Math.min(this.ceiling, limit + step), 'clean interval');
+  }
+
+  private decrease(factor: number, reason: string): void {
+    if (!this.options.adaptive) return;
+    this.lastDecreaseAt = Date.now();
+    this.decreases++;
+    this.setLimit(Math.max(this.floor, Math.floor(this.limiter.currentLimit() * factor)), reason);
+  }
+
+  private setLimit(limit: number, reason: string): void {
+    const previous = this.limiter.currentLimit();
+    this.limiter.setLimit(limit);
+    const current = this.limiter.currentLimit();
+    if (current !== previous) {
+      logger.info(`Rate limit ${previous} → ${current} req/window (${reason})`);
+    }
+  }
+
+  private pause(ms: number): void {
+    this.pauses++;
+    logger.warn(`Rate limiter paused for ${ms}ms until the server's reset`);
+    this.limiter.pause(ms);
+  }
+}
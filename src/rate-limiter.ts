@@ -0,0 +1,506 @@
+/**
+ * Rate Limiter
+ *
+ * A sliding-window limiter that hands out "permits" to API calls.
+ * Think of it as a ticket booth: only N tickets can be used per minute,
+ * and people who arrive when the booth is sold out wait in line. There are
+ * three lines — interactive, bulk and background — and the booth serves
+ * them like a supermarket with an express lane: the interactive line gets
+ * the most turns, but the others still move.
+ *
+ * How it works:
+ * - The timestamps of the last N grants live in a fixed-size ring buffer,
+ *   so checking "is a slot free?" is a single array read (no shifting).
+ * - Waiters are ordered by weighted fair queuing: every waiter gets a
+ *   virtual finish tag of max(virtual time, its flow's last tag) + 1/weight,
+ *   where a flow is one tool within one class. Flows of the same class take
+ *   turns, and a class with weight 6 gets six permits for every one of a
+ *   class with weight 1 while both are waiting.
+ * - Near the limit, lower classes are preempted: bulk work only gets a
+ *   permit while more than its reserve of the window is free, background
+ *   work needs an even larger reserve, so interactive calls never wait
+ *   behind a prefetch or a background sync.
+ * - One timer is armed for the moment the oldest grant leaves the window;
+ *   when it fires, queued callers are released while the window has room.
+ * - The limit can be changed at runtime (setLimit, up to the ring's
+ *   capacity) and permits can be paused for a while (pause) — used by the
+ *   adaptive controller in rate-controller.ts.
+ *
+ * Because every grant is recorded before the next check, concurrent callers
+ * can never overshoot the limit — unlike "sleep then push", where everyone
+ * who waited the same amount of time wakes up together.
+ *
+ * A caller whose request is cancelled leaves the line without using a
+ * permit; its place is skipped when the line moves.
+ */
+
+import { logger } from './logger.js';
+import { abortError } from './request-context.js';
+
+// ============================================================================
+// PRIORITY CLASSES
+// ============================================================================
+
+/**
+ * - interactive: a tool call's own requests (a get_promoter lookup, page 1)
+ * - bulk: the many requests behind one call (later pages, prefetch, fan-out,
+ *   batch chunks, batch polling)
+ * - background: work nobody is waiting for (promoter mirror syncs)
+ */
+export type RequestPriority = 'interactive' | 'bulk' | 'background';
+
+// Highest priority first
+export const PRIORITIES: readonly RequestPriority[] = ['interactive', 'bulk', 'background'];
+
+const CLASSES: Record<RequestPriority, { weight: number; reserve: number }> = {
+  // weight: share of permits while several classes wait
+  // reserve: share of the window that must stay free for higher classes
+  interactive: { weight: 6, reserve: 0 },
+  bulk:        { weight: 3, reserve: 0.1 },
+  background:  { weight: 1, reserve: 0.25 },
+};
+
+// ============================================================================
+// WAIT QUEUE
+// ============================================================================
+
+/**
+ * Binary min-heap ordered by virtual finish tag (ties by arrival).
+ * Push and pop are O(log n).
+ */
+class WaiterHeap {
+  private readonly items: Waiter[] = [];
+
+  get length(): number {
+    return this.items.length;
+  }
+
+  peek(): Waiter | undefined {
+    return this.items[0];
+  }
+
+  push(waiter: Waiter): void {
+    const items = this.items;
+    items.push(waiter);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!before(items[i], items[parent])) break;
+      [items[i], items[parent]] = [items[parent], items[i]];
+      i = parent;
+    }
+  }
+
+  pop(): Waiter | undefined {
+    const items = this.items;
+    const top = items[0];
+    const last = items.pop();
+    if (items.length > 0 && last) {
+      items[0] = last;
+      let i = 0;
+      for (;;) {
+        const left = 2 * i + 1;
+        const right = left + 1;
+        let smallest = i;
+        if (left < items.length && before(items[left], items[smallest])) smallest = left;
+        if (right < items.length && before(items[right], items[smallest])) smallest = right;
+        if (smallest === i) break;
+        [items[i], items[smallest]] = [items[smallest], items[i]];
+        i = smallest;
+      }
+    }
+    return top;
+  }
+}
+
+function before(a: Waiter, b: Waiter): boolean {
+  return a.tag < b.tag || (a.tag === b.tag && a.seq < b.seq);
+}
+
+// ============================================================================
+// RATE LIMITER
+// ============================================================================
+
+// Flow tags are pruned once this many flows have been seen
+const MAX_FLOWS = 256;
+
+interface Waiter {
+  resolve: () => void;
+  enqueuedAt: number;
+  abandoned: boolean;     // cancelled while queued — skipped by drain()
+  tag: number;            // virtual finish time (weighted fair queuing)
+  seq: number;            // arrival order, breaks ties
+}
+
+interface PriorityClass {
+  readonly weight: number;
+  readonly reserveShare: number;  // share of the limit that must stay free before this class gets one
+  readonly waiters: WaiterHeap;
+  abandoned: number;          // abandoned waiters still in the heap
+  granted: number;
+  delayed: number;
+  preempted: number;
+  totalWaitMs: number;
+  maxWaitMs: number;
+}
+
+export interface PriorityClassStats {
+  weight: number;
+  reserve: number;        // permits kept free for higher classes
+  queued: number;
+  granted: number;
+  delayed: number;        // permits that had to wait
+  preempted: number;      // had to queue although permits were free (reserve)
+  avgWaitMs: number;      // mean wait of delayed permits
+  maxWaitMs: number;
+}
+
+export interface RateLimiterStats {
+  limit: number;          // current limit (adjusted at runtime)
+  capacity: number;       // highest limit the ring buffer can hold
+  windowMs: number;
+  pausedMs: number;       // time left until permits resume after a pause
+  inWindow: number;       // grants in the current window
+  available: number;      // permits an interactive call could get right now
+  queued: number;         // callers currently waiting
+  maxQueued: number;      // high-water mark of the wait queue
+  granted: number;        // total permits handed out
+  delayed: number;        // permits that had to wait
+  avgWaitMs: number;      // mean wait of delayed permits
+  cancelled: number;      // waits abandoned because the request was cancelled
+  classes: Record<RequestPriority, PriorityClassStats>;
+}
+
+export interface PermitRequest {
+  signal?: AbortSignal;         // leaves the queue and rejects with an AbortError when aborted
+  priority?: RequestPriority;   // default: interactive
+  flow?: string;                // fairness key within the class, e.g. the tool name
+}
+
+export class RateLimiter {
+  private readonly ring: Float64Array;
+  private next = 0;          // ring index where the next grant is written
+  private granted = 0;
+  private delayed = 0;
+  private totalWaitMs = 0;
+  private maxQueued = 0;
+  private cancelled = 0;
+  private readonly classes: Record<RequestPriority, PriorityClass>;
+  private virtualTime = 0;   // tag of the last waiter served
+  private seq = 0;
+  private readonly flowTags = new Map<string, number>();
+  private timer: NodeJS.Timeout | null = null;
+  private limit: number;
+  private pausedUntil = 0;
+
+  /**
+   * @param limit - Permits per window to start with
+   * @param windowMs - Window length
+   * @param capacity - Highest limit setLimit() may raise it to (ring size)
+   */
+  constructor(
+    limit: number,
+    private readonly windowMs: number,
+    private readonly capacity = limit,
+  ) {
+    this.limit = Math.max(1, Math.min(limit, capacity));
+    this.ring = new Float64Array(capacity);
+    this.classes = Object.fromEntries(PRIORITIES.map((priority) => [priority, {
+      weight: CLASSES[priority].weight,
+      reserveShare: CLASSES[priority].reserve,
+      waiters: new WaiterHeap(),
+      abandoned: 0,
+      granted: 0,
+      delayed: 0,
+      preempted: 0,
+      totalWaitMs: 0,
+      maxWaitMs: 0,
+    }])) as Record<RequestPriority, PriorityClass>;
+  }
+
+  /**
+   * Wait for a permit. Resolves immediately if the window has room beyond
+   * the class's reserve and nobody of the same or a higher class is queued;
+   * otherwise joins the class's queue.
+   */
+  acquire(request: PermitRequest = {}): Promise<void> {
+    const { signal, priority = 'interactive', flow = priority } = request;
+    if (signal?.aborted) return Promise.reject(abortError());
+    const now = Date.now();
+    const queue = this.classes[priority];
+
+    if (this.queuedFrom(priority) === 0 && this.hasSlot(now)) {
+      if (queue.reserveShare === 0 || this.free(now) > this.reserve(queue)) {
+        this.record(now);
+        queue.granted++;
+        return Promise.resolve();
+      }
+      queue.preempted++;
+    }
+
+    return new Promise((resolve, reject) => {
+      const onAbort = () => {
+        waiter.abandoned = true;
+        queue.abandoned++;
+        this.cancelled++;
+        reject(abortError());
+      };
+      const waiter: Waiter = {
+        resolve: () => {
+          signal?.removeEventListener('abort', onAbort);
+          resolve();
+        },
+        enqueuedAt: now,
+        abandoned: false,
+        tag: this.finishTag(`${priority}:${flow}`, queue.weight),
+        seq: this.seq++,
+      };
+      signal?.addEventListener('abort', onAbort, { once: true });
+
+      queue.waiters.push(waiter);
+      if (this.queued() > this.maxQueued) {
+        this.maxQueued = this.queued();
+      }
+      this.schedule(now);
+    });
+  }
+
+  /**
+   * Permits a call of the given class could get right now without waiting.
+   * Used by bulk work (e.g. page prefetching) to size its concurrency.
+   */
+  available(priority: RequestPriority = 'interactive'): number {
+    if (this.queuedFrom(priority) > 0) return 0;
+    return Math.max(0, this.free(Date.now()) - this.reserve(this.classes[priority]));
+  }
+
+  /** Permits per window right now. */
+  currentLimit(): number {
+    return this.limit;
+  }
+
+  /**
+   * Change the limit (clamped to 1..capacity). Grants already in the window
+   * still count, so a lower limit simply makes callers wait longer; a
+   * higher one releases waiters at once.
+   */
+  setLimit(limit: number): void {
+    this.limit = Math.max(1, Math.min(this.capacity, Math.round(limit)));
+    if (this.queued() > 0) this.drain();
+  }
+
+  /**
+   * Hand out no permits until `ms` from now (e.g. the server's Retry-After).
+   * Extends, never shortens, a pause already in effect.
+   */
+  pause(ms: number): void {
+    const until = Date.now() + ms;
+    if (until <= this.pausedUntil) return;
+    this.pausedUntil = until;
+    // Re-arm the timer for the end of the pause
+    if (this.timer) {
+      clearTimeout(this.timer);
+      this.timer = null;
+    }
+    if (this.queued() > 0) this.schedule(Date.now());
+  }
+
+  /**
+   * Returns a snapshot of limiter state for diagnostics.
+   */
+  stats(): RateLimiterStats {
+    const now = Date.now();
+    const inWindow = this.countInWindow(now);
+    const classes = Object.fromEntries(PRIORITIES.map((priority) => {
+      const queue = this.classes[priority];
+      return [priority, {
+        weight: queue.weight,
+        reserve: this.reserve(queue),
+        queued: queue.waiters.length - queue.abandoned,
+        granted: queue.granted,
+        delayed: queue.delayed,
+        preempted: queue.preempted,
+        avgWaitMs: queue.delayed > 0 ? queue.totalWaitMs / queue.delayed : 0,
+        maxWaitMs: queue.maxWaitMs,
+      }];
+    })) as Record<RequestPriority, PriorityClassStats>;
+
+    return {
+      limit: this.limit,
+      capacity: this.capacity,
+      windowMs: this.windowMs,
+      pausedMs: Math.max(0, this.pausedUntil - now),
+      inWindow,
+      available: this.available(),
+      queued: this.queued(),
+      maxQueued: this.maxQueued,
+      granted: this.granted,
+      delayed: this.delayed,
+      avgWaitMs: this.delayed > 0 ? this.totalWaitMs / this.delayed : 0,
+      cancelled: this.cancelled,
+      classes,
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  /** Callers still waiting (abandoned ones are not counted). */
+  private queued(): number {
+    return this.queuedFrom('background');
+  }
+
+  /** Callers waiting in the given class or any higher one. */
+  private queuedFrom(priority: RequestPriority): number {
+    let count = 0;
+    for (const p of PRIORITIES) {
+      const queue = this.classes[p];
+      count += queue.waiters.length - queue.abandoned;
+      if (p === priority) break;
+    }
+    return count;
+  }
+
+  /**
+   * Weighted fair queuing tag: a flow's waiters are spaced 1/weight apart in
+   * virtual time, and an idle flow restarts from the current virtual time
+   * instead of claiming turns for the time it was idle.
+   */
+  private finishTag(flow: string, weight: number): number {
+    const tag = Math.max(this.virtualTime, this.flowTags.get(flow) ?? 0) + 1 / weight;
+    this.flowTags.set(flow, tag);
+
+    // Flows whose last tag has been served carry no state worth keeping
+    if (this.flowTags.size > MAX_FLOWS) {
+      for (const [key, value] of this.flowTags) {
+        if (value <= this.virtualTime) this.flowTags.delete(key);
+      }
+    }
+    return tag;
+  }
+
+  /** Permits kept free for the classes above this one. */
+  private reserve(queue: PriorityClass): number {
+    return Math.floor(this.limit * queue.reserveShare);
+  }
+
+  /**
+   * The grant made `limit` grants ago sits `limit` slots behind `next`.
+   * If that grant has left the window (or never happened), we have room.
+   */
+  private hasSlot(now: number): boolean {
+    if (now < this.pausedUntil) return false;
+    return this.granted < this.limit
+      || this.ring[(this.next - this.limit + this.capacity) % this.capacity] <= now - this.windowMs;
+  }
+
+  private record(now: number): void {
+    this.ring[this.next] = now;
+    this.next = (this.next + 1) % this.capacity;
+    this.granted++;
+  }
+
+  /**
+   * Arm a single timer for when the oldest grant in the window exits it —
+   * the next moment a waiting class can become eligible.
+   */
+  private schedule(now: number): void {
+    if (this.timer) return;
+    const oldest = this.oldestInWindow(now);
+    const untilExit = oldest === undefined ? 0 : oldest + this.windowMs - now;
+    const waitMs = Math.max(0, untilExit, this.pausedUntil - now) + 1;
+    logger.debug(`Rate limiter: ${this.queued()} queued, next permit in ${waitMs}ms`);
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.drain();
+    }, waitMs);
+  }
+
+  /**
+   * Release queued callers while the window has room, always picking the
+   * smallest finish tag among the classes whose reserve is still free.
+   */
+  private drain(): void {
+    const now = Date.now();
+    let free = this.free(now);
+
+    while (free > 0) {
+      const queue = this.nextClass(free);
+      if (!queue) break;
+
+      const waiter = queue.waiters.pop()!;
+      if (waiter.abandoned) {
+        queue.abandoned--;
+        continue;
+      }
+      this.record(now);
+      free--;
+      this.virtualTime = waiter.tag;
+
+      const waitMs = now - waiter.enqueuedAt;
+      this.delayed++;
+      this.totalWaitMs += waitMs;
+      queue.granted++;
+      queue.delayed++;
+      queue.totalWaitMs += waitMs;
+      if (waitMs > queue.maxWaitMs) queue.maxWaitMs = waitMs;
+      waiter.resolve();
+    }
+
+    if (this.queued() > 0) {
+      this.schedule(now);
+    }
+  }
+
+  /** The eligible class whose head waiter has the smallest tag. */
+  private nextClass(free: number): PriorityClass | undefined {
+    let best: PriorityClass | undefined;
+    for (const priority of PRIORITIES) {
+      const queue = this.classes[priority];
+      // Reserves grow down the list, so no lower class is eligible either
+      if (free <= this.reserve(queue)) break;
+      const head = queue.waiters.peek();
+      if (head && (!best || before(head, best.waiters.peek()!))) best = queue;
+    }
+    return best;
+  }
+
+  private free(now: number): number {
+    if (now < this.pausedUntil) return 0;
+    return Math.max(0, this.limit - this.countInWindow(now));
+  }
+
+  /**
+   * Number of recorded grants still inside the window. Grants are stored
+   * oldest-first starting at `next` (once the ring has wrapped), so the
+   * ones inside the window are a suffix found by binary search: O(log capacity).
+   */
+  private countInWindow(now: number): number {
+    return Math.min(this.granted, this.capacity) - this.firstInWindow(now);
+  }
+
+  private oldestInWindow(now: number): number | undefined {
+    const first = this.firstInWindow(now);
+    if (first >= Math.min(this.granted, this.capacity)) return undefined;
+    return this.ring[(this.oldestIndex() + first) % this.capacity];
+  }
+
+  /** Position (0 = oldest recorded grant) of the first grant inside the window. */
+  private firstInWindow(now: number): number {
+    const start = this.oldestIndex();
+    const cutoff = now - this.windowMs;
+    let low = 0;
+    let high = Math.min(this.granted, this.capacity);
+    while (low < high) {
+      const mid = (low + high) >> 1;
+      if (this.ring[(start + mid) % this.capacity] > cutoff) high = mid;
+      else low = mid + 1;
+    }
+    return low;
+  }
+
+  private oldestIndex(): number {
+    return this.granted >= this.capacity ? this.next : 0;
+  }
+}
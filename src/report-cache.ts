@@ -0,0 +1,760 @@
+/**
+ * Report Time-Series Cache
+ *
+ * Report tools ask for metrics over a date range, broken down into
+ * day/month/year periods. Overlapping questions ("Jan–Mar", then "Feb–Apr")
+ * used to refetch every period. This cache files each closed period as its
+ * own bucket — like a cabinet with one folder per month: a new question
+ * pulls the folders already on file and only sends for the missing ones.
+ *
+ * Includes:
+ * - Range decomposition into periods aligned to group_by
+ * - Gap fetching: consecutive missing periods are fetched in one API call
+ * - Stitching cached and fetched periods back into the API's response shape
+ * - Closed periods kept for FP_REPORT_CACHE_TTL_MS (LRU by bytes); the open
+ *   current period and partial edge periods are always fetched fresh
+ * - A settle lag: a period only counts as closed FP_REPORT_SETTLE_DAYS after
+ *   its last (UTC) day, so accounts behind UTC do not cache a day that is
+ *   still running for them
+ * - Every bucket dropped when a mutation changes report numbers (referrals,
+ *   commissions, promoters — see affectedFamilies in cache.ts)
+ * - Month/year views rolled up from cached days (see report-rollup.ts);
+ *   week reports always go to the API, which knows the account's week start
+ * - Column union: gaps are fetched with every column the endpoint offers and
+ *   stored column-wise, so a later question about other columns of the same
+ *   periods needs no API call
+ *
+ * Buckets are keyed by (endpoint, group_by, q, period).
+ */
+
+import { logger } from './logger.js';
+import {
+  DAY_MS, ADDITIVE_COLUMNS, parseDay, formatDay, today, periodStart, nextPeriod, periodLabel,
+  canRollUp, dayColumnsFor, createDaySeries, addDay, periodGrid, singlePeriodGrid, rollUp, periodData,
+  type DaySeries,
+} from './report-rollup.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// Memory for cached report periods (default 16 MB). Set to 0 to disable.
+const REPORT_CACHE_MAX_BYTES = (() => {
+  const value = parseInt(process.env.FP_REPORT_CACHE_MAX_BYTES || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : 16 * 1024 * 1024;
+})();
+
+// How long a closed period is reused (default 1 hour, like closed reports in
+// the response cache). Late refunds or approvals can still change it.
+const REPORT_CACHE_TTL_MS = (() => {
+  const value = parseInt(process.env.FP_REPORT_CACHE_TTL_MS || '', 10);
+  return Number.isFinite(value) && value > 0 ? value : 60 * 60_000;
+})();
+
+// Days after a period's last UTC day before it counts as closed (default 1).
+// Covers accounts in time zones behind UTC, whose day ends up to a day later.
+const REPORT_SETTLE_DAYS = (() => {
+  const value = parseInt(process.env.FP_REPORT_SETTLE_DAYS || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : 1;
+})();
+
+// Longer ranges (e.g. 20 years by day) skip the cache and go straight to the API
+const MAX_SEGMENTS = 5_000;
+
+// A month/year query is rolled up from days when at most this many
+// closed days are missing from the cache (they are fetched by day first);
+// larger gaps are fetched at the requested granularity instead.
+const ROLLUP_MAX_FETCH_DAYS = 92;
+
+/**
+ * How each report endpoint lays out its periods:
+ * - timeline: a flat array of { period, id, data } entries (overview)
+ * - grouped:  one item per entity with sub_data: [{ period, id, data }]
+ * - totals:   one { url, id, data } item per entity, no period breakdown —
+ *             cached per exact date range, and only once the range is over
+ */
+type ReportShape = 'timeline' | 'grouped' | 'totals';
+
+const REPORT_SHAPES: Record<string, ReportShape> = {
+  '/reports/overview': 'timeline',
+  '/reports/campaigns': 'grouped',
+  '/reports/promoters': 'grouped',
+  '/reports/traffic_sources': 'grouped',
+  '/reports/urls': 'totals',
+};
+
+// Grouping periods we can align exactly. Week boundaries depend on the
+// account's week start, which the API does not tell us, so week reports
+// are neither decomposed nor rolled up: they are passed through unchanged.
+const DECOMPOSABLE_GROUP_BY = new Set(['day', 'month', 'year']);
+
+// Groupings that can be rolled up from day buckets
+const ROLLUP_GROUP_BY = new Set(['month', 'year']);
+
+// ============================================================================
+// TYPES
+// ============================================================================
+
+export interface ReportQuery {
+  columns: string[];
+  group_by: string;
+  start_date: string;
+  end_date: string;
+  q?: string;
+  sort_by?: string;
+  sort_direction?: string;
+}
+
+/** One period of the requested range. */
+interface Segment {
+  period: number;       // UTC ms of the period's first day
+  from: string;         // first requested day inside the period (YYYY-MM-DD)
+  to: string;           // last requested day inside the period
+  cacheable: boolean;   // whole period requested and already over
+  rows?: unknown[];
+}
+
+/** A grouped report's entity (campaign, promoter, source) within one period. */
+interface GroupedRow {
+  header: Record<string, unknown>;   // the item without data/sub_data
+  sub?: unknown;                     // its sub_data entry for the period
+}
+
+/**
+ * A cached period stored column-wise: one Float64Array holds every numeric
+ * column back to back (column c of row r at c * rowCount + r), instead of
+ * one { column: value } object per row.
+ */
+interface ColumnBucket {
+  columns: string[];
+  rowCount: number;
+  values: Float64Array;              // NaN = missing or not numeric
+  text: Map<string, unknown[]>;      // columns holding non-numbers (e.g. url)
+  rows: unknown[];                   // each row without its data object
+  bytes: number;
+  expiresAt: number;                 // set when the bucket is stored
+}
+
+export interface ReportCacheStats {
+  enabled: boolean;
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+  hits: number;
+  misses: number;
+  gapFetches: number;
+  bypassed: number;
+  rollUps: number;
+  evictions: number;
+  invalidations: number;
+  ttlMs: number;
+  settleDays: number;
+}
+
+// ============================================================================
+// SPLITTING & STITCHING
+// ============================================================================
+
+/**
+ * Map a period label from the API ("2024", "2024-01", "2024-01-15") to the
+ * start of its period, or undefined if the label is not in that form.
+ */
+function periodOfLabel(label: unknown, groupBy: string): number | undefined {
+  const match = typeof label === 'string' ? /^(\d{4})(?:-(\d{2}))?(?:-(\d{2}))?/.exec(label) : null;
+  if (!match) return undefined;
+  if (groupBy !== 'year' && !match[2]) return undefined;
+  if (groupBy === 'day' && !match[3]) return undefined;
+
+  const day = Date.UTC(Number(match[1]), Number(match[2] ?? 1) - 1, Number(match[3] ?? 1));
+  return periodStart(day, groupBy);
+}
+
+/**
+ * Split a fetched report into rows per period.
+ * @param fallbackPeriod - Where entities without any sub_data are filed
+ * @returns undefined if the response is not in the expected shape
+ */
+function splitByPeriod(
+  result: unknown,
+  shape: ReportShape,
+  groupBy: string,
+  fallbackPeriod: number,
+): Map<number, unknown[]> | undefined {
+  if (!Array.isArray(result)) return undefined;
+
+  const byPeriod = new Map<number, unknown[]>();
+  const add = (period: number, row: unknown) => {
+    const rows = byPeriod.get(period);
+    if (rows) rows.push(row); else byPeriod.set(period, [row]);
+  };
+
+  for (const item of result) {
+    if (shape === 'timeline') {
+      const period = periodOfLabel((item as Record<string, unknown>)?.period, groupBy);
+      if (period === undefined) return undefined;
+      add(period, item);
+      continue;
+    }
+
+    const { data: _data, sub_data, ...header } = (item ?? {}) as Record<string, unknown>;
+    if (!Array.isArray(sub_data)) return undefined;
+    if (sub_data.length === 0) add(fallbackPeriod, { header } satisfies GroupedRow);
+    for (const sub of sub_data) {
+      const period = periodOfLabel((sub as Record<string, unknown>)?.period, groupBy);
+      if (period === undefined) return undefined;
+      add(period, { header, sub } satisfies GroupedRow);
+    }
+  }
+
+  return byPeriod;
+}
+
+/**
+ * Reassemble periods (in order) into the API's response shape.
+ */
+function stitch(segments: Segment[], shape: ReportShape, query: ReportQuery): unknown[] {
+  if (shape === 'timeline') {
+    return sortByColumn(segments.flatMap((segment) => segment.rows ?? []), query);
+  }
+
+  const entities = new Map<string, { header: Record<string, unknown>; subData: unknown[] }>();
+  for (const segment of segments) {
+    for (const row of (segment.rows ?? []) as GroupedRow[]) {
+      const id = String(row.header.id);
+      let entity = entities.get(id);
+      if (!entity) {
+        entity = { header: row.header, subData: [] };
+        entities.set(id, entity);
+      } else {
+        entity.header = row.header;   // keep the most recent name/email
+      }
+      if (row.sub !== undefined) entity.subData.push(row.sub);
+    }
+  }
+
+  const items = [...entities.values()].map(({ header, subData }) => ({
+    ...header,
+    data: sumColumns(subData, query.columns),
+    sub_data: subData,
+  }));
+  return sortByColumn(items, query);
+}
+
+function sumColumns(subData: unknown[], columns: string[]): Record<string, number> {
+  const totals: Record<string, number> = {};
+  for (const column of columns) totals[column] = 0;
+
+  for (const sub of subData) {
+    const data = (sub as Record<string, unknown>)?.data as Record<string, unknown> | undefined;
+    for (const column of columns) {
+      const value = data?.[column];
+      if (typeof value === 'number') totals[column] += value;
+    }
+  }
+  return totals;
+}
+
+/**
+ * Apply sort_by/sort_direction to stitched items (the API sorted each gap on
+ * its own, which says nothing about the combined order).
+ */
+function sortByColumn<T>(items: T[], query: ReportQuery): T[] {
+  if (!query.sort_by || !query.sort_direction) return items;
+
+  const column = query.sort_by;
+  const direction = query.sort_direction === 'desc' ? -1 : 1;
+  const valueOf = (item: T) => {
+    const value = ((item as Record<string, unknown>)?.data as Record<string, unknown> | undefined)?.[column];
+    return typeof value === 'number' ? value : undefined;
+  };
+
+  return items.sort((a, b) => {
+    const va = valueOf(a);
+    const vb = valueOf(b);
+    if (va === undefined || vb === undefined) return (va === undefined ? 1 : 0) - (vb === undefined ? 1 : 0);
+    return (va - vb) * direction;
+  });
+}
+
+/**
+ * Build a month/year report from day segments (one segment per day,
+ * in order), in the same shape the API would return.
+ */
+function rollUpReport(
+  segments: Segment[],
+  shape: ReportShape,
+  query: ReportQuery,
+  dayColumns: string[],
+): unknown[] {
+  const firstDay = segments[0].period;
+  const days = segments.length;
+  const grid = periodGrid(firstDay, days, query.group_by);
+  const columns = query.columns;
+
+  const toSubData = (series: DaySeries) => {
+    const rolled = rollUp(series, grid, columns);
+    const entries: { period: string; id: string; data: Record<string, number> }[] = [];
+    for (let p = 0; p < grid.starts.length; p++) {
+      if (!rolled.present[p]) continue;
+      const label = periodLabel(grid.starts[p], query.group_by);
+      entries.push({ period: label, id: label, data: periodData(rolled, columns, p) });
+    }
+    return entries;
+  };
+
+  if (shape === 'timeline') {
+    const series = createDaySeries(dayColumns, days);
+    segments.forEach((segment, day) => {
+      for (const row of segment.rows ?? []) {
+        addDay(series, day, (row as Record<string, unknown>)?.data as Record<string, unknown>);
+      }
+    });
+    return sortByColumn(toSubData(series), query);
+  }
+
+  const entities = new Map<string, { header: Record<string, unknown>; series: DaySeries }>();
+  segments.forEach((segment, day) => {
+    for (const row of (segment.rows ?? []) as GroupedRow[]) {
+      const id = String(row.header.id);
+      let entity = entities.get(id);
+      if (!entity) {
+        entity = { header: row.header, series: createDaySeries(dayColumns, days) };
+        entities.set(id, entity);
+      } else {
+        entity.header = row.header;
+      }
+      if (row.sub !== undefined) {
+        addDay(entity.series, day, (row.sub as Record<string, unknown>)?.data as Record<string, unknown>);
+      }
+    }
+  });
+
+  const total = singlePeriodGrid(firstDay, days);
+  const items = [...entities.values()].map(({ header, series }) => ({
+    ...header,
+    data: periodData(rollUp(series, total, columns), columns, 0),
+    sub_data: toSubData(series),
+  }));
+  return sortByColumn(items, query);
+}
+
+// ============================================================================
+// COLUMN STORAGE
+// ============================================================================
+
+/**
+ * Separate a row's metrics from the rest of it. Grouped rows carry their
+ * metrics in sub.data; the other shapes in data.
+ */
+function detachData(row: unknown, shape: ReportShape): { rest: unknown; data?: Record<string, unknown> } {
+  if (shape === 'grouped') {
+    const { header, sub } = row as GroupedRow;
+    if (sub === undefined) return { rest: { header } };
+    const { data, ...subRest } = (sub ?? {}) as Record<string, unknown>;
+    return { rest: { header, sub: subRest }, data: data as Record<string, unknown> | undefined };
+  }
+  const { data, ...rest } = (row ?? {}) as Record<string, unknown>;
+  return { rest, data: data as Record<string, unknown> | undefined };
+}
+
+function attachData(rest: unknown, shape: ReportShape, data: Record<string, unknown>): unknown {
+  if (shape === 'grouped') {
+    const { header, sub } = rest as { header: Record<string, unknown>; sub?: Record<string, unknown> };
+    return sub === undefined ? { header } : { header, sub: { ...sub, data } };
+  }
+  return { ...(rest as Record<string, unknown>), data };
+}
+
+/**
+ * @param requested - Columns the rows were fetched with; any the API left
+ *                    out are stored as missing, so they read back as null
+ */
+function encodeBucket(rows: unknown[], shape: ReportShape, requested: string[]): ColumnBucket {
+  const detached = rows.map((row) => detachData(row, shape));
+
+  const columnSet = new Set<string>(requested);
+  for (const { data } of detached) for (const column of Object.keys(data ?? {})) columnSet.add(column);
+  const columns = [...columnSet];
+
+  const rowCount = rows.length;
+  const values = new Float64Array(columns.length * rowCount).fill(NaN);
+  const text = new Map<string, unknown[]>();
+
+  columns.forEach((column, c) => {
+    for (let r = 0; r < rowCount; r++) {
+      const value = detached[r].data?.[column];
+      if (typeof value === 'number') {
+        values[c * rowCount + r] = value;
+      } else if (value !== undefined && value !== null && !text.has(column)) {
+        text.set(column, detached.map((row) => row.data?.[column]));
+      }
+    }
+  });
+
+  const rest = detached.map((row) => row.rest);
+  const bytes = values.byteLength + Buffer.byteLength(JSON.stringify(rest)) +
+    (text.size > 0 ? Buffer.byteLength(JSON.stringify([...text.values()])) : 0);
+  return { columns, rowCount, values, text, rows: rest, bytes, expiresAt: 0 };
+}
+
+/**
+ * Rebuild rows holding only the requested columns, or undefined if the
+ * bucket lacks one of them.
+ */
+function decodeBucket(bucket: ColumnBucket, shape: ReportShape, columns: string[]): unknown[] | undefined {
+  const positions: number[] = [];
+  for (const column of columns) {
+    const position = bucket.columns.indexOf(column);
+    if (position < 0) return undefined;
+    positions.push(position);
+  }
+
+  return bucket.rows.map((rest, r) => {
+    const data: Record<string, unknown> = {};
+    columns.forEach((column, i) => {
+      const text = bucket.text.get(column);
+      if (text) {
+        data[column] = text[r] ?? null;
+      } else {
+        const value = bucket.values[positions[i] * bucket.rowCount + r];
+        data[column] = Number.isNaN(value) ? null : value;
+      }
+    });
+    return attachData(rest, shape, data);
+  });
+}
+
+// ============================================================================
+// CACHE
+// ============================================================================
+
+export class ReportCache {
+  // Insertion order doubles as LRU order, as in ResponseCache
+  private readonly buckets = new Map<string, ColumnBucket>();
+  private totalBytes = 0;
+  private hits = 0;
+  private misses = 0;
+  private gapFetches = 0;
+  private bypassed = 0;
+  private rollUps = 0;
+  private evictions = 0;
+  private invalidations = 0;
+
+  // Bumped by every invalidation; gap fetches that started before it are
+  // not stored, as with ResponseCache.generation()
+  private generation = 0;
+
+  constructor(private readonly maxBytes: number) {}
+
+  get enabled(): boolean {
+    return this.maxBytes > 0;
+  }
+
+  /**
+   * Answer a report query from cached periods, fetching only the gaps.
+   *
+   * @param endpoint - e.g. '/reports/overview'
+   * @param query - The tool's report arguments
+   * @param allColumns - Every column the endpoint offers; gaps are fetched
+   *                     with all of them so any later subset is a hit
+   * @param fetchRange - Calls the API for a query (used per gap, with the
+   *                     gap's dates and without sorting, or for the whole
+   *                     query when it cannot be decomposed)
+   */
+  async fetch(
+    endpoint: string,
+    query: ReportQuery,
+    allColumns: readonly string[],
+    fetchRange: (query: ReportQuery) => Promise<unknown>,
+  ): Promise<unknown> {
+    const shape = REPORT_SHAPES[endpoint];
+    if (!shape || !this.enabled) {
+      this.bypassed++;
+      return fetchRange(query);
+    }
+    const fetchColumns = [...new Set([...allColumns, ...query.columns])];
+
+    if (shape === 'totals') {
+      return this.fetchTotals(endpoint, query, fetchColumns, fetchRange);
+    }
+
+    // Month/year from days, when the days are (nearly all) on file
+    if (ROLLUP_GROUP_BY.has(query.group_by) && canRollUp(query.columns)) {
+      const rolled = await this.rollUpFromDays(endpoint, shape, query, fetchColumns, fetchRange);
+      if (rolled) return rolled;
+    }
+
+    // A grouped report's per-entity totals are re-summed from its periods,
+    // which only works for additive columns
+    const stitchable = DECOMPOSABLE_GROUP_BY.has(query.group_by) &&
+      (shape === 'timeline' || query.columns.every((column) => ADDITIVE_COLUMNS.has(column)));
+    const segments = stitchable ? this.plan(query) : undefined;
+    if (!segments || !(await this.load(endpoint, shape, query, segments, fetchColumns, fetchRange))) {
+      this.bypassed++;
+      return fetchRange(query);
+    }
+
+    return stitch(segments, shape, query);
+  }
+
+  /**
+   * Drop every cached period after a mutation that touched one of the
+   * given families, if report numbers depend on them.
+   */
+  invalidate(families: string[]): void {
+    if (!families.includes('reports')) return;
+    this.generation++;
+    if (this.buckets.size === 0) return;
+
+    this.invalidations += this.buckets.size;
+    logger.debug(`Report cache: invalidated ${this.buckets.size} period(s)`);
+    this.buckets.clear();
+    this.totalBytes = 0;
+  }
+
+  stats(): ReportCacheStats {
+    return {
+      enabled: this.enabled,
+      entries: this.buckets.size,
+      bytes: this.totalBytes,
+      maxBytes: this.maxBytes,
+      hits: this.hits,
+      misses: this.misses,
+      gapFetches: this.gapFetches,
+      bypassed: this.bypassed,
+      rollUps: this.rollUps,
+      evictions: this.evictions,
+      invalidations: this.invalidations,
+      ttlMs: REPORT_CACHE_TTL_MS,
+      settleDays: REPORT_SETTLE_DAYS,
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  /**
+   * Fill every segment's rows: cached periods from the cache, the rest with
+   * one API call per run of consecutive missing periods.
+   * @returns false if a fetched response could not be split by period
+   */
+  private async load(
+    endpoint: string,
+    shape: ReportShape,
+    query: ReportQuery,
+    segments: Segment[],
+    fetchColumns: string[],
+    fetchRange: (query: ReportQuery) => Promise<unknown>,
+  ): Promise<boolean> {
+    const series = seriesKey(endpoint, query);
+    const generation = this.generation;
+
+    // Look up cached periods; consecutive missing ones form one gap
+    const gaps: Segment[][] = [];
+    let previousMissing = false;
+    for (const segment of segments) {
+      segment.rows = segment.cacheable ? this.get(`${series}|${segment.period}`, shape, query.columns) : undefined;
+      if (segment.rows) {
+        this.hits++;
+        previousMissing = false;
+        continue;
+      }
+      if (segment.cacheable) this.misses++;
+      if (previousMissing) gaps[gaps.length - 1].push(segment); else gaps.push([segment]);
+      previousMissing = true;
+    }
+
+    const results = await Promise.all(gaps.map((gap) => fetchRange({
+      ...query,
+      columns: fetchColumns,
+      start_date: gap[0].from,
+      end_date: gap[gap.length - 1].to,
+      sort_by: undefined,
+      sort_direction: undefined,
+    })));
+    this.gapFetches += gaps.length;
+
+    for (let i = 0; i < gaps.length; i++) {
+      const gap = gaps[i];
+      const byPeriod = splitByPeriod(results[i], shape, query.group_by, gap[0].period);
+      if (!byPeriod) {
+        // Unexpected layout (e.g. unfamiliar period labels) — caller asks for the whole range as-is
+        logger.warn(`Report cache: could not split ${endpoint} response by period, fetching the full range`);
+        return false;
+      }
+
+      for (const segment of gap) {
+        const bucket = encodeBucket(byPeriod.get(segment.period) ?? [], shape, fetchColumns);
+        if (segment.cacheable && this.generation === generation) this.set(`${series}|${segment.period}`, bucket);
+        segment.rows = decodeBucket(bucket, shape, query.columns) ?? [];
+      }
+    }
+
+    logger.debug(
+      `Report cache: ${endpoint} by ${query.group_by}, ${segments.length} period(s), ` +
+      `${segments.length - gaps.reduce((n, gap) => n + gap.length, 0)} cached, ${gaps.length} gap fetch(es)`
+    );
+    return true;
+  }
+
+  /**
+   * Serve a month/year query by rolling up day buckets. Missing days
+   * are fetched by day first, unless more than ROLLUP_MAX_FETCH_DAYS closed
+   * days are missing (then undefined: fetch at the requested granularity).
+   */
+  private async rollUpFromDays(
+    endpoint: string,
+    shape: ReportShape,
+    query: ReportQuery,
+    fetchColumns: string[],
+    fetchRange: (query: ReportQuery) => Promise<unknown>,
+  ): Promise<unknown[] | undefined> {
+    const dayQuery: ReportQuery = { ...query, group_by: 'day', columns: dayColumnsFor(query.columns) };
+    const segments = this.plan(dayQuery);
+    if (!segments) return undefined;
+
+    const series = seriesKey(endpoint, dayQuery);
+    let missing = 0;
+    for (const segment of segments) {
+      if (segment.cacheable && !this.has(`${series}|${segment.period}`)) missing++;
+    }
+    if (missing > ROLLUP_MAX_FETCH_DAYS) return undefined;
+
+    if (!(await this.load(endpoint, shape, dayQuery, segments, fetchColumns, fetchRange))) return undefined;
+    this.rollUps++;
+    return rollUpReport(segments, shape, query, dayQuery.columns);
+  }
+
+  /**
+   * URL reports: cached per exact date range once the range is over.
+   */
+  private async fetchTotals(
+    endpoint: string,
+    query: ReportQuery,
+    fetchColumns: string[],
+    fetchRange: (query: ReportQuery) => Promise<unknown>,
+  ): Promise<unknown> {
+    const end = parseDay(query.end_date);
+    if (parseDay(query.start_date) === undefined || end === undefined) {
+      this.bypassed++;
+      return fetchRange(query);
+    }
+
+    const key = `${seriesKey(endpoint, query)}|${query.start_date}..${query.end_date}`;
+    const cached = this.get(key, 'totals', query.columns);
+    if (cached) {
+      this.hits++;
+      return sortByColumn(cached, query);
+    }
+
+    const generation = this.generation;
+    const result = await fetchRange({ ...query, columns: fetchColumns, sort_by: undefined, sort_direction: undefined });
+    this.gapFetches++;
+    if (!Array.isArray(result)) return result;
+
+    const bucket = encodeBucket(result, 'totals', fetchColumns);
+    if (end < settledBefore() && this.generation === generation) {
+      this.misses++;
+      this.set(key, bucket);
+    }
+    return sortByColumn(decodeBucket(bucket, 'totals', query.columns) ?? [], query);
+  }
+
+  /**
+   * Split the requested range into periods, or undefined if the dates are
+   * not plain YYYY-MM-DD or the range is too long.
+   */
+  private plan(query: ReportQuery): Segment[] | undefined {
+    const groupBy = query.group_by;
+    const start = parseDay(query.start_date);
+    const end = parseDay(query.end_date);
+    if (start === undefined || end === undefined || end < start) return undefined;
+
+    const closedBefore = settledBefore();
+    const segments: Segment[] = [];
+
+    for (let period = periodStart(start, groupBy); period <= end; period = nextPeriod(period, groupBy)) {
+      const last = nextPeriod(period, groupBy) - DAY_MS;
+      const from = Math.max(period, start);
+      const to = Math.min(last, end);
+      segments.push({
+        period,
+        from: formatDay(from),
+        to: formatDay(to),
+        cacheable: from === period && to === last && last < closedBefore,
+      });
+      if (segments.length > MAX_SEGMENTS) return undefined;
+    }
+
+    return segments;
+  }
+
+  /**
+   * Rows of a cached bucket with only the requested columns, or undefined
+   * if the bucket is missing or lacks a column.
+   */
+  private get(key: string, shape: ReportShape, columns: string[]): unknown[] | undefined {
+    if (!this.has(key)) return undefined;
+    const bucket = this.buckets.get(key)!;
+
+    const rows = decodeBucket(bucket, shape, columns);
+    if (rows) {
+      // Move to the most-recently-used end
+      this.buckets.delete(key);
+      this.buckets.set(key, bucket);
+    }
+    return rows;
+  }
+
+  /** Whether a live bucket exists; expired ones are dropped on access. */
+  private has(key: string): boolean {
+    const bucket = this.buckets.get(key);
+    if (!bucket) return false;
+    if (bucket.expiresAt > Date.now()) return true;
+    this.buckets.delete(key);
+    this.totalBytes -= bucket.bytes;
+    return false;
+  }
+
+  private set(key: string, bucket: ColumnBucket): void {
+    const bytes = bucket.bytes;
+    if (bytes > this.maxBytes / 4) return;
+    bucket.expiresAt = Date.now() + REPORT_CACHE_TTL_MS;
+
+    const existing = this.buckets.get(key);
+    if (existing) {
+      this.buckets.delete(key);
+      this.totalBytes -= existing.bytes;
+    }
+
+    this.buckets.set(key, bucket);
+    this.totalBytes += bytes;
+
+    for (const [oldKey, old] of this.buckets) {
+      if (this.totalBytes <= this.maxBytes) break;
+      this.buckets.delete(oldKey);
+      this.totalBytes -= old.bytes;
+      this.evictions++;
+    }
+  }
+}
+
+/**
+ * UTC ms of the first day that may still change: periods ending before it
+ * are closed.
+ */
+function settledBefore(): number {
+  return today() - REPORT_SETTLE_DAYS * DAY_MS;
+}
+
+/**
+ * Identifies one time series: everything in the query except the dates,
+ * columns (buckets hold all of them) and sorting.
+ */
+function seriesKey(endpoint: string, query: ReportQuery): string {
+  return `${endpoint}|${query.group_by}|${query.q ?? ''}`;
+}
+
+// Shared instance used by the report tools
+export const reportCache = new ReportCache(REPORT_CACHE_MAX_BYTES);
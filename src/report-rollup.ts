@@ -0,0 +1,272 @@
+/**
+ * Report Roll-Up Engine
+ *
+ * Builds month/year report views from day-level series without asking
+ * the API again. Like a shop's daily till receipts: the monthly total is just
+ * the sum of that month's receipts — no need to call the bank for it.
+ *
+ * Includes:
+ * - UTC calendar helpers shared with report-cache.ts (period starts, labels)
+ * - Day series stored column-wise in Float64Arrays
+ * - Roll-up as one tight pass per column: day → period index → running sum
+ * - Ratio columns (conversion rates) recomputed from their summed numerator
+ *   and denominator, never averaged
+ *
+ * Snapshot and rolling metrics (active_customers, monthly_churn, 3m/6m EPC)
+ * cannot be derived from daily values and are not rolled up.
+ */
+
+// ============================================================================
+// CALENDAR (UTC, like cacheTtlFor in cache.ts)
+// ============================================================================
+
+export const DAY_MS = 86_400_000;
+
+/** UTC ms of a 'YYYY-MM-DD' date, or undefined for any other format. */
+export function parseDay(value: string): number | undefined {
+  if (!/^\d{4}-\d{2}-\d{2}$/.test(value)) return undefined;
+  const ms = Date.parse(`${value}T00:00:00Z`);
+  return Number.isNaN(ms) ? undefined : ms;
+}
+
+export function formatDay(ms: number): string {
+  return new Date(ms).toISOString().slice(0, 10);
+}
+
+/** Today (UTC) as ms of midnight. */
+export function today(): number {
+  return parseDay(new Date().toISOString().slice(0, 10))!;
+}
+
+/**
+ * First day of the period containing `day`. There is no week rule: week
+ * boundaries depend on the account's week start, which the API does not
+ * tell us, so weeks always come from the API.
+ */
+export function periodStart(day: number, groupBy: string): number {
+  const date = new Date(day);
+  if (groupBy === 'month') return Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), 1);
+  if (groupBy === 'year') return Date.UTC(date.getUTCFullYear(), 0, 1);
+  return day;
+}
+
+export function nextPeriod(start: number, groupBy: string): number {
+  const date = new Date(start);
+  if (groupBy === 'month') return Date.UTC(date.getUTCFullYear(), date.getUTCMonth() + 1, 1);
+  if (groupBy === 'year') return Date.UTC(date.getUTCFullYear() + 1, 0, 1);
+  return start + DAY_MS;
+}
+
+/**
+ * Period label in the API's style: '2024', '2024-01', '2024-01-15'.
+ */
+export function periodLabel(start: number, groupBy: string): string {
+  const day = formatDay(start);
+  if (groupBy === 'year') return day.slice(0, 4);
+  if (groupBy === 'month') return day.slice(0, 7);
+  return day;
+}
+
+// ============================================================================
+// COLUMNS
+// ============================================================================
+
+/**
+ * Columns whose total over a range is the sum of their daily values.
+ */
+export const ADDITIVE_COLUMNS = new Set([
+  'clicks_count',
+  'net_revenue_amount',
+  'revenue_amount',
+  'referrals_count',
+  'customers_count',
+  'sales_count',
+  'refunds_count',
+  'cancelled_customers_count',
+  'promoter_earnings_amount',
+  'non_link_customers',
+  'promoter_paid_amount',
+  'signups_count',
+]);
+
+/**
+ * Conversion rates and the additive columns they are computed from.
+ * Averaging daily rates would weight a 2-click day like a 2,000-click day.
+ */
+export const RATIO_COLUMNS: Record<string, { numerator: string; denominator: string }> = {
+  clicks_to_customers_cr: { numerator: 'customers_count', denominator: 'clicks_count' },
+  clicks_to_referrals_cr: { numerator: 'referrals_count', denominator: 'clicks_count' },
+  referrals_to_customers_cr: { numerator: 'customers_count', denominator: 'referrals_count' },
+};
+
+/** True if every column can be derived from daily values. */
+export function canRollUp(columns: string[]): boolean {
+  return columns.every((column) => ADDITIVE_COLUMNS.has(column) || column in RATIO_COLUMNS);
+}
+
+/**
+ * Day-level columns needed to roll up `columns`: the additive ones, each
+ * ratio's numerator and denominator, and the ratio itself (to learn whether
+ * the API reports it as a fraction or a percentage).
+ */
+export function dayColumnsFor(columns: string[]): string[] {
+  const needed = new Set<string>();
+  for (const column of columns) {
+    needed.add(column);
+    const ratio = RATIO_COLUMNS[column];
+    if (ratio) {
+      needed.add(ratio.numerator);
+      needed.add(ratio.denominator);
+    }
+  }
+  return [...needed].sort();
+}
+
+// ============================================================================
+// DAY SERIES
+// ============================================================================
+
+/**
+ * One value per day for each column, plus which days had any data at all.
+ */
+export interface DaySeries {
+  days: number;
+  values: Map<string, Float64Array>;
+  present: Uint8Array;
+}
+
+export function createDaySeries(columns: string[], days: number): DaySeries {
+  const values = new Map<string, Float64Array>();
+  for (const column of columns) values.set(column, new Float64Array(days));
+  return { days, values, present: new Uint8Array(days) };
+}
+
+/**
+ * Add one API data object ({ clicks_count: 12, ... }) to a day.
+ */
+export function addDay(series: DaySeries, day: number, data: Record<string, unknown> | undefined): void {
+  series.present[day] = 1;
+  if (!data) return;
+  for (const [column, values] of series.values) {
+    const value = data[column];
+    if (typeof value === 'number') values[day] += value;
+  }
+}
+
+// ============================================================================
+// ROLL-UP
+// ============================================================================
+
+/**
+ * Maps each day of a series to the period it belongs to.
+ */
+export interface PeriodGrid {
+  starts: Float64Array;   // UTC ms of each period's first day
+  index: Int32Array;      // day → position in starts
+}
+
+/**
+ * @param firstDay - UTC ms of the series' day 0
+ * @param days - Length of the series
+ * @param groupBy - 'day', 'month' or 'year'
+ */
+export function periodGrid(firstDay: number, days: number, groupBy: string): PeriodGrid {
+  const index = new Int32Array(days);
+  const starts: number[] = [];
+  let next = -Infinity;
+
+  for (let day = 0; day < days; day++) {
+    const ms = firstDay + day * DAY_MS;
+    if (ms >= next) {
+      const start = periodStart(ms, groupBy);
+      starts.push(start);
+      next = nextPeriod(start, groupBy);
+    }
+    index[day] = starts.length - 1;
+  }
+
+  return { starts: Float64Array.from(starts), index };
+}
+
+/** A grid putting every day in one period — for whole-range totals. */
+export function singlePeriodGrid(firstDay: number, days: number): PeriodGrid {
+  return { starts: Float64Array.of(firstDay), index: new Int32Array(days) };
+}
+
+export interface RolledUp {
+  values: Map<string, Float64Array>;   // column → one value per period
+  present: Uint8Array;                 // periods with at least one day of data
+}
+
+/**
+ * Sum a day series into periods and recompute ratio columns.
+ */
+export function rollUp(series: DaySeries, grid: PeriodGrid, columns: string[]): RolledUp {
+  const periods = grid.starts.length;
+  const index = grid.index;
+  const sums = new Map<string, Float64Array>();
+
+  const sumColumn = (column: string): Float64Array => {
+    let out = sums.get(column);
+    if (out) return out;
+    out = new Float64Array(periods);
+    const daily = series.values.get(column);
+    if (daily) {
+      for (let day = 0; day < series.days; day++) out[index[day]] += daily[day];
+    }
+    sums.set(column, out);
+    return out;
+  };
+
+  const present = new Uint8Array(periods);
+  for (let day = 0; day < series.days; day++) present[index[day]] |= series.present[day];
+
+  const values = new Map<string, Float64Array>();
+  for (const column of columns) {
+    const ratio = RATIO_COLUMNS[column];
+    if (!ratio) {
+      values.set(column, sumColumn(column));
+      continue;
+    }
+
+    const numerator = sumColumn(ratio.numerator);
+    const denominator = sumColumn(ratio.denominator);
+    const scale = ratioScale(series, column);
+    const out = new Float64Array(periods);
+    for (let p = 0; p < periods; p++) {
+      out[p] = denominator[p] > 0 ? Math.round((numerator[p] / denominator[p]) * scale * 100) / 100 : 0;
+    }
+    values.set(column, out);
+  }
+
+  return { values, present };
+}
+
+/**
+ * Whether the API reports a ratio as a fraction (1) or a percentage (100),
+ * read off a day where both the ratio and its inputs are known.
+ */
+function ratioScale(series: DaySeries, column: string): number {
+  const { numerator, denominator } = RATIO_COLUMNS[column];
+  const reported = series.values.get(column);
+  const num = series.values.get(numerator);
+  const den = series.values.get(denominator);
+  if (!reported || !num || !den) return 100;
+
+  for (let day = 0; day < series.days; day++) {
+    if (den[day] > 0 && num[day] > 0 && reported[day] > 0) {
+      const factor = reported[day] / (num[day] / den[day]);
+      return Math.abs(factor - 100) < Math.abs(factor - 1) ? 100 : 1;
+    }
+  }
+  return 100;
+}
+
+/**
+ * One period's values as an API-style data object.
+ */
+export function periodData(rolled: RolledUp, columns: string[], period: number): Record<string, number> {
+  const data: Record<string, number> = {};
+  for (const column of columns) data[column] = rolled.values.get(column)![period];
+  return data;
+}
@@ -0,0 +1,261 @@
+/**
+ * Request Context
+ *
+ * Carries the MCP request's cancellation signal and progress channel down
+ * to the code that does the waiting (rate limiter, retry backoff, HTTP
+ * sockets, pagination), without adding a parameter to every function in
+ * between. Like a ticket stub clipped to an order as it moves through the
+ * kitchen: any cook can check whether the customer has left, and call out
+ * how far along the order is.
+ *
+ * Includes:
+ * - installRequestContext() — wraps server.registerTool so every tool
+ *   handler runs inside its request's context (AsyncLocalStorage)
+ * - currentSignal() / throwIfAborted() / abortError() for cancellation
+ * - startProgress() — MCP progress notifications for the outermost loop
+ *   of a call (pages, fan-out, batch polling)
+ * - withPriority() / runInBackground() — the rate limiter class of the
+ *   requests made inside (see rate-limiter.ts)
+ *
+ * Code running outside a tool call (e.g. the promoter mirror's background
+ * sync) has no context: no signal, progress reports are dropped, and its
+ * requests run at background priority.
+ */
+
+import { AsyncLocalStorage } from 'node:async_hooks';
+import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
+import { PRIORITIES, type RequestPriority } from './rate-limiter.js';
+
+// ============================================================================
+// CONTEXT
+// ============================================================================
+
+/**
+ * The parts of the SDK's RequestHandlerExtra this file uses.
+ */
+interface ToolCallExtra {
+  signal?: AbortSignal;
+  _meta?: { progressToken?: string | number };
+  sendNotification?: (notification: {
+    method: 'notifications/progress';
+    params: { progressToken: string | number; progress: number; total?: number; message?: string };
+  }) => Promise<void>;
+}
+
+interface RequestContext {
+  tool: string;
+  signal?: AbortSignal;
+  progressToken?: string | number;
+  sendNotification?: ToolCallExtra['sendNotification'];
+  progressOwner?: object;     // the reporter currently allowed to send
+  lastProgress: number;       // progress must increase with every notification
+  staleAgeMs?: number;        // oldest stale cache entry served to this call
+}
+
+export interface RequestContextStats {
+  toolCalls: number;
+  cancelled: number;             // calls whose client aborted them
+  progressNotifications: number;
+}
+
+const storage = new AsyncLocalStorage<RequestContext>();
+const priorityStorage = new AsyncLocalStorage<RequestPriority>();
+// Signal narrowed by withSignal(), which overrides the tool call's own
+const signalStorage = new AsyncLocalStorage<AbortSignal>();
+const stats: RequestContextStats = { toolCalls: 0, cancelled: 0, progressNotifications: 0 };
+
+/**
+ * Make every tool registered on `server` from now on run inside its
+ * request's context. Call once, before the tools are registered.
+ */
+export function installRequestContext(server: McpServer): void {
+  const registerTool = server.registerTool.bind(server) as unknown as (...args: unknown[]) => unknown;
+
+  server.registerTool = ((name: string, config: unknown, handler: (...params: unknown[]) => unknown) =>
+    registerTool(name, config, (...params: unknown[]) => {
+      // The SDK passes (args, extra), or just (extra) for tools without input
+      const extra = (params[params.length - 1] ?? {}) as ToolCallExtra;
+      stats.toolCalls++;
+      extra.signal?.addEventListener('abort', () => { stats.cancelled++; }, { once: true });
+
+      return storage.run({
+        tool: name,
+        signal: extra.signal,
+        progressToken: extra._meta?.progressToken,
+        sendNotification: extra.sendNotification,
+        lastProgress: 0,
+      }, () => handler(...params));
+    })) as unknown as typeof server.registerTool;
+}
+
+export function getRequestContextStats(): RequestContextStats {
+  return { ...stats };
+}
+
+/** The name of the tool whose call is running, if any. */
+export function currentTool(): string | undefined {
+  return storage.getStore()?.tool;
+}
+
+// ============================================================================
+// CANCELLATION
+// ============================================================================
+
+/** The current tool call's abort signal, if any. */
+export function currentSignal(): AbortSignal | undefined {
+  return signalStorage.getStore() ?? storage.getStore()?.signal;
+}
+
+/**
+ * Run fn with its requests also cancelled by `signal` — for work the caller
+ * may drop on its own, like pages prefetched ahead of a listing that stops
+ * early. The tool call's signal still applies.
+ */
+export function withSignal<T>(signal: AbortSignal, fn: () => T): T {
+  const outer = currentSignal();
+  if (!outer) return signalStorage.run(signal, fn);
+
+  // Either signal aborts the combination (AbortSignal.any needs Node 20.3)
+  const combined = new AbortController();
+  const abort = () => combined.abort();
+  for (const source of [outer, signal]) {
+    if (source.aborted) abort();
+    else source.addEventListener('abort', abort, { once: true });
+  }
+  return signalStorage.run(combined.signal, fn);
+}
+
+export function abortError(): Error {
+  const error = new Error('Request cancelled by the client');
+  error.name = 'AbortError';
+  return error;
+}
+
+export function throwIfAborted(signal: AbortSignal | undefined): void {
+  if (signal?.aborted) throw abortError();
+}
+
+/**
+ * setTimeout as a promise that rejects with an AbortError as soon as the
+ * signal aborts.
+ */
+export function abortableSleep(ms: number, signal: AbortSignal | undefined): Promise<void> {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(abortError());
+      return;
+    }
+    const onAbort = () => {
+      clearTimeout(timer);
+      reject(abortError());
+    };
+    const timer = setTimeout(() => {
+      signal?.removeEventListener('abort', onAbort);
+      resolve();
+    }, ms);
+    signal?.addEventListener('abort', onAbort, { once: true });
+  });
+}
+
+// ============================================================================
+// STALE DATA
+// ============================================================================
+
+/**
+ * Record that the current tool call received a stale cache entry this old
+ * (the API was down), so its response can say so whatever its shape.
+ */
+export function noteStaleData(ageMs: number): void {
+  const context = storage.getStore();
+  if (context) context.staleAgeMs = Math.max(context.staleAgeMs ?? 0, ageMs);
+}
+
+/** Age of the oldest stale data the current tool call received, if any. */
+export function staleDataAge(): number | undefined {
+  return storage.getStore()?.staleAgeMs;
+}
+
+// ============================================================================
+// PROGRESS
+// ============================================================================
+
+export interface ProgressReporter {
+  /** Report `done` of `total` steps (total may be unknown). */
+  update(done: number, total?: number, message?: string): void;
+  /** Hand progress reporting back, e.g. to the next step of the call. */
+  end(): void;
+}
+
+const NO_PROGRESS: ProgressReporter = { update() {}, end() {} };
+
+/**
+ * Claim the progress channel of the current tool call. Only the first
+ * claimant reports — a paginator inside a fan-out stays quiet — and a
+ * no-op reporter is returned when the client did not ask for progress.
+ *
+ * Steps are shifted past whatever earlier reporters of the same call sent,
+ * so the progress value keeps increasing as the MCP spec requires.
+ */
+export function startProgress(): ProgressReporter {
+  const context = storage.getStore();
+  if (!context || context.progressToken === undefined || !context.sendNotification || context.progressOwner) {
+    return NO_PROGRESS;
+  }
+
+  const owner = {};
+  const base = context.lastProgress;
+  context.progressOwner = owner;
+
+  return {
+    update(done, total, message) {
+      const progress = base + done;
+      if (context.progressOwner !== owner || progress <= context.lastProgress || context.signal?.aborted) return;
+      context.lastProgress = progress;
+      stats.progressNotifications++;
+      context.sendNotification!({
+        method: 'notifications/progress',
+        params: {
+          progressToken: context.progressToken!,
+          progress,
+          ...(total !== undefined ? { total: base + total } : {}),
+          ...(message ? { message } : {}),
+        },
+      }).catch(() => {});
+    },
+    end() {
+      if (context.progressOwner === owner) context.progressOwner = undefined;
+    },
+  };
+}
+
+// ============================================================================
+// PRIORITY
+// ============================================================================
+
+/**
+ * The rate limiter class for requests made right now: interactive inside a
+ * tool call, background outside one, unless withPriority() lowered it.
+ */
+export function currentPriority(): RequestPriority {
+  return priorityStorage.getStore() ?? (storage.getStore() ? 'interactive' : 'background');
+}
+
+/**
+ * Run fn with its requests in a lower rate limiter class, e.g. the later
+ * pages of a listing as bulk. Never raises the priority: bulk work started
+ * from a background sync stays background.
+ */
+export function withPriority<T>(priority: RequestPriority, fn: () => T): T {
+  const current = currentPriority();
+  const lower = PRIORITIES.indexOf(priority) > PRIORITIES.indexOf(current) ? priority : current;
+  return priorityStorage.run(lower, fn);
+}
+
+/**
+ * Run fn detached from the current tool call — no signal, no progress —
+ * at background priority. For work that outlives the call that triggered
+ * it, like a promoter mirror sync kicked off by a query.
+ */
+export function runInBackground<T>(fn: () => T): T {
+  return storage.exit(() => signalStorage.exit(() => priorityStorage.run('background', fn)));
+}
@@ -0,0 +1,67 @@
+/**
+ * MCP Resources
+ *
+ * Tools push their results to the client; resources let the client pull
+ * data when it wants it. We use one resource template for responses that
+ * were too large to send inline (see result-store.ts): the tool returns a
+ * URI, and the client reads the full text chunk by chunk.
+ *
+ * URI format: firstpromoter://results/{id}/{chunk}   (chunk starts at 0)
+ */
+
+import { McpServer, ResourceTemplate } from "@modelcontextprotocol/sdk/server/mcp.js";
+import { resultStore, RESULT_URI_PREFIX } from './result-store.js';
+
+/**
+ * Registers all resources with the MCP server.
+ * Call this once during server startup.
+ */
+export function registerResources(server: McpServer): void {
+
+  // ==========================================================================
+  // Resource: stored-result
+  //
+  // One chunk of an oversized tool response. Results expire after
+  // FP_RESULT_STORE_TTL_MS and are evicted oldest-first when the store is full.
+  // ==========================================================================
+  server.registerResource(
+    "stored-result",
+    new ResourceTemplate(`${RESULT_URI_PREFIX}{id}/{chunk}`, {
+      // List the first chunk of every live result
+      list: async () => ({
+        resources: resultStore.list().map((result) => ({
+          uri: `${RESULT_URI_PREFIX}${result.id}/0`,
+          name: `${result.label} (${result.chunks} chunk(s), ${result.bytes} bytes)`,
+          mimeType: "text/plain",
+        })),
+      }),
+    }),
+    {
+      title: "Stored Tool Result",
+      description:
+        "Full text of a tool response that exceeded the inline size budget. " +
+        "Read chunks in order, starting at 0; the tool response says how many there are. " +
+        "Chunks are plain slices of the text, so concatenating them restores the full response.",
+      mimeType: "text/plain",
+    },
+    async (uri, variables) => {
+      const id = String(variables.id);
+      const chunk = parseInt(String(variables.chunk), 10);
+      const text = resultStore.readChunk(id, chunk);
+
+      if (text === undefined) {
+        throw new Error(
+          `Stored result chunk not found: ${uri.href}. It may have expired — re-run the tool to get a fresh result.`
+        );
+      }
+
+      return {
+        contents: [{
+          uri: uri.href,
+          mimeType: "text/plain",
+          text,
+        }]
+      };
+    }
+  );
+}
@@ -0,0 +1,272 @@
+/**
+ * Result Store (spill-to-resource)
+ *
+ * Some tool results are huge — a 100-row promoter page or a daily
+ * promoter report can reach hundreds of KB. Pushing that through stdio in
+ * one message floods the client's context. Instead, oversized responses are
+ * parked here and the tool returns a short preview plus a resource URI,
+ * like a cloakroom ticket: the coat stays in the back until you ask for it.
+ *
+ * Includes:
+ * - A byte budget and a token budget for every tool response, checked
+ *   separately (FP_RESPONSE_MAX_BYTES, FP_RESPONSE_MAX_TOKENS)
+ * - A bounded, expiring in-memory store of full responses
+ * - Chunked reads via the firstpromoter://results/{id}/{chunk} resource
+ *   (registered in resources.ts)
+ */
+
+import { randomUUID } from 'node:crypto';
+import { logger } from './logger.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+function envInt(name: string, fallback: number): number {
+  const value = parseInt(process.env[name] || '', 10);
+  return Number.isFinite(value) && value >= 0 ? value : fallback;
+}
+
+// Largest response sent inline (default 100 KB). 0 disables the byte budget.
+const RESPONSE_MAX_BYTES = envInt('FP_RESPONSE_MAX_BYTES', 100 * 1024);
+
+// Largest response in estimated tokens (~4 characters each). 0 disables it.
+const RESPONSE_MAX_TOKENS = envInt('FP_RESPONSE_MAX_TOKENS', 25_000);
+
+// Total memory for spilled results (default 64 MB) and how long they live
+const RESULT_STORE_MAX_BYTES = envInt('FP_RESULT_STORE_MAX_BYTES', 64 * 1024 * 1024);
+const RESULT_STORE_TTL_MS = envInt('FP_RESULT_STORE_TTL_MS', 30 * 60_000);
+
+// Size of one resource chunk, in characters (cut so no character is split)
+const RESULT_CHUNK_CHARS = envInt('FP_RESULT_CHUNK_CHARS', 64 * 1024) || 64 * 1024;
+
+// Rough characters-per-token ratio for JSON and English text
+const CHARS_PER_TOKEN = 4;
+
+export const RESULT_URI_PREFIX = 'firstpromoter://results/';
+
+// ============================================================================
+// STORE
+// ============================================================================
+
+interface StoredResult {
+  text: string;
+  chunkStarts: number[];  // offset of each chunk, plus text.length at the end
+  bytes: number;
+  label: string;
+  expiresAt: number;
+}
+
+export interface ResultStoreStats {
+  entries: number;
+  bytes: number;
+  maxBytes: number;
+  ttlMs: number;
+  maxResponseBytes: number;
+  maxResponseTokens: number;
+  spilled: number;
+  chunkReads: number;
+  evictions: number;
+}
+
+export class ResultStore {
+  // Insertion order doubles as age order, so the oldest result is evicted first
+  private readonly results = new Map<string, StoredResult>();
+  private totalBytes = 0;
+  private spilled = 0;
+  private chunkReads = 0;
+  private evictions = 0;
+
+  constructor(
+    private readonly maxBytes: number,
+    private readonly ttlMs: number,
+    readonly chunkChars: number,
+  ) {}
+
+  /**
+   * Keep a full response and return its id.
+   */
+  put(text: string, label: string): string {
+    this.purgeExpired();
+
+    const id = randomUUID();
+    const bytes = Buffer.byteLength(text);
+    const now = Date.now();
+    const chunkStarts = this.chunkStarts(text);
+    this.results.set(id, { text, chunkStarts, bytes, label, expiresAt: now + this.ttlMs });
+    this.totalBytes += bytes;
+    this.spilled++;
+
+    for (const [oldId, old] of this.results) {
+      if (this.totalBytes <= this.maxBytes || oldId === id) break;
+      this.remove(oldId, old);
+      this.evictions++;
+    }
+
+    return id;
+  }
+
+  /**
+   * Number of chunks a stored result is split into, or 0 if unknown/expired.
+   */
+  chunkCount(id: string): number {
+    const entry = this.lookup(id);
+    return entry ? entry.chunkStarts.length - 1 : 0;
+  }
+
+  /**
+   * Read one chunk of a stored result.
+   */
+  readChunk(id: string, chunk: number): string | undefined {
+    const entry = this.lookup(id);
+    if (!entry || chunk < 0 || chunk >= entry.chunkStarts.length - 1) return undefined;
+    this.chunkReads++;
+    return entry.text.slice(entry.chunkStarts[chunk], entry.chunkStarts[chunk + 1]);
+  }
+
+  /**
+   * Live results, newest first — used to list the resource.
+   */
+  list(): { id: string; label: string; bytes: number; chunks: number }[] {
+    this.purgeExpired();
+    return [...this.results.entries()].reverse().map(([id, entry]) => ({
+      id,
+      label: entry.label,
+      bytes: entry.bytes,
+      chunks: entry.chunkStarts.length - 1,
+    }));
+  }
+
+  stats(): ResultStoreStats {
+    this.purgeExpired();
+    return {
+      entries: this.results.size,
+      bytes: this.totalBytes,
+      maxBytes: this.maxBytes,
+      ttlMs: this.ttlMs,
+      maxResponseBytes: RESPONSE_MAX_BYTES,
+      maxResponseTokens: RESPONSE_MAX_TOKENS,
+      spilled: this.spilled,
+      chunkReads: this.chunkReads,
+      evictions: this.evictions,
+    };
+  }
+
+  /**
+   * Chunk offsets of `chunkChars` UTF-16 units each, moved back by one where
+   * a cut would separate the two halves of a surrogate pair (emoji, rare CJK).
+   */
+  private chunkStarts(text: string): number[] {
+    const starts = [0];
+    let start = 0;
+    do {
+      let end = Math.min(text.length, start + this.chunkChars);
+      if (end < text.length && isHighSurrogate(text.charCodeAt(end - 1)) && end - 1 > start) end--;
+      starts.push(end);
+      start = end;
+    } while (start < text.length);
+    return starts;
+  }
+
+  private lookup(id: string): StoredResult | undefined {
+    const entry = this.results.get(id);
+    if (entry && entry.expiresAt <= Date.now()) {
+      this.remove(id, entry);
+      return undefined;
+    }
+    return entry;
+  }
+
+  private purgeExpired(): void {
+    const now = Date.now();
+    for (const [id, entry] of this.results) {
+      if (entry.expiresAt <= now) this.remove(id, entry);
+    }
+  }
+
+  private remove(id: string, entry: StoredResult): void {
+    this.results.delete(id);
+    this.totalBytes -= entry.bytes;
+  }
+}
+
+// Shared store — written by buildToolResponse, read by the results resource
+export const resultStore = new ResultStore(RESULT_STORE_MAX_BYTES, RESULT_STORE_TTL_MS, RESULT_CHUNK_CHARS);
+
+// ============================================================================
+// RESPONSE BUDGET
+// ============================================================================
+
+// The two budgets, as UTF-8 bytes and as characters (tokens × chars/token).
+// Infinity when disabled.
+const MAX_BYTES = RESPONSE_MAX_BYTES > 0 ? RESPONSE_MAX_BYTES : Infinity;
+const MAX_CHARS = RESPONSE_MAX_TOKENS > 0 ? RESPONSE_MAX_TOKENS * CHARS_PER_TOKEN : Infinity;
+
+// Marker appended to a cut preview
+const CUT_MARKER = '\n…';
+
+function isHighSurrogate(code: number): boolean {
+  return code >= 0xd800 && code <= 0xdbff;
+}
+
+/**
+ * Whether text fits both budgets. One UTF-16 unit is at most 3 UTF-8
+ * bytes, so short texts skip the byte count.
+ */
+function fitsBudget(text: string): boolean {
+  if (text.length > MAX_CHARS) return false;
+  return text.length * 3 <= MAX_BYTES || Buffer.byteLength(text) <= MAX_BYTES;
+}
+
+/**
+ * Longest prefix of `text` within `maxChars` UTF-16 units and `maxBytes`
+ * UTF-8 bytes, never ending inside a surrogate pair.
+ */
+function prefixWithin(text: string, maxChars: number, maxBytes: number): string {
+  let end = Math.min(text.length, maxChars);
+  if (Number.isFinite(maxBytes) && end * 3 > maxBytes) {
+    // encodeInto stops before a character that does not fit whole
+    const { read } = new TextEncoder().encodeInto(text.slice(0, end), new Uint8Array(maxBytes));
+    end = read;
+  }
+  if (end < text.length && end > 0 && isHighSurrogate(text.charCodeAt(end - 1))) end--;
+  return text.slice(0, end);
+}
+
+/**
+ * Returns `text` unchanged if it fits the response budget. Otherwise the
+ * full text is stored and a preview (the start of `preview`, cut at a line
+ * break) is returned together with the resource URIs to read the rest.
+ *
+ * @param text - The complete tool response
+ * @param preview - Text to show inline when spilling (usually the summary)
+ */
+export function applyResponseBudget(text: string, preview: string): string {
+  if (fitsBudget(text)) return text;
+
+  const id = resultStore.put(text, preview.split('\n', 1)[0].slice(0, 120));
+  const chunks = resultStore.chunkCount(id);
+  const bytes = Buffer.byteLength(text);
+
+  const footer =
+    `\n\n---\nResponse too large to send inline (${Math.round(bytes / 1024)} KB, ` +
+    `~${Math.ceil(text.length / CHARS_PER_TOKEN)} tokens). ` +
+    `The complete response is stored as ${chunks} chunk(s):\n` +
+    `  ${RESULT_URI_PREFIX}${id}/0` + (chunks > 1 ? ` … ${RESULT_URI_PREFIX}${id}/${chunks - 1}` : '') + '\n' +
+    `Read them with resources/read, or narrow the query (filters, fields, response_format='summary').`;
+
+  // Keep the preview within both budgets, cutting at the last full line
+  let head = preview;
+  if (!fitsBudget(head + footer)) {
+    const room = prefixWithin(
+      head,
+      Math.max(0, MAX_CHARS - footer.length - CUT_MARKER.length),
+      Math.max(0, MAX_BYTES - Buffer.byteLength(footer) - Buffer.byteLength(CUT_MARKER)),
+    );
+    const cut = room.lastIndexOf('\n');
+    head = (cut > 0 ? room.slice(0, cut) : room) + CUT_MARKER;
+  }
+
+  logger.debug(`Response spilled to result store: ${bytes} bytes in ${chunks} chunk(s)`, { id });
+  return head + footer;
+}
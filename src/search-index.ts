@@ -0,0 +1,258 @@
+/**
+ * Full-Text Search Index
+ *
+ * An inverted index for answering `q` searches locally: every word of every
+ * indexed field points back to the records containing it — like the index
+ * at the back of a book, where "invoice … 12, 47, 203" saves you reading
+ * every page.
+ *
+ * Includes:
+ * - Tokenizing (lowercase, accents stripped, split on non-alphanumerics)
+ * - Exact, prefix ("jo" → john) and fuzzy (one or two typos) term matching
+ * - Ranking by field weight × inverse document frequency × match quality
+ * - Queries the index cannot answer in full (no searchable terms, or a
+ *   prefix matching too many words) return undefined instead of a partial
+ *   result, so the caller can ask the API
+ * - Incremental add/remove per record, so syncs only touch what changed
+ *
+ * Records are identified by their slot number (see indexes.ts).
+ */
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// Match quality multipliers
+const EXACT_MATCH = 1;
+const PREFIX_MATCH = 0.8;
+const FUZZY_MATCH = 0.5;
+
+// Most dictionary terms a prefix may expand to. A broader prefix ("j")
+// would walk a large share of the index; the search gives up instead of
+// silently dropping matches past the cap, and the API answers it.
+const MAX_PREFIX_EXPANSION = 64;
+
+// Fuzzy matching only kicks in for terms at least this long
+const FUZZY_MIN_LENGTH = 4;
+
+// ============================================================================
+// TOKENIZER
+// ============================================================================
+
+/**
+ * Splits text into lowercase, accent-free terms.
+ * "José@Acme-Corp.com" → ["jose", "acme", "corp", "com"]
+ */
+export function tokenize(text: string): string[] {
+  return text
+    .toLowerCase()
+    .normalize('NFKD')
+    .replace(/[\u0300-\u036f]/g, '')
+    .split(/[^\p{L}\p{N}]+/u)
+    .filter((term) => term.length > 0);
+}
+
+/**
+ * Edit distance counting insertions, deletions, substitutions and swaps of
+ * adjacent letters ("jhon" → "john" is one edit). Gives up, returning
+ * max + 1, as soon as the distance must exceed max.
+ */
+function boundedDistance(a: string, b: string, max: number): number {
+  if (Math.abs(a.length - b.length) > max) return max + 1;
+
+  let beforePrevious: number[] = [];
+  let previous = Array.from({ length: b.length + 1 }, (_, i) => i);
+  for (let i = 1; i <= a.length; i++) {
+    const current = [i];
+    let rowMin = i;
+    for (let j = 1; j <= b.length; j++) {
+      const cost = a[i - 1] === b[j - 1] ? 0 : 1;
+      let value = Math.min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost);
+      if (i > 1 && j > 1 && a[i - 1] === b[j - 2] && a[i - 2] === b[j - 1]) {
+        value = Math.min(value, beforePrevious[j - 2] + 1);
+      }
+      current[j] = value;
+      if (value < rowMin) rowMin = value;
+    }
+    if (rowMin > max) return max + 1;
+    beforePrevious = previous;
+    previous = current;
+  }
+  return previous[b.length];
+}
+
+// ============================================================================
+// SEARCH INDEX
+// ============================================================================
+
+export interface SearchField {
+  text: string;
+  weight: number;   // e.g. 3 for email, 1 for custom fields
+}
+
+export interface SearchIndexStats {
+  documents: number;
+  terms: number;
+  searches: number;
+  fuzzyExpansions: number;
+  unanswered: number;     // searches returned undefined (no terms / prefix too broad)
+}
+
+export class SearchIndex {
+  // term → (slot → best field weight of that term in the record)
+  private readonly postings = new Map<string, Map<number, number>>();
+  // slot → its terms, so a record can be removed without a full scan
+  private readonly documentTerms = new Map<number, string[]>();
+  // Sorted term dictionary for prefix and fuzzy lookups, rebuilt lazily
+  private dictionary: string[] = [];
+  private dictionaryDirty = false;
+  private searches = 0;
+  private fuzzyExpansions = 0;
+  private unanswered = 0;
+
+  /**
+   * Index a record's fields, replacing whatever was indexed for the slot.
+   */
+  add(slot: number, fields: SearchField[]): void {
+    this.remove(slot);
+
+    const weights = new Map<string, number>();
+    for (const field of fields) {
+      for (const term of tokenize(field.text)) {
+        if ((weights.get(term) ?? 0) < field.weight) weights.set(term, field.weight);
+      }
+    }
+
+    for (const [term, weight] of weights) {
+      let posting = this.postings.get(term);
+      if (!posting) {
+        posting = new Map();
+        this.postings.set(term, posting);
+        this.dictionaryDirty = true;
+      }
+      posting.set(slot, weight);
+    }
+    this.documentTerms.set(slot, [...weights.keys()]);
+  }
+
+  remove(slot: number): void {
+    const terms = this.documentTerms.get(slot);
+    if (!terms) return;
+
+    for (const term of terms) {
+      const posting = this.postings.get(term);
+      if (!posting) continue;
+      posting.delete(slot);
+      if (posting.size === 0) {
+        this.postings.delete(term);
+        this.dictionaryDirty = true;
+      }
+    }
+    this.documentTerms.delete(slot);
+  }
+
+  /**
+   * Find records matching every term of the query.
+   * @returns Relevance score per matching slot (higher is better); empty if
+   *          nothing matches, undefined if the query has no searchable terms
+   *          or a prefix expands to more than MAX_PREFIX_EXPANSION terms
+   */
+  search(query: string): Map<number, number> | undefined {
+    this.searches++;
+    const queryTerms = [...new Set(tokenize(query))];
+    const expansions = queryTerms.map((queryTerm) => this.expand(queryTerm));
+    if (queryTerms.length === 0 || expansions.includes(undefined)) {
+      this.unanswered++;
+      return undefined;
+    }
+    let result: Map<number, number> | undefined;
+
+    for (const expansion of expansions) {
+      const scores = new Map<number, number>();
+      for (const [term, quality] of expansion!) {
+        const posting = this.postings.get(term)!;
+        const idf = Math.log(1 + this.documentTerms.size / posting.size);
+        for (const [slot, weight] of posting) {
+          const score = weight * idf * quality;
+          if (score > (scores.get(slot) ?? 0)) scores.set(slot, score);
+        }
+      }
+
+      // AND semantics: keep only records that matched all previous terms too
+      if (!result) {
+        result = scores;
+      } else {
+        for (const [slot, score] of result) {
+          const termScore = scores.get(slot);
+          if (termScore === undefined) result.delete(slot);
+          else result.set(slot, score + termScore);
+        }
+      }
+      if (result.size === 0) break;
+    }
+
+    return result!;
+  }
+
+  stats(): SearchIndexStats {
+    return {
+      documents: this.documentTerms.size,
+      terms: this.postings.size,
+      searches: this.searches,
+      fuzzyExpansions: this.fuzzyExpansions,
+      unanswered: this.unanswered,
+    };
+  }
+
+  // --------------------------------------------------------------------------
+  // Internals
+  // --------------------------------------------------------------------------
+
+  /**
+   * Dictionary terms a query term stands for, with their match quality:
+   * the exact term and terms it prefixes; failing both, terms within one
+   * typo (two for 8+ characters) that share its first letter.
+   * @returns undefined if the prefix matches more than MAX_PREFIX_EXPANSION terms
+   */
+  private expand(queryTerm: string): [string, number][] | undefined {
+    const dictionary = this.sortedDictionary();
+    const matches: [string, number][] = [];
+
+    const start = lowerBound(dictionary, queryTerm);
+    for (let i = start; i < dictionary.length && dictionary[i].startsWith(queryTerm); i++) {
+      if (matches.length === MAX_PREFIX_EXPANSION) return undefined;
+      const term = dictionary[i];
+      matches.push([term, term === queryTerm ? EXACT_MATCH : PREFIX_MATCH]);
+    }
+    if (matches.length > 0 || queryTerm.length < FUZZY_MIN_LENGTH) return matches;
+
+    const maxDistance = queryTerm.length >= 8 ? 2 : 1;
+    const first = queryTerm[0];
+    for (let i = lowerBound(dictionary, first); i < dictionary.length && dictionary[i][0] === first; i++) {
+      if (boundedDistance(queryTerm, dictionary[i], maxDistance) <= maxDistance) {
+        matches.push([dictionary[i], FUZZY_MATCH]);
+      }
+    }
+    if (matches.length > 0) this.fuzzyExpansions++;
+    return matches;
+  }
+
+  private sortedDictionary(): string[] {
+    if (this.dictionaryDirty) {
+      this.dictionary = [...this.postings.keys()].sort();
+      this.dictionaryDirty = false;
+    }
+    return this.dictionary;
+  }
+}
+
+/** First index in a sorted string array whose value is >= target. */
+function lowerBound(sorted: string[], target: string): number {
+  let lo = 0;
+  let hi = sorted.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >>> 1;
+    if (sorted[mid] < target) lo = mid + 1; else hi = mid;
+  }
+  return lo;
+}
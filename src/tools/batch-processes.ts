@@ -6,7 +6,8 @@
  * with more than 5 IDs, it runs asynchronously and returns a batch process ID.
  * Use these tools to check if the batch finished and whether it succeeded.
  *
- * All 3 endpoints are read-only (GET).
+ * All 3 endpoints are read-only (GET). wait_for_batch_processes polls them
+ * on the server side until the batches finish (see batch-waiter.ts).
  *
  * API base: GET /batch_processes
  */
@@ -14,7 +15,23 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatBatchResult, formatBatchProgress, buildToolResponse } from '../formatters.js';
+import { waitForBatches } from '../batch-waiter.js';
+import { currentSignal, startProgress } from '../request-context.js';
+import { formatBatchResult, formatBatchProgress, formatBatchWait, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+// Default and maximum time wait_for_batch_processes blocks. Many MCP clients
+// give up on a tool call after about a minute without progress notifications.
+const DEFAULT_WAIT_SECONDS = 50;
+const MAX_WAIT_SECONDS = 600;
+
+// Most batch IDs per wait: each finished batch may cost one detail request
+// at the end, and this many must fit well inside one minute's rate budget
+// (a 10,000-ID batch tool call yields 100 batches at the default chunk size)
+const MAX_WAIT_IDS = 100;
 
 // ============================================================================
 // REGISTER FUNCTION
@@ -64,6 +81,10 @@ export function registerBatchProcessTools(server: McpServer): void {
         status: z.enum(['pending', 'in_progress', 'completed', 'failed', 'stopped'])
           .optional()
           .describe("Filter by batch status (pending, in_progress, completed, failed, stopped)."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -97,7 +118,7 @@ export function registerBatchProcessTools(server: McpServer): void {
           summary += '\n';
         }
 
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{
@@ -158,6 +179,10 @@ export function registerBatchProcessTools(server: McpServer): void {
       inputSchema: {
         id: z.number().int()
           .describe("The numeric ID of the batch process to retrieve."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -166,7 +191,7 @@ export function registerBatchProcessTools(server: McpServer): void {
         const result = await callFirstPromoterAPI(`/batch_processes/${args.id}`);
 
         const summary = formatBatchResult(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{
@@ -223,6 +248,10 @@ export function registerBatchProcessTools(server: McpServer): void {
         status: z.enum(['pending', 'in_progress', 'completed', 'failed', 'stopped'])
           .optional()
           .describe("Filter by batch status (pending, in_progress, completed, failed, stopped)."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -237,7 +266,7 @@ export function registerBatchProcessTools(server: McpServer): void {
         const result = await callFirstPromoterAPI('/batch_processes/progress', { queryParams });
 
         const summary = formatBatchProgress(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{
@@ -261,4 +290,92 @@ export function registerBatchProcessTools(server: McpServer): void {
       }
     }
   );
+
+  // ==========================================================================
+  // Tool: wait_for_batch_processes
+  //
+  // Blocks until the given batch processes finish (or a deadline passes),
+  // polling GET /batch_processes/progress once per tick with an interval
+  // adapted to how fast the batches move. Sends MCP progress notifications
+  // when the client asked for them (a progressToken in the request).
+  // ==========================================================================
+  server.registerTool(
+    "wait_for_batch_processes",
+
+    {
+      title: "Wait for Batch Processes",
+      description:
+        "Wait until one or more asynchronous batch processes finish, then return their final status and counts. " +
+        "Use this after a batch operation (accept promoters, approve commissions, delete referrals, etc. with >5 IDs) " +
+        "instead of calling get_batch_process or get_batch_progress repeatedly. " +
+        "All batches are checked with one request per poll; polling speeds up while batches progress quickly " +
+        "and slows down while they are idle. Progress notifications are sent if the client supports them. " +
+
+        "RESPONSE STRUCTURE — returns { status, done, pending, batches, meta }: " +
+        "status ('completed' when every batch finished, 'timed_out' if timeout_seconds passed first, 'cancelled'), " +
+        "done (number of finished batches), pending[] (IDs still running), " +
+        "batches[]: { id, status (pending/in_progress/completed/failed/stopped), progress (0-100), total, " +
+        "processed_count, failed_count, action_label, processing_errors[] } (or { id, progress, error } if a batch " +
+        "could not be read, and { id, progress } for a batch still running, or whose details were not read before " +
+        "the timeout), meta: { polls, detail_checks, elapsed_ms }. " +
+        "A 'completed' wait can contain batches whose own status is 'failed' or 'stopped' — check each batch. " +
+        "On 'timed_out', call again with the pending IDs to keep waiting. " +
+
+        "IMPORTANT: Only cite exact values from the response. Never guess or infer data.",
+
+      inputSchema: {
+        ids: z.array(z.number().int())
+          .min(1)
+          .max(MAX_WAIT_IDS)
+          .describe(`Batch process IDs to wait for (e.g. the id or batch_ids returned by a batch tool), at most ${MAX_WAIT_IDS}.`),
+
+        timeout_seconds: z.number().int()
+          .min(1)
+          .max(MAX_WAIT_SECONDS)
+          .optional()
+          .describe(`Longest time to wait, in seconds (default ${DEFAULT_WAIT_SECONDS}, max ${MAX_WAIT_SECONDS}).`),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
+      }
+    },
+
+    async (args) => {
+      const progress = startProgress();
+      try {
+        const result = await waitForBatches(args.ids, {
+          timeoutMs: (args.timeout_seconds ?? DEFAULT_WAIT_SECONDS) * 1000,
+          signal: currentSignal(),
+          onProgress: (wait) =>
+            progress.update(wait.percent, 100, `${wait.done} of ${wait.total} batch(es) finished`),
+        });
+
+        const summary = formatBatchWait(result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: responseText
+          }]
+        };
+
+      } catch (error) {
+        const errorMessage = error instanceof Error
+          ? error.message
+          : 'Unknown error occurred';
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: `Error waiting for batch processes: ${errorMessage}`
+          }],
+          isError: true
+        };
+      } finally {
+        progress.end();
+      }
+    }
+  );
 }
@@ -10,7 +10,10 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatCommissions, formatBatchResult, buildToolResponse } from '../formatters.js';
+import { executeBatch, BATCH_CHUNKING_NOTE } from '../batch-executor.js';
+import { fetchAllPages } from '../paginator.js';
+import { compileProjection, projectRecords } from '../projection.js';
+import { formatCommissions, formatBatchResult, formatFetchAllSummary, formatProjectedRecords, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
 
 /**
  * Registers all commission-related tools with the MCP server.
@@ -48,6 +51,8 @@ export function registerCommissionTools(server: McpServer): void {
         "reward: { id, name }. " +
 
         "NOTE: Amounts (sale_amount, amount) are in cents. Divide by 100 for dollars. " +
+        "Set fetch_all=true to collect every page in one call. " +
+        "Pass fields to return only the paths you need (smaller, faster responses). " +
 
         "IMPORTANT: When presenting results, cite exact field values from the returned data.",
 
@@ -98,6 +103,26 @@ export function registerCommissionTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction (ascending or descending)"),
+
+        // --- Auto-pagination ---
+        fetch_all: z.boolean()
+          .optional()
+          .describe("Fetch ALL pages and return them as one aggregated result. Stops at max_records."),
+
+        max_records: z.number()
+          .int()
+          .positive()
+          .optional()
+          .describe("With fetch_all: maximum number of records to collect (default 10000)"),
+
+        // --- Output ---
+        fields: z.array(z.string())
+          .optional()
+          .describe("Return only these dot paths of each commission, e.g. ['amount', 'status', 'referral.email']. 'id' is always included."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -127,10 +152,27 @@ export function registerCommissionTools(server: McpServer): void {
           queryParams[`sorting[${args.sort_by}]`] = args.sort_direction;
         }
 
-        const result = await callFirstPromoterAPI('/commissions', { queryParams });
+        // fields: keep only the requested paths (projector is compiled once per path list)
+        const projector = args.fields ? compileProjection(args.fields) : undefined;
+        const formatResult = (data: unknown) => projector
+          ? formatProjectedRecords('commission', data, args.fields!)
+          : formatCommissions(data);
+
+        // fetch_all: walk every page and return one aggregated result
+        if (args.fetch_all) {
+          const fetched = await fetchAllPages('/commissions', { queryParams, maxRecords: args.max_records });
+          const records = projector ? fetched.records.map(projector) : fetched.records;
+          const summary = `${formatFetchAllSummary(fetched)}\n\n${formatResult(records)}`;
+          return {
+            content: [{ type: "text" as const, text: buildToolResponse(summary, records, args.response_format) }]
+          };
+        }
 
-        const summary = formatCommissions(result);
-        const responseText = buildToolResponse(summary, result);
+        const response = await callFirstPromoterAPI('/commissions', { queryParams });
+        const result = projector ? projectRecords(response, projector) : response;
+
+        const summary = formatResult(result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{ type: "text" as const, text: responseText }]
@@ -346,6 +388,7 @@ export function registerCommissionTools(server: McpServer): void {
       description:
         "Approve one or more pending commissions in FirstPromoter. " +
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -361,9 +404,9 @@ export function registerCommissionTools(server: McpServer): void {
 
     async (args) => {
       try {
-        const result = await callFirstPromoterAPI('/commissions/approve', {
+        const result = await executeBatch('/commissions/approve', {
           method: 'POST',
-          body: { ids: args.ids }
+          ids: args.ids
         });
 
         const summary = formatBatchResult(result);
@@ -394,6 +437,7 @@ export function registerCommissionTools(server: McpServer): void {
       description:
         "Deny one or more commissions in FirstPromoter. " +
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -409,9 +453,9 @@ export function registerCommissionTools(server: McpServer): void {
 
     async (args) => {
       try {
-        const result = await callFirstPromoterAPI('/commissions/deny', {
+        const result = await executeBatch('/commissions/deny', {
           method: 'POST',
-          body: { ids: args.ids }
+          ids: args.ids
         });
 
         const summary = formatBatchResult(result);
@@ -443,6 +487,7 @@ export function registerCommissionTools(server: McpServer): void {
         "Mark one or more non-monetary commissions as fulfilled in FirstPromoter. " +
         "This applies to commissions with non-cash units (credits, points, free_months, etc.). " +
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -458,9 +503,9 @@ export function registerCommissionTools(server: McpServer): void {
 
     async (args) => {
       try {
-        const result = await callFirstPromoterAPI('/commissions/mark_fulfilled', {
+        const result = await executeBatch('/commissions/mark_fulfilled', {
           method: 'POST',
-          body: { ids: args.ids }
+          ids: args.ids
         });
 
         const summary = formatBatchResult(result);
@@ -492,6 +537,7 @@ export function registerCommissionTools(server: McpServer): void {
         "Mark one or more non-monetary commissions as unfulfilled in FirstPromoter. " +
         "This reverses a previous 'fulfilled' status for non-cash commissions. " +
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -507,9 +553,9 @@ export function registerCommissionTools(server: McpServer): void {
 
     async (args) => {
       try {
-        const result = await callFirstPromoterAPI('/commissions/mark_unfulfilled', {
+        const result = await executeBatch('/commissions/mark_unfulfilled', {
           method: 'POST',
-          body: { ids: args.ids }
+          ids: args.ids
         });
 
         const summary = formatBatchResult(result);
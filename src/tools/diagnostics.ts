@@ -0,0 +1,119 @@
+/**
+ * Diagnostics Tools
+ *
+ * These tools expose the server's own internals — connection pool usage,
+ * rate limiter state and other API-layer counters — so you can size the
+ * server for the FirstPromoter rate budget. They never call the API.
+ */
+
+import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
+import { getApiStats } from '../api.js';
+import { getHttpPoolStats } from '../http.js';
+import { resultStore } from '../result-store.js';
+import { promoterMirror } from '../promoter-mirror.js';
+import { reportCache } from '../report-cache.js';
+import { getBatchExecutorStats } from '../batch-executor.js';
+import { getBatchWaiterStats } from '../batch-waiter.js';
+import { getRequestContextStats } from '../request-context.js';
+import { formatServerStats, buildToolResponse, getResponseStats } from '../formatters.js';
+
+// ============================================================================
+// REGISTER FUNCTION
+// ============================================================================
+
+/**
+ * Registers all diagnostics tools with the MCP server.
+ */
+export function registerDiagnosticsTools(server: McpServer): void {
+
+  // ==========================================================================
+  // Tool: get_server_stats
+  //
+  // Returns a snapshot of the API layer: HTTP connection pool usage,
+  // rate limiter state, response cache, GET coalescing and response size counters.
+  // Purely local — does not consume any FirstPromoter rate-limit budget.
+  // ==========================================================================
+  server.registerTool(
+    "get_server_stats",
+
+    {
+      title: "Get Server Stats",
+      description:
+        "Get internal statistics of this MCP server's FirstPromoter API layer. " +
+        "Does NOT call the FirstPromoter API and does not use any rate-limit budget. " +
+
+        "RESPONSE STRUCTURE — returns an object with: " +
+        "http_pool: { open, active, idle, pending, maxSockets, maxFreeSockets, idleTimeoutMs, " +
+        "totalRequests, reusedRequests, socketsCreated, reuseRatio (0-1) }, " +
+        "rate_limiter: { limit (current, adaptive), capacity, windowMs, pausedMs, inWindow, available, queued, maxQueued, " +
+        "granted, delayed, avgWaitMs, cancelled (waits abandoned by cancelled calls), " +
+        "classes: { interactive|bulk|background: { weight, reserve (permits kept free for higher classes), " +
+        "queued, granted, delayed, preempted (queued although permits were free), avgWaitMs, maxWaitMs } } }, " +
+        "rate_control: { adaptive, limit, floor, ceiling, headerLimit, headerRemaining, increases, decreases, " +
+        "throttled (429s seen), serverErrors (5xx seen), pauses (waits for the server's reset) }, " +
+        "circuit_breakers: { failureThreshold, cooldownMs, transitions, rejected (calls failed fast), " +
+        "families: { <family>: { state (closed|open|half_open), failures, opened, rejected, retryInMs, lastError } }, " +
+        "recent: [{ family, from, to, at, reason }] }, " +
+        "cache: { enabled, entries, bytes, maxBytes, hits, misses, hitRatio (0-1), evictions, " +
+        "invalidations, staleMs, staleHits (expired entries served during an outage), byFamily: { <family>: { hits, misses, hitRatio } } }, " +
+        "disk_cache: { enabled, path, entries, bytes, maxBytes, hits, misses, evictions, compactions }, " +
+        "coalescing: { inFlight, upstreamGets, coalescedGets (upstream calls saved), savedRatio (0-1) }, " +
+        "responses: { defaultFormat, responses, fullBytes (size in the 'full' layout; sampled estimate for other layouts), sentBytes, " +
+        "savedRatio (0-1), byFormat: { <format>: count } }, " +
+        "result_store: { entries, bytes, maxBytes, ttlMs, maxResponseBytes, maxResponseTokens, " +
+        "spilled (responses moved to a resource), chunkReads, evictions }, " +
+        "promoter_mirror: { enabled, status (disabled/loading/ready/error), records, fresh, ageMs, lastSyncAt, " +
+        "lastFullSyncAt, fullSyncs, incrementalSyncs, upserts, localQueries, fallbacks, avgQueryMs, lastError, " +
+        "indexes: { slots, emails, refTokens, custIds, lastIndexBuildMs, search: { documents, terms, searches, fuzzyExpansions, unanswered } } }, " +
+        "report_cache: { enabled, entries (cached report periods), bytes, maxBytes, hits (periods reused), " +
+        "misses (closed periods fetched), gapFetches (API calls for missing ranges), bypassed, rollUps (month/year views built from days), evictions, " +
+        "invalidations (periods dropped after mutations), ttlMs, settleDays }, " +
+        "batch_executor: { executions (batch tool calls), chunkedExecutions (split into chunks), chunksSent, chunksFailed, chunkSize }, " +
+        "batch_waiter: { waits (wait_for_batch_processes calls), polls (progress requests), detailChecks, timedOut }, " +
+        "tool_calls: { toolCalls, cancelled (calls aborted by the client), progressNotifications }. " +
+
+        "IMPORTANT: Only cite exact values from the response. Never guess or infer data.",
+
+      inputSchema: {}
+    },
+
+    async () => {
+      try {
+        const result = {
+          http_pool: getHttpPoolStats(),
+          ...getApiStats(),
+          responses: getResponseStats(),
+          result_store: resultStore.stats(),
+          promoter_mirror: promoterMirror.stats(),
+          report_cache: reportCache.stats(),
+          batch_executor: getBatchExecutorStats(),
+          batch_waiter: getBatchWaiterStats(),
+          tool_calls: getRequestContextStats(),
+        };
+
+        const summary = formatServerStats(result);
+        const responseText = buildToolResponse(summary, result);
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: responseText
+          }]
+        };
+
+      } catch (error) {
+        const errorMessage = error instanceof Error
+          ? error.message
+          : 'Unknown error occurred';
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: `Error fetching server stats: ${errorMessage}`
+          }],
+          isError: true
+        };
+      }
+    }
+  );
+}
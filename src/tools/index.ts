@@ -16,21 +16,29 @@ import { registerReferralTools } from './referrals.js';
 import { registerCommissionTools } from './commissions.js';
 import { registerPayoutTools } from './payouts.js';
 import { registerReportTools } from './reports.js';
+import { registerPromoterOverviewTools } from './promoter-overview.js';
 import { registerPromoCodeTools } from './promo-codes.js';
 import { registerPromoterCampaignTools } from './promoter-campaigns.js';
 import { registerBatchProcessTools } from './batch-processes.js';
+import { registerDiagnosticsTools } from './diagnostics.js';
+import { installRequestContext } from '../request-context.js';
 
 /**
  * Registers all tools with the MCP server.
  * Call this once during server startup.
  */
 export function registerAllTools(server: McpServer): void {
+  // Every handler below gets its request's cancellation signal and progress channel
+  installRequestContext(server);
+
   registerPromoterTools(server);
   registerReferralTools(server);
   registerCommissionTools(server);
   registerPayoutTools(server);
   registerReportTools(server);
+  registerPromoterOverviewTools(server);
   registerPromoCodeTools(server);
   registerPromoterCampaignTools(server);
   registerBatchProcessTools(server);
+  registerDiagnosticsTools(server);
 }
@@ -10,7 +10,9 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatPayouts, formatPayoutsGrouped, formatPayoutStats, formatDuePayoutStats, buildToolResponse } from '../formatters.js';
+import { fetchAllPages } from '../paginator.js';
+import { compileProjection, projectRecords } from '../projection.js';
+import { formatPayouts, formatPayoutsGrouped, formatPayoutStats, formatDuePayoutStats, formatFetchAllSummary, formatProjectedRecords, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
 
 /**
  * Registers all payout-related tools with the MCP server.
@@ -47,6 +49,8 @@ export function registerPayoutTools(server: McpServer): void {
         "invoice: { id, number }. " +
 
         "NOTE: The API returns a flat array, NOT wrapped in { data: [...] }. " +
+        "Set fetch_all=true to collect every page in one call. " +
+        "Pass fields to return only the paths you need (smaller, faster responses). " +
 
         "IMPORTANT: When presenting results, cite exact field values from the returned data. " +
         "Each payout's fields are independent — do not infer or guess values between records.",
@@ -127,6 +131,26 @@ export function registerPayoutTools(server: McpServer): void {
         sort_by_period_end: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort payouts by period end date (ascending or descending)"),
+
+        // --- Auto-pagination ---
+        fetch_all: z.boolean()
+          .optional()
+          .describe("Fetch ALL pages and return them as one aggregated result. Stops at max_records."),
+
+        max_records: z.number()
+          .int()
+          .positive()
+          .optional()
+          .describe("With fetch_all: maximum number of records to collect (default 10000)"),
+
+        // --- Output ---
+        fields: z.array(z.string())
+          .optional()
+          .describe("Return only these dot paths of each payout, e.g. ['amount', 'status', 'promoter.email']. 'id' is always included."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -201,12 +225,29 @@ export function registerPayoutTools(server: McpServer): void {
           queryParams['sorting[period_end]'] = args.sort_by_period_end;
         }
 
+        // fields: keep only the requested paths (projector is compiled once per path list)
+        const projector = args.fields ? compileProjection(args.fields) : undefined;
+        const formatResult = (data: unknown) => projector
+          ? formatProjectedRecords('payout', data, args.fields!)
+          : formatPayouts(data);
+
+        // fetch_all: walk every page and return one aggregated result
+        if (args.fetch_all) {
+          const fetched = await fetchAllPages('/payouts', { queryParams, maxRecords: args.max_records });
+          const records = projector ? fetched.records.map(projector) : fetched.records;
+          const summary = `${formatFetchAllSummary(fetched)}\n\n${formatResult(records)}`;
+          return {
+            content: [{ type: "text" as const, text: buildToolResponse(summary, records, args.response_format) }]
+          };
+        }
+
         // Call the FirstPromoter API
-        const result = await callFirstPromoterAPI('/payouts', { queryParams });
+        const response = await callFirstPromoterAPI('/payouts', { queryParams });
+        const result = projector ? projectRecords(response, projector) : response;
 
         // Format the response: structured summary + raw JSON
-        const summary = formatPayouts(result);
-        const responseText = buildToolResponse(summary, result);
+        const summary = formatResult(result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -293,6 +334,11 @@ export function registerPayoutTools(server: McpServer): void {
         invoiceable: z.enum(['true', 'false', 'not_set'])
           .optional()
           .describe("Filter payouts by invoiceable status"),
+
+        // --- Output ---
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -328,7 +374,7 @@ export function registerPayoutTools(server: McpServer): void {
 
         // Format the response: structured summary + raw JSON
         const summary = formatPayoutsGrouped(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -408,6 +454,11 @@ export function registerPayoutTools(server: McpServer): void {
         campaign_id: z.number().int()
           .optional()
           .describe("Filter stats by campaign ID"),
+
+        // --- Output ---
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -440,7 +491,7 @@ export function registerPayoutTools(server: McpServer): void {
 
         // Format the response: structured summary + raw JSON
         const summary = formatPayoutStats(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -509,6 +560,11 @@ export function registerPayoutTools(server: McpServer): void {
         campaign_id: z.number().int()
           .optional()
           .describe("Filter due payout stats by campaign ID"),
+
+        // --- Output ---
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -535,7 +591,7 @@ export function registerPayoutTools(server: McpServer): void {
 
         // Format the response: structured summary + raw JSON
         const summary = formatDuePayoutStats(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
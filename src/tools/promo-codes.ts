@@ -11,7 +11,8 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatPromoCodes, buildToolResponse } from '../formatters.js';
+import { fetchAllPages } from '../paginator.js';
+import { formatPromoCodes, formatFetchAllSummary, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
 
 /**
  * Registers all promo-code-related tools with the MCP server.
@@ -47,6 +48,7 @@ export function registerPromoCodeTools(server: McpServer): void {
         "archived_at (datetime string or null). " +
 
         "NOTE: The API returns a flat array, NOT wrapped in { data: [...] }. " +
+        "Set fetch_all=true to collect every page in one call. " +
 
         "IMPORTANT: When presenting results, cite exact field values from the returned data. " +
         "Each promo code's fields are independent — do not infer or guess values between records.",
@@ -55,6 +57,22 @@ export function registerPromoCodeTools(server: McpServer): void {
         promoter_campaign_id: z.number().int()
           .optional()
           .describe("Filter promo codes by a specific promoter campaign ID"),
+
+        // --- Auto-pagination ---
+        fetch_all: z.boolean()
+          .optional()
+          .describe("Fetch ALL pages and return them as one aggregated result. Stops at max_records."),
+
+        max_records: z.number()
+          .int()
+          .positive()
+          .optional()
+          .describe("With fetch_all: maximum number of records to collect (default 10000)"),
+
+        // --- Output ---
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -67,6 +85,15 @@ export function registerPromoCodeTools(server: McpServer): void {
           queryParams.promoter_campaign_id = args.promoter_campaign_id.toString();
         }
 
+        // fetch_all: walk every page and return one aggregated result
+        if (args.fetch_all) {
+          const fetched = await fetchAllPages('/promo_codes', { queryParams, maxRecords: args.max_records });
+          const summary = `${formatFetchAllSummary(fetched)}\n\n${formatPromoCodes(fetched.records)}`;
+          return {
+            content: [{ type: "text" as const, text: buildToolResponse(summary, fetched.records, args.response_format) }]
+          };
+        }
+
         // Call the FirstPromoter API
         const result = await callFirstPromoterAPI('/promo_codes', {
           queryParams: Object.keys(queryParams).length > 0 ? queryParams : undefined
@@ -74,7 +101,7 @@ export function registerPromoCodeTools(server: McpServer): void {
 
         // Format the response: structured summary + raw JSON
         const summary = formatPromoCodes(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -135,6 +162,10 @@ export function registerPromoCodeTools(server: McpServer): void {
       inputSchema: {
         id: z.number().int()
           .describe("The promo code's numeric ID. Required."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -144,7 +175,7 @@ export function registerPromoCodeTools(server: McpServer): void {
 
         // Format response — wrap single promo code in array for the list formatter
         const summary = formatPromoCodes([result]);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{
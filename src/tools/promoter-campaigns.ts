@@ -15,7 +15,7 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatPromoterCampaigns, buildToolResponse } from '../formatters.js';
+import { formatPromoterCampaigns, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
 
 /**
  * Registers all promoter-campaign-related tools with the MCP server.
@@ -65,18 +65,22 @@ export function registerPromoterCampaignTools(server: McpServer): void {
         "Each promoter campaign's fields are independent — do not infer or guess values between records.",
 
       inputSchema: {
-        // This endpoint has no query parameters — it returns all promoter campaigns
+        // This endpoint has no query parameters — it returns all promoter campaigns.
+        // The only argument controls how the response is laid out.
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
-    async () => {
+    async (args) => {
       try {
         // Call the FirstPromoter API — no query params for this endpoint
         const result = await callFirstPromoterAPI('/promoter_campaigns');
 
         // Format the response: structured summary + raw JSON
         const summary = formatPromoterCampaigns(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
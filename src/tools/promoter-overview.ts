@@ -0,0 +1,333 @@
+/**
+ * Promoter Overview Tool
+ *
+ * A "360 view" of one promoter in a single call: profile, recent referrals,
+ * commissions, payouts, promo codes and a monthly performance report.
+ * Instead of the model calling six tools one after another, the requests
+ * go out together — like a waiter taking the whole table's order at once
+ * instead of walking to the kitchen after each person orders.
+ *
+ * All requests go through callFirstPromoterAPI, so the shared rate limiter,
+ * cache and retry logic apply. A failing section is reported under
+ * `errors`; the rest of the overview is still returned.
+ */
+
+import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
+import { z } from "zod";
+import { callFirstPromoterAPI } from '../api.js';
+import { compileProjection } from '../projection.js';
+import { promoterMirror } from '../promoter-mirror.js';
+import { startProgress } from '../request-context.js';
+import { fetchReport, STANDARD_COLUMNS } from './reports.js';
+import { formatPromoterOverview, pruneEmpty, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
+
+// ============================================================================
+// CONFIGURATION
+// ============================================================================
+
+const OVERVIEW_SECTIONS = ['referrals', 'commissions', 'payouts', 'promo_codes', 'report'] as const;
+type OverviewSection = typeof OVERVIEW_SECTIONS[number];
+
+// Additive report columns, so the report cache can reuse and roll up periods
+const REPORT_COLUMNS = [
+  'clicks_count',
+  'referrals_count',
+  'customers_count',
+  'sales_count',
+  'revenue_amount',
+  'promoter_earnings_amount',
+  'promoter_paid_amount',
+];
+
+// Fields kept per section. IDs are always kept (see projection.ts), and the
+// promoter_campaign / referral IDs link records across sections.
+const PROMOTER_FIELDS = compileProjection([
+  'name', 'email', 'state', 'cust_id', 'joined_at', 'last_login_at', 'fraud_suspicions', 'stats',
+  'promoter_campaigns.id', 'promoter_campaigns.state', 'promoter_campaigns.campaign',
+  'promoter_campaigns.ref_token', 'promoter_campaigns.ref_link', 'promoter_campaigns.coupon',
+]);
+const REFERRAL_FIELDS = compileProjection([
+  'email', 'uid', 'state', 'created_at', 'customer_since', 'promoter_campaign.id', 'promoter_campaign.campaign.name',
+]);
+const COMMISSION_FIELDS = compileProjection([
+  'status', 'commission_type', 'amount', 'sale_amount', 'is_paid', 'created_at',
+  'referral.id', 'referral.email', 'promoter_campaign.id',
+]);
+const PAYOUT_FIELDS = compileProjection([
+  'status', 'amount', 'period_start', 'period_end', 'paid_at', 'created_at', 'campaign.id', 'campaign.name',
+]);
+const PROMO_CODE_FIELDS = compileProjection([
+  'code', 'description', 'state', 'created_at', 'promoter_campaign.id',
+]);
+
+// ============================================================================
+// HELPERS
+// ============================================================================
+
+/** List endpoints return a flat array; tolerate { data: [...] } as well. */
+function recordsOf(response: unknown): Record<string, unknown>[] {
+  if (Array.isArray(response)) return response;
+  const data = (response as Record<string, unknown> | undefined)?.data;
+  return Array.isArray(data) ? data : [];
+}
+
+function errorMessage(error: unknown): string {
+  return error instanceof Error ? error.message : String(error);
+}
+
+/**
+ * Find the promoter: from the local mirror when it is fresh (no API call),
+ * otherwise GET /promoters/{id}.
+ */
+async function resolvePromoter(args: {
+  id?: number;
+  find_by?: 'email' | 'auth_token' | 'ref_token' | 'promo_code';
+  find_by_value?: string;
+}): Promise<{ promoter: Record<string, unknown>; source: 'local_mirror' | 'api' }> {
+  const local = args.find_by === undefined && args.id !== undefined
+    ? promoterMirror.lookup('id', args.id)
+    : args.find_by === 'email' || args.find_by === 'ref_token'
+      ? promoterMirror.lookup(args.find_by, args.find_by_value!)
+      : undefined;
+  if (local?.length === 1) return { promoter: local[0], source: 'local_mirror' };
+
+  const promoter = args.find_by
+    ? await callFirstPromoterAPI(`/promoters/${encodeURIComponent(args.find_by_value!)}`, {
+        queryParams: { find_by: args.find_by },
+      })
+    : await callFirstPromoterAPI(`/promoters/${args.id}`);
+  return { promoter: promoter as Record<string, unknown>, source: 'api' };
+}
+
+/** Default report window: the current month and the 11 before it. */
+function defaultReportRange(): { start_date: string; end_date: string } {
+  const now = new Date();
+  const start = new Date(Date.UTC(now.getUTCFullYear(), now.getUTCMonth() - 11, 1));
+  return { start_date: start.toISOString().slice(0, 10), end_date: now.toISOString().slice(0, 10) };
+}
+
+// ============================================================================
+// REGISTER FUNCTION
+// ============================================================================
+
+/**
+ * Registers the promoter overview tool with the MCP server.
+ */
+export function registerPromoterOverviewTools(server: McpServer): void {
+
+  // ==========================================================================
+  // Tool: get_promoter_overview
+  //
+  // Fans out to promoters, referrals, commissions, payouts, promo codes and
+  // the promoter report in parallel. Sections that only need the numeric ID
+  // start before the promoter itself has loaded; the rest start as soon as
+  // it has (immediately, when the promoter mirror has it).
+  // ==========================================================================
+  server.registerTool(
+    "get_promoter_overview",
+
+    {
+      title: "Get Promoter Overview",
+      description:
+        "Get a complete picture of ONE promoter in a single call: profile and campaigns, recent referrals, " +
+        "recent commissions, recent payouts, promo codes, and a monthly performance report. " +
+        "All parts are fetched in parallel. Prefer this over calling get_promoter, get_referrals, " +
+        "get_commissions, get_payouts, get_promo_codes and get_reports_promoters one by one. " +
+        "Identify the promoter by numeric ID, or use find_by + find_by_value (email/auth_token/ref_token/promo_code). " +
+
+        "RESPONSE STRUCTURE — returns one compact object (empty values are omitted): " +
+        "promoter: { id, name, email, state, cust_id, joined_at, last_login_at, fraud_suspicions, stats, " +
+        "promoter_campaigns[]: { id (promoter_campaign ID), state, campaign: { id, name }, ref_token, ref_link, coupon } }, " +
+        "referrals[]: { id, email, uid, state, created_at, customer_since, promoter_campaign: { id, campaign } }, " +
+        "commissions[]: { id, status, commission_type, amount, sale_amount, is_paid, created_at, " +
+        "referral: { id, email }, promoter_campaign: { id } }, " +
+        "payouts[]: { id, status, amount, period_start, period_end, paid_at, created_at, campaign: { id, name } }, " +
+        "promo_codes[]: { id, code, description, state, created_at, promoter_campaign: { id } }, " +
+        "report: { start_date, end_date, group_by: 'month', totals: {...}, periods: [ { period, data } ] }, " +
+        "errors: { <section>: message } (only for sections that failed), " +
+        "meta: { promoter_source ('local_mirror' or 'api'), limit, elapsed_ms }. " +
+        "Cross-links: promoter_campaign.id in referrals/commissions/promo_codes matches promoter.promoter_campaigns[].id; " +
+        "commission referral.id matches referrals[].id when that referral is among the recent ones. " +
+
+        "NOTE: Lists hold the most recent `limit` records only — use the individual list tools to page further. " +
+        "Commissions are found by searching the promoter's email and keeping this promoter's records. " +
+        "Monetary amounts are in cents (divide by 100 for dollars). " +
+
+        "IMPORTANT: When presenting results, cite exact field values from the returned data.",
+
+      inputSchema: {
+        // --- Promoter identification ---
+        id: z.number().int()
+          .optional()
+          .describe("Promoter's numeric ID. Required unless using find_by + find_by_value."),
+
+        find_by: z.enum(['email', 'auth_token', 'ref_token', 'promo_code'])
+          .optional()
+          .describe("Alternative lookup method — use with find_by_value instead of id."),
+
+        find_by_value: z.string()
+          .optional()
+          .describe("The identifier value when using find_by (e.g. the email address)"),
+
+        // --- Scope ---
+        include: z.array(z.enum(OVERVIEW_SECTIONS))
+          .optional()
+          .describe("Sections to fetch besides the promoter itself (default: all — referrals, commissions, payouts, promo_codes, report)"),
+
+        limit: z.number()
+          .int()
+          .min(1)
+          .max(100)
+          .optional()
+          .describe("Most recent records per list section (default 10)"),
+
+        report_start_date: z.string()
+          .optional()
+          .describe("Start of the performance report (YYYY-MM-DD). Default: first day of the month 11 months ago."),
+
+        report_end_date: z.string()
+          .optional()
+          .describe("End of the performance report (YYYY-MM-DD). Default: today."),
+
+        // --- Output ---
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
+      }
+    },
+
+    async (args) => {
+      try {
+        if (!(args.find_by && args.find_by_value) && args.id === undefined) {
+          return {
+            content: [{
+              type: "text" as const,
+              text: "Error: Either 'id' or both 'find_by' and 'find_by_value' must be provided."
+            }],
+            isError: true
+          };
+        }
+        const lookup = args.find_by && args.find_by_value
+          ? { find_by: args.find_by, find_by_value: args.find_by_value }
+          : { id: args.id };
+
+        const started = Date.now();
+        const include = new Set<OverviewSection>(args.include ?? OVERVIEW_SECTIONS);
+        const limit = args.limit ?? 10;
+        const sections: Partial<Record<OverviewSection, unknown>> = {};
+        const errors: Partial<Record<OverviewSection, string>> = {};
+
+        // Start a section; its outcome lands in sections or errors, never rejects
+        const progress = startProgress();
+        let finished = 0;
+        const run = (section: OverviewSection, task: () => Promise<unknown>): Promise<void>[] =>
+          include.has(section)
+            ? [task()
+                .then((value) => { sections[section] = value; }, (error) => { errors[section] = errorMessage(error); })
+                .finally(() => progress.update(++finished, include.size, `${section} loaded`))]
+            : [];
+
+        // Sections that only need the numeric promoter ID
+        const byId = (promoterId: number): Promise<void>[] => [
+          ...run('referrals', async () => recordsOf(await callFirstPromoterAPI('/referrals', {
+            queryParams: {
+              'filters[promoter_id]': String(promoterId), 'sorting[created_at]': 'desc', per_page: String(limit),
+            },
+          })).map(REFERRAL_FIELDS)),
+          ...run('payouts', async () => recordsOf(await callFirstPromoterAPI('/payouts', {
+            queryParams: {
+              'filters[promoter_id]': String(promoterId), 'sorting[period_start]': 'desc', per_page: String(limit),
+            },
+          })).map(PAYOUT_FIELDS)),
+        ];
+
+        // Wave 1: with a numeric ID, ID-only sections start alongside the lookup
+        const pending = lookup.id !== undefined ? byId(lookup.id) : [];
+        const { promoter, source } = await resolvePromoter(lookup);
+        const promoterId = Number(promoter.id);
+        if (lookup.id === undefined) pending.push(...byId(promoterId));
+
+        // Wave 2: sections that need the promoter's email or campaigns
+        const email = typeof promoter.email === 'string' ? promoter.email : undefined;
+        const promoterCampaigns = Array.isArray(promoter.promoter_campaigns)
+          ? promoter.promoter_campaigns as Record<string, unknown>[]
+          : [];
+        const promoterCampaignIds = new Set(promoterCampaigns.map((pc) => pc.id).filter((id) => id !== undefined));
+
+        pending.push(...run('commissions', async () => {
+          if (!email) throw new Error('promoter has no email to search commissions by');
+          const records = recordsOf(await callFirstPromoterAPI('/commissions', {
+            queryParams: { q: email, 'sorting[created_at]': 'desc', per_page: String(limit) },
+          }));
+          // Search may match other promoters' records (e.g. a referral with that email)
+          return records.filter((commission) => {
+            const pc = commission.promoter_campaign as Record<string, unknown> | undefined;
+            const owner = (pc?.promoter as Record<string, unknown> | undefined)?.id;
+            if (owner !== undefined) return Number(owner) === promoterId;
+            return pc?.id === undefined || promoterCampaignIds.has(pc.id);
+          }).map(COMMISSION_FIELDS);
+        }));
+
+        pending.push(...run('promo_codes', async () => {
+          if (promoterCampaignIds.size === 0) return [];
+          const pages = await Promise.all([...promoterCampaignIds].map((id) =>
+            callFirstPromoterAPI('/promo_codes', { queryParams: { promoter_campaign_id: String(id) } })
+          ));
+          return pages.flatMap(recordsOf).map(PROMO_CODE_FIELDS);
+        }));
+
+        pending.push(...run('report', async () => {
+          if (!email) throw new Error('promoter has no email to select its report row by');
+          const defaults = defaultReportRange();
+          const range = {
+            start_date: args.report_start_date ?? defaults.start_date,
+            end_date: args.report_end_date ?? defaults.end_date,
+          };
+          const rows = recordsOf(await fetchReport('/reports/promoters', {
+            columns: REPORT_COLUMNS,
+            group_by: 'month',
+            q: email,
+            ...range,
+          }, STANDARD_COLUMNS));
+          const row = rows.find((r) => Number((r.promoter as Record<string, unknown> | undefined)?.id ?? r.id) === promoterId);
+          const periods = Array.isArray(row?.sub_data) ? row.sub_data as Record<string, unknown>[] : [];
+          return {
+            ...range,
+            group_by: 'month',
+            totals: row?.data ?? {},
+            periods: periods.map((p) => ({ period: p.period, data: p.data })),
+          };
+        }));
+
+        await Promise.all(pending);
+        progress.end();
+
+        const overview = pruneEmpty({
+          promoter: PROMOTER_FIELDS(promoter),
+          ...sections,
+          errors,
+          meta: { promoter_source: source, limit, elapsed_ms: Date.now() - started },
+        });
+
+        const summary = formatPromoterOverview(overview);
+        const responseText = buildToolResponse(summary, overview, args.response_format);
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: responseText
+          }]
+        };
+
+      } catch (error) {
+        return {
+          content: [{
+            type: "text" as const,
+            text: `Error fetching promoter overview: ${errorMessage(error)}`
+          }],
+          isError: true
+        };
+      }
+    }
+  );
+}
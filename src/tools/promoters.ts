@@ -10,7 +10,33 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatPromoters, formatBatchResult, buildToolResponse } from '../formatters.js';
+import { executeBatch, BATCH_CHUNKING_NOTE } from '../batch-executor.js';
+import { fetchAllPages, mapConcurrent, bulkConcurrency, DEFAULT_MAX_RECORDS } from '../paginator.js';
+import { compileProjection, projectRecords } from '../projection.js';
+import { promoterMirror } from '../promoter-mirror.js';
+import { formatPromoters, formatPromoterBulkLookup, formatBatchResult, formatFetchAllSummary, formatMirrorSummary, formatProjectedRecords, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
+
+// ============================================================================
+// BULK LOOKUP
+// ============================================================================
+
+// IDs per GET /promoters?ids[]=... request (the API's page size)
+const BULK_IDS_PER_REQUEST = 100;
+
+// Cap on identifiers per get_promoters_bulk call, across all lists
+const MAX_BULK_LOOKUPS = 1000;
+
+type BulkLookupKind = 'id' | 'email' | 'ref_token' | 'auth_token' | 'promo_code';
+
+interface BulkLookup {
+  kind: BulkLookupKind;
+  value: string;
+  key: string;    // "email:ann@example.com" — the key in the result
+}
+
+function bulkLookups(kind: BulkLookupKind, values: readonly (string | number)[] | undefined): BulkLookup[] {
+  return [...new Set((values ?? []).map(String))].map((value) => ({ kind, value, key: `${kind}:${value}` }));
+}
 
 /**
  * Registers all promoter-related tools with the MCP server.
@@ -45,6 +71,11 @@ export function registerPromoterTools(server: McpServer): void {
         "promoter_campaigns[]: { campaign: { id, name, color }, state, coupon, ref_token, ref_link }. " +
 
         "Pagination: response wraps data in { data: [...], meta: { pending_count } }. " +
+        "Set fetch_all=true to collect every page in one call instead of paging manually. " +
+        "Pass fields to return only the paths you need (smaller, faster responses). " +
+        "If the local promoter mirror is enabled and fresh, results come from it (meta.source = 'local_mirror', " +
+        "with synced_at and age_seconds); there q matches word prefixes and tolerates small typos, and results " +
+        "without sort_by are ranked by relevance. W-form/custom-field/parent filters always use the live API. " +
 
         "IMPORTANT: When presenting results, cite exact field values from the returned data. " +
         "Each promoter's fields are independent — do not infer or guess values between records.",
@@ -195,6 +226,31 @@ export function registerPromoterTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction (ascending or descending)"),
+
+        // --- Auto-pagination ---
+        fetch_all: z.boolean()
+          .optional()
+          .describe("Fetch ALL pages and return them as one aggregated result (ignores page/per_page). Stops at max_records."),
+
+        max_records: z.number()
+          .int()
+          .positive()
+          .optional()
+          .describe("With fetch_all: maximum number of records to collect (default 10000)"),
+
+        // --- Data source ---
+        source: z.enum(['auto', 'live'])
+          .optional()
+          .describe("'auto' (default) answers from the local promoter mirror when it is enabled and fresh; 'live' always queries the API"),
+
+        // --- Output ---
+        fields: z.array(z.string())
+          .optional()
+          .describe("Return only these dot paths of each promoter, e.g. ['email', 'stats.revenue_amount', 'promoter_campaigns.campaign.name']. 'id' is always included."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -298,12 +354,46 @@ export function registerPromoterTools(server: McpServer): void {
           queryParams[`sorting[${args.sort_by}]`] = args.sort_direction;
         }
 
+        // fields: keep only the requested paths (projector is compiled once per path list)
+        const projector = args.fields ? compileProjection(args.fields) : undefined;
+        const formatResult = (data: unknown) => projector
+          ? formatProjectedRecords('promoter', data, args.fields!)
+          : formatPromoters(data);
+
+        // Local mirror: answered from memory when it is fresh and supports every
+        // filter used; otherwise undefined and we go to the live API below
+        const local = args.source === 'live' ? undefined : promoterMirror.query(args, {
+          maxRecords: args.fetch_all ? args.max_records ?? DEFAULT_MAX_RECORDS : undefined,
+        });
+        if (local) {
+          const result = projector ? projectRecords(local, projector) : local;
+          const summary = `${formatMirrorSummary(local.meta)}\n\n${formatResult(result)}`;
+          return {
+            content: [{ type: "text" as const, text: buildToolResponse(summary, result, args.response_format) }]
+          };
+        }
+
+        // fetch_all: walk every page and return one aggregated result
+        if (args.fetch_all) {
+          const fetched = await fetchAllPages('/promoters', { queryParams, maxRecords: args.max_records });
+          const result = {
+            data: projector ? fetched.records.map(projector) : fetched.records,
+            meta: { pending_count: fetched.meta?.pending_count, pages_fetched: fetched.pages, truncated: fetched.truncated },
+          };
+
+          const summary = `${formatFetchAllSummary(fetched)}\n\n${formatResult(result)}`;
+          return {
+            content: [{ type: "text" as const, text: buildToolResponse(summary, result, args.response_format) }]
+          };
+        }
+
         // Call the FirstPromoter API
-        const result = await callFirstPromoterAPI('/promoters', { queryParams });
+        const response = await callFirstPromoterAPI('/promoters', { queryParams });
+        const result = projector ? projectRecords(response, projector) : response;
 
         // Format the response: structured summary + raw JSON
-        const summary = formatPromoters(result);
-        const responseText = buildToolResponse(summary, result);
+        const summary = formatResult(result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -380,6 +470,11 @@ export function registerPromoterTools(server: McpServer): void {
         find_by_value: z.string()
           .optional()
           .describe("The identifier value when using find_by (e.g. the email address, auth_token, ref_token, or promo_code)"),
+
+        // --- Output ---
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -413,7 +508,7 @@ export function registerPromoterTools(server: McpServer): void {
 
         // Format response — wrap single promoter in array for the list formatter
         const summary = formatPromoters([result]);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{
@@ -438,6 +533,204 @@ export function registerPromoterTools(server: McpServer): void {
     }
   );
 
+  // ==========================================================================
+  // Tool: get_promoters_bulk
+  //
+  // Resolves many promoters in one call. Numeric IDs go 100 at a time through
+  // the ids[] filter on GET /promoters; emails, tokens and promo codes have no
+  // list filter, so each is a GET /promoters/{value}?find_by=... run through a
+  // small worker pool. The promoter mirror answers what it can first.
+  // ==========================================================================
+  server.registerTool(
+    "get_promoters_bulk",
+
+    {
+      title: "Get Promoters in Bulk",
+      description:
+        "Look up many promoters (up to " + MAX_BULK_LOOKUPS + " identifiers) in one call, by any mix of numeric IDs, " +
+        "emails, ref_tokens, auth_tokens and promo codes. Prefer this over calling get_promoter repeatedly. " +
+        "IDs are fetched in batches of " + BULK_IDS_PER_REQUEST + "; other identifiers are looked up concurrently. " +
+        "If the local promoter mirror is fresh, IDs, emails and ref_tokens are answered from it without API calls. " +
+
+        "RESPONSE STRUCTURE — returns { results, errors, meta }: " +
+        "results: { '<kind>:<value>': promoter } keyed by input, e.g. 'id:123', 'email:ann@example.com', " +
+        "'ref_token:ann', 'auth_token:...', 'promo_code:ANN10' (same promoter fields as get_promoter, or only `fields`); " +
+        "errors[]: { input: '<kind>:<value>', error } for identifiers that could not be resolved (e.g. not found); " +
+        "meta: { requested, resolved, failed, from_mirror, id_batches, single_lookups, elapsed_ms }. " +
+
+        "IMPORTANT: When presenting results, cite exact field values from the returned data. " +
+        "Each promoter's fields are independent — do not infer or guess values between records.",
+
+      inputSchema: {
+        // --- Identifiers (any mix) ---
+        ids: z.array(z.number().int())
+          .max(MAX_BULK_LOOKUPS)
+          .optional()
+          .describe("Promoter numeric IDs"),
+
+        emails: z.array(z.string())
+          .max(MAX_BULK_LOOKUPS)
+          .optional()
+          .describe("Promoter email addresses"),
+
+        ref_tokens: z.array(z.string())
+          .max(MAX_BULK_LOOKUPS)
+          .optional()
+          .describe("Referral tokens (the ref_token of a promoter_campaign)"),
+
+        auth_tokens: z.array(z.string())
+          .max(MAX_BULK_LOOKUPS)
+          .optional()
+          .describe("Promoter auth tokens"),
+
+        promo_codes: z.array(z.string())
+          .max(MAX_BULK_LOOKUPS)
+          .optional()
+          .describe("Promo codes owned by the promoters"),
+
+        // --- Output ---
+        fields: z.array(z.string())
+          .optional()
+          .describe("Return only these dot paths of each promoter (e.g. ['email', 'state', 'stats.revenue_amount']). " +
+            "id is always included."),
+
+        source: z.enum(['auto', 'live'])
+          .optional()
+          .describe("'auto' (default) uses the local promoter mirror when fresh; 'live' always calls the API"),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
+      }
+    },
+
+    async (args) => {
+      try {
+        const started = Date.now();
+        const lookups = [
+          ...bulkLookups('id', args.ids),
+          ...bulkLookups('email', args.emails),
+          ...bulkLookups('ref_token', args.ref_tokens),
+          ...bulkLookups('auth_token', args.auth_tokens),
+          ...bulkLookups('promo_code', args.promo_codes),
+        ];
+
+        if (lookups.length === 0 || lookups.length > MAX_BULK_LOOKUPS) {
+          return {
+            content: [{
+              type: "text" as const,
+              text: lookups.length === 0
+                ? "Error: Provide at least one of ids, emails, ref_tokens, auth_tokens or promo_codes."
+                : `Error: ${lookups.length} identifiers given; the limit is ${MAX_BULK_LOOKUPS} per call.`
+            }],
+            isError: true
+          };
+        }
+
+        const found = new Map<string, Record<string, unknown>>();
+        let fromMirror = 0;
+
+        // 1. Local mirror: exact hash lookups, no API calls
+        if (args.source !== 'live') {
+          for (const lookup of lookups) {
+            if (lookup.kind !== 'id' && lookup.kind !== 'email' && lookup.kind !== 'ref_token') continue;
+            const local = promoterMirror.lookup(lookup.kind, lookup.value);
+            if (local?.length === 1) {
+              found.set(lookup.key, local[0]);
+              fromMirror++;
+            }
+          }
+        }
+
+        // 2. Numeric IDs: one list request per 100 IDs (ids[0]=1&ids[1]=2...)
+        const concurrency = bulkConcurrency();
+        const pendingIds = lookups.filter((lookup) => lookup.kind === 'id' && !found.has(lookup.key));
+        const idBatches: BulkLookup[][] = [];
+        for (let i = 0; i < pendingIds.length; i += BULK_IDS_PER_REQUEST) {
+          idBatches.push(pendingIds.slice(i, i + BULK_IDS_PER_REQUEST));
+        }
+        await mapConcurrent(idBatches, concurrency, async (batch) => {
+          const queryParams: Record<string, string> = {};
+          batch.forEach((lookup, i) => {
+            queryParams[`ids[${i}]`] = lookup.value;
+          });
+          const fetched = await fetchAllPages('/promoters', { queryParams, maxRecords: batch.length });
+          const wanted = new Set(batch.map((lookup) => lookup.key));
+          for (const record of fetched.records) {
+            const key = `id:${record.id}`;
+            if (wanted.has(key)) found.set(key, record);
+          }
+        });
+
+        // 3. Everything else — and IDs a batch did not return (so a missing ID
+        //    gets the API's own "not found" error): one GET per identifier
+        const singles = lookups.filter((lookup) => !found.has(lookup.key));
+        const settled = await mapConcurrent(singles, concurrency, (lookup) =>
+          callFirstPromoterAPI(`/promoters/${encodeURIComponent(lookup.value)}`, {
+            queryParams: lookup.kind === 'id' ? undefined : { find_by: lookup.kind },
+          })
+        );
+
+        const errors: { input: string; error: string }[] = [];
+        settled.forEach((outcome, i) => {
+          if (outcome.status === 'fulfilled') {
+            found.set(singles[i].key, outcome.value as Record<string, unknown>);
+          } else {
+            errors.push({
+              input: singles[i].key,
+              error: outcome.reason instanceof Error ? outcome.reason.message : String(outcome.reason),
+            });
+          }
+        });
+
+        // Results keyed by input, in input order
+        const projector = args.fields ? compileProjection(args.fields) : undefined;
+        const results: Record<string, unknown> = {};
+        for (const lookup of lookups) {
+          const record = found.get(lookup.key);
+          if (record) results[lookup.key] = projector ? projector(record) : record;
+        }
+
+        const result = {
+          results,
+          errors,
+          meta: {
+            requested: lookups.length,
+            resolved: Object.keys(results).length,
+            failed: errors.length,
+            from_mirror: fromMirror,
+            id_batches: idBatches.length,
+            single_lookups: singles.length,
+            elapsed_ms: Date.now() - started,
+          },
+        };
+
+        const summary = formatPromoterBulkLookup(result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: responseText
+          }]
+        };
+
+      } catch (error) {
+        const errorMessage = error instanceof Error
+          ? error.message
+          : 'Unknown error occurred';
+
+        return {
+          content: [{
+            type: "text" as const,
+            text: `Error looking up promoters: ${errorMessage}`
+          }],
+          isError: true
+        };
+      }
+    }
+  );
+
   // ==========================================================================
   // Tool: update_promoter
   //
@@ -691,6 +984,7 @@ export function registerPromoterTools(server: McpServer): void {
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
         "The response status will be 'in_progress' instead of 'completed'. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -717,14 +1011,11 @@ export function registerPromoterTools(server: McpServer): void {
           campaign_id: args.campaign_id,
         };
 
-        if (args.ids) {
-          body.ids = args.ids;
-        }
-
         // Call POST /promoters/accept
-        const result = await callFirstPromoterAPI('/promoters/accept', {
+        const result = await executeBatch('/promoters/accept', {
           method: 'POST',
-          body
+          body,
+          ids: args.ids
         });
 
         // Format response using the batch result formatter
@@ -777,6 +1068,7 @@ export function registerPromoterTools(server: McpServer): void {
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
         "The response status will be 'in_progress' instead of 'completed'. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -803,14 +1095,11 @@ export function registerPromoterTools(server: McpServer): void {
           campaign_id: args.campaign_id,
         };
 
-        if (args.ids) {
-          body.ids = args.ids;
-        }
-
         // Call POST /promoters/reject
-        const result = await callFirstPromoterAPI('/promoters/reject', {
+        const result = await executeBatch('/promoters/reject', {
           method: 'POST',
-          body
+          body,
+          ids: args.ids
         });
 
         // Format response using the batch result formatter
@@ -863,6 +1152,7 @@ export function registerPromoterTools(server: McpServer): void {
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
         "The response status will be 'in_progress' instead of 'completed'. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -889,14 +1179,11 @@ export function registerPromoterTools(server: McpServer): void {
           campaign_id: args.campaign_id,
         };
 
-        if (args.ids) {
-          body.ids = args.ids;
-        }
-
         // Call POST /promoters/block
-        const result = await callFirstPromoterAPI('/promoters/block', {
+        const result = await executeBatch('/promoters/block', {
           method: 'POST',
-          body
+          body,
+          ids: args.ids
         });
 
         // Format response using the batch result formatter
@@ -952,6 +1239,7 @@ export function registerPromoterTools(server: McpServer): void {
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
         "The response status will be 'in_progress' instead of 'completed'. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -973,14 +1261,11 @@ export function registerPromoterTools(server: McpServer): void {
         // Build the JSON request body
         const body: Record<string, unknown> = {};
 
-        if (args.ids) {
-          body.ids = args.ids;
-        }
-
         // Call POST /promoters/archive
-        const result = await callFirstPromoterAPI('/promoters/archive', {
+        const result = await executeBatch('/promoters/archive', {
           method: 'POST',
-          body
+          body,
+          ids: args.ids
         });
 
         // Format response using the batch result formatter
@@ -1036,6 +1321,7 @@ export function registerPromoterTools(server: McpServer): void {
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
         "The response status will be 'in_progress' instead of 'completed'. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -1057,14 +1343,11 @@ export function registerPromoterTools(server: McpServer): void {
         // Build the JSON request body
         const body: Record<string, unknown> = {};
 
-        if (args.ids) {
-          body.ids = args.ids;
-        }
-
         // Call POST /promoters/restore
-        const result = await callFirstPromoterAPI('/promoters/restore', {
+        const result = await executeBatch('/promoters/restore', {
           method: 'POST',
-          body
+          body,
+          ids: args.ids
         });
 
         // Format response using the batch result formatter
@@ -10,7 +10,10 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatReferrals, formatBatchResult, buildToolResponse } from '../formatters.js';
+import { executeBatch, BATCH_CHUNKING_NOTE } from '../batch-executor.js';
+import { fetchAllPages } from '../paginator.js';
+import { compileProjection, projectRecords } from '../projection.js';
+import { formatReferrals, formatBatchResult, formatFetchAllSummary, formatProjectedRecords, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
 
 /**
  * Registers all referral-related tools with the MCP server.
@@ -43,6 +46,8 @@ export function registerReferralTools(server: McpServer): void {
         "created_by_user_email. " +
 
         "NOTE: The API returns a flat array, NOT wrapped in { data: [...] }. " +
+        "Set fetch_all=true to collect every page in one call. " +
+        "Pass fields to return only the paths you need (smaller, faster responses). " +
 
         "IMPORTANT: When presenting results, cite exact field values from the returned data. " +
         "Each referral's fields are independent — do not infer or guess values between records.",
@@ -70,6 +75,26 @@ export function registerReferralTools(server: McpServer): void {
           'subscribed', 'signup', 'active', 'cancelled',
           'refunded', 'denied', 'pending', 'moved'
         ]).optional().describe("Filter referrals by their state"),
+
+        // --- Auto-pagination ---
+        fetch_all: z.boolean()
+          .optional()
+          .describe("Fetch ALL pages and return them as one aggregated result. Stops at max_records."),
+
+        max_records: z.number()
+          .int()
+          .positive()
+          .optional()
+          .describe("With fetch_all: maximum number of records to collect (default 10000)"),
+
+        // --- Output ---
+        fields: z.array(z.string())
+          .optional()
+          .describe("Return only these dot paths of each referral, e.g. ['email', 'state', 'promoter_campaign.promoter.email']. 'id' is always included."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -101,12 +126,29 @@ export function registerReferralTools(server: McpServer): void {
           queryParams['filters[state]'] = args.state;
         }
 
+        // fields: keep only the requested paths (projector is compiled once per path list)
+        const projector = args.fields ? compileProjection(args.fields) : undefined;
+        const formatResult = (data: unknown) => projector
+          ? formatProjectedRecords('referral', data, args.fields!)
+          : formatReferrals(data);
+
+        // fetch_all: walk every page and return one aggregated result
+        if (args.fetch_all) {
+          const fetched = await fetchAllPages('/referrals', { queryParams, maxRecords: args.max_records });
+          const records = projector ? fetched.records.map(projector) : fetched.records;
+          const summary = `${formatFetchAllSummary(fetched)}\n\n${formatResult(records)}`;
+          return {
+            content: [{ type: "text" as const, text: buildToolResponse(summary, records, args.response_format) }]
+          };
+        }
+
         // Call the FirstPromoter API
-        const result = await callFirstPromoterAPI('/referrals', { queryParams });
+        const response = await callFirstPromoterAPI('/referrals', { queryParams });
+        const result = projector ? projectRecords(response, projector) : response;
 
         // Format the response: structured summary + raw JSON
-        const summary = formatReferrals(result);
-        const responseText = buildToolResponse(summary, result);
+        const summary = formatResult(result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -175,6 +217,10 @@ export function registerReferralTools(server: McpServer): void {
         find_by_value: z.string()
           .optional()
           .describe("The identifier value when using find_by (e.g. the email, uid, or username)"),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
@@ -204,7 +250,7 @@ export function registerReferralTools(server: McpServer): void {
 
         // Format response — wrap single referral in array for the list formatter
         const summary = formatReferrals([result]);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [{
@@ -391,6 +437,7 @@ export function registerReferralTools(server: McpServer): void {
         "move_associated_commissions — if true, also moves the commissions associated with the referrals. " +
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -423,13 +470,11 @@ export function registerReferralTools(server: McpServer): void {
         if (args.move_associated_commissions !== undefined) {
           body.move_associated_commissions = args.move_associated_commissions;
         }
-        if (args.ids) {
-          body.ids = args.ids;
-        }
 
-        const result = await callFirstPromoterAPI('/referrals/move_to_promoter', {
+        const result = await executeBatch('/referrals/move_to_promoter', {
           method: 'POST',
-          body
+          body,
+          ids: args.ids
         });
 
         const summary = formatBatchResult(result);
@@ -476,6 +521,7 @@ export function registerReferralTools(server: McpServer): void {
         "WARNING: This is a destructive operation — deleted referrals cannot be recovered. " +
 
         "ASYNC NOTE: If more than 5 ids are provided, the operation runs asynchronously. " +
+        BATCH_CHUNKING_NOTE +
 
         "RESPONSE STRUCTURE — returns a batch result object: " +
         "id (batch ID), status (pending/in_progress/completed/failed/stopped), " +
@@ -493,13 +539,9 @@ export function registerReferralTools(server: McpServer): void {
 
     async (args) => {
       try {
-        const body: Record<string, unknown> = {
-          ids: args.ids,
-        };
-
-        const result = await callFirstPromoterAPI('/referrals', {
+        const result = await executeBatch('/referrals', {
           method: 'DELETE',
-          body
+          ids: args.ids
         });
 
         const summary = formatBatchResult(result);
@@ -18,7 +18,9 @@
 import { McpServer } from "@modelcontextprotocol/sdk/server/mcp.js";
 import { z } from "zod";
 import { callFirstPromoterAPI } from '../api.js';
-import { formatCampaignReport, formatOverviewReport, formatPromoterReport, formatTrafficSourceReport, formatUrlReport, buildToolResponse } from '../formatters.js';
+import { reportCache, type ReportQuery } from '../report-cache.js';
+import { startProgress } from '../request-context.js';
+import { formatCampaignReport, formatOverviewReport, formatPromoterReport, formatTrafficSourceReport, formatUrlReport, formatReportsBundle, buildToolResponse, RESPONSE_FORMATS, RESPONSE_FORMAT_DESCRIPTION } from '../formatters.js';
 
 // ============================================================================
 // SHARED HELPER
@@ -35,15 +37,7 @@ import { formatCampaignReport, formatOverviewReport, formatPromoterReport, forma
  * - q              -> q=search_term
  * - sort_by + sort_direction -> sorting[field]=direction
  */
-function buildReportQueryParams(args: {
-  columns: string[];
-  group_by: string;
-  start_date: string;
-  end_date: string;
-  q?: string;
-  sort_by?: string;
-  sort_direction?: string;
-}): URLSearchParams {
+function buildReportQueryParams(args: ReportQuery): URLSearchParams {
   const params = new URLSearchParams();
 
   // Columns array: columns[]=value1&columns[]=value2
@@ -71,12 +65,23 @@ function buildReportQueryParams(args: {
   return params;
 }
 
+/**
+ * Fetches a report through the time-series cache: closed periods already
+ * seen are reused and only the missing date ranges are requested — with
+ * every column in `allColumns`, so later column subsets are served locally.
+ */
+export function fetchReport(endpoint: string, args: ReportQuery, allColumns: readonly string[]): Promise<unknown> {
+  return reportCache.fetch(endpoint, args, allColumns, (query) =>
+    callFirstPromoterAPI(endpoint, { queryParams: buildReportQueryParams(query) })
+  );
+}
+
 // ============================================================================
 // COLUMN ENUMS
 // ============================================================================
 
 // Campaigns, Overview, and Promoters share the same set of available columns
-const STANDARD_COLUMNS = [
+export const STANDARD_COLUMNS = [
   'active_customers',
   'monthly_churn',
   'clicks_count',
@@ -132,6 +137,21 @@ const URL_COLUMNS = [
 // Group by options shared by all report endpoints
 const GROUP_BY_OPTIONS = ['day', 'week', 'month', 'year'] as const;
 
+// Every column any report accepts (traffic source columns are a subset of
+// the standard ones; URL reports add "url")
+const ALL_REPORT_COLUMNS = [...STANDARD_COLUMNS, 'url'] as const;
+
+// Report types get_reports_bundle can combine, with their endpoint and columns
+const BUNDLE_REPORT_TYPES = ['overview', 'campaigns', 'promoters', 'traffic_sources', 'urls'] as const;
+
+const BUNDLE_REPORTS: Record<typeof BUNDLE_REPORT_TYPES[number], { endpoint: string; columns: readonly string[] }> = {
+  overview: { endpoint: '/reports/overview', columns: STANDARD_COLUMNS },
+  campaigns: { endpoint: '/reports/campaigns', columns: STANDARD_COLUMNS },
+  promoters: { endpoint: '/reports/promoters', columns: STANDARD_COLUMNS },
+  traffic_sources: { endpoint: '/reports/traffic_sources', columns: TRAFFIC_SOURCE_COLUMNS },
+  urls: { endpoint: '/reports/urls', columns: URL_COLUMNS },
+};
+
 // ============================================================================
 // REGISTER FUNCTION
 // ============================================================================
@@ -206,17 +226,19 @@ export function registerReportTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction: 'asc' for ascending, 'desc' for descending. Used with sort_by."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
     async (args) => {
       try {
-        const queryParams = buildReportQueryParams(args);
-
-        const result = await callFirstPromoterAPI('/reports/campaigns', { queryParams });
+        const result = await fetchReport('/reports/campaigns', args, STANDARD_COLUMNS);
 
         const summary = formatCampaignReport(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -310,17 +332,19 @@ export function registerReportTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction: 'asc' for ascending, 'desc' for descending. Used with sort_by."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
     async (args) => {
       try {
-        const queryParams = buildReportQueryParams(args);
-
-        const result = await callFirstPromoterAPI('/reports/overview', { queryParams });
+        const result = await fetchReport('/reports/overview', args, STANDARD_COLUMNS);
 
         const summary = formatOverviewReport(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -414,17 +438,19 @@ export function registerReportTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction: 'asc' for ascending, 'desc' for descending. Used with sort_by."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
     async (args) => {
       try {
-        const queryParams = buildReportQueryParams(args);
-
-        const result = await callFirstPromoterAPI('/reports/promoters', { queryParams });
+        const result = await fetchReport('/reports/promoters', args, STANDARD_COLUMNS);
 
         const summary = formatPromoterReport(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -520,17 +546,19 @@ export function registerReportTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction: 'asc' for ascending, 'desc' for descending. Used with sort_by."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
     async (args) => {
       try {
-        const queryParams = buildReportQueryParams(args);
-
-        const result = await callFirstPromoterAPI('/reports/traffic_sources', { queryParams });
+        const result = await fetchReport('/reports/traffic_sources', args, TRAFFIC_SOURCE_COLUMNS);
 
         const summary = formatTrafficSourceReport(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -625,17 +653,19 @@ export function registerReportTools(server: McpServer): void {
         sort_direction: z.enum(['asc', 'desc'])
           .optional()
           .describe("Sort direction: 'asc' for ascending, 'desc' for descending. Used with sort_by."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
       }
     },
 
     async (args) => {
       try {
-        const queryParams = buildReportQueryParams(args);
-
-        const result = await callFirstPromoterAPI('/reports/urls', { queryParams });
+        const result = await fetchReport('/reports/urls', args, URL_COLUMNS);
 
         const summary = formatUrlReport(result);
-        const responseText = buildToolResponse(summary, result);
+        const responseText = buildToolResponse(summary, result, args.response_format);
 
         return {
           content: [
@@ -663,4 +693,169 @@ export function registerReportTools(server: McpServer): void {
       }
     }
   );
+
+  // ==========================================================================
+  // Tool: get_reports_bundle
+  //
+  // Several report types for the same date range in one call. The reports
+  // are fetched concurrently (the shared rate limiter keeps them within the
+  // API budget), so four reports take about as long as the slowest one
+  // instead of four model round-trips.
+  // ==========================================================================
+  server.registerTool(
+    "get_reports_bundle",
+
+    {
+      title: "Get Report Bundle",
+      description:
+        "Get several FirstPromoter reports (overview, campaigns, promoters, traffic_sources, urls) " +
+        "for the same date range in one call. The reports are fetched concurrently and share one " +
+        "columns/group_by/start_date/end_date spec. Prefer this over calling several get_reports_* tools in a row. " +
+
+        "QUERY PARAMETERS — reports (required, which report types to include), " +
+        "columns (required, union of the columns you want — each report gets the ones it supports), " +
+        "group_by (required, day/week/month/year), start_date (required), end_date (required), " +
+        "q (optional search, applied to every report), sort_by + sort_direction (optional, applied " +
+        "to each report that includes the sort column). " +
+
+        "RESPONSE STRUCTURE — returns one object: " +
+        "spec: { columns, group_by, start_date, end_date, q }, " +
+        "reports: { <type>: <that report's array, exactly as the matching get_reports_* tool returns it> }, " +
+        "skipped: { <type>: reason } (only if a report supports none of the requested columns), " +
+        "errors: { <type>: message } (only if a report failed — the other reports are still returned). " +
+        "Duplicate report types and columns are ignored. " +
+        "Monetary amounts are in cents (divide by 100 for dollars). " +
+
+        "IMPORTANT: When presenting results, cite exact field values from the returned data. " +
+        "Each report's rows are independent — do not infer or guess values between records.",
+
+      inputSchema: {
+        reports: z.array(z.enum(BUNDLE_REPORT_TYPES))
+          .min(1)
+          .describe("Report types to include, e.g. ['overview', 'campaigns', 'promoters', 'traffic_sources']."),
+
+        columns: z.array(z.enum(ALL_REPORT_COLUMNS))
+          .min(1)
+          .describe("Columns (metrics) to include. Each report uses the subset it supports " +
+            "(traffic_sources and urls accept fewer columns; 'url' only applies to urls)."),
+
+        group_by: z.enum(GROUP_BY_OPTIONS)
+          .describe("Time period grouping shared by all reports (day, week, month, or year)."),
+
+        start_date: z.string()
+          .describe("Start date for the report period (ISO 8601 format, e.g. '2024-01-01')."),
+
+        end_date: z.string()
+          .describe("End date for the report period (ISO 8601 format, e.g. '2024-12-31')."),
+
+        q: z.string()
+          .optional()
+          .describe("Search query string applied to every report."),
+
+        sort_by: z.string()
+          .optional()
+          .describe("Column name to sort each report by (ignored for reports without that column)."),
+
+        sort_direction: z.enum(['asc', 'desc'])
+          .optional()
+          .describe("Sort direction: 'asc' for ascending, 'desc' for descending. Used with sort_by."),
+
+        response_format: z.enum(RESPONSE_FORMATS)
+          .optional()
+          .describe(RESPONSE_FORMAT_DESCRIPTION),
+      }
+    },
+
+    async (args) => {
+      try {
+        const types = [...new Set(args.reports)];
+        const columns: string[] = [...new Set(args.columns)];
+
+        const bundle: {
+          spec: Record<string, unknown>;
+          reports: Record<string, unknown>;
+          skipped?: Record<string, string>;
+          errors?: Record<string, string>;
+        } = {
+          spec: {
+            columns,
+            group_by: args.group_by,
+            start_date: args.start_date,
+            end_date: args.end_date,
+            q: args.q,
+          },
+          reports: {},
+        };
+
+        // Each report gets the requested columns it supports
+        const planned = types.flatMap((type) => {
+          const report = BUNDLE_REPORTS[type];
+          const reportColumns = columns.filter((column) => report.columns.includes(column));
+          if (reportColumns.length === 0) {
+            bundle.skipped = { ...bundle.skipped, [type]: 'none of the requested columns apply to this report' };
+            return [];
+          }
+          return [{ type, report, reportColumns }];
+        });
+
+        // Fetch concurrently; one failing report does not sink the others
+        const progress = startProgress();
+        let finished = 0;
+        const settled = await Promise.allSettled(planned.map(({ type, report, reportColumns }) => {
+          const sorted = args.sort_by !== undefined && reportColumns.includes(args.sort_by);
+          return fetchReport(report.endpoint, {
+            columns: reportColumns,
+            group_by: args.group_by,
+            start_date: args.start_date,
+            end_date: args.end_date,
+            q: args.q,
+            sort_by: sorted ? args.sort_by : undefined,
+            sort_direction: sorted ? args.sort_direction : undefined,
+          }, report.columns).finally(() => progress.update(++finished, planned.length, `${type} report done`));
+        }));
+        progress.end();
+
+        settled.forEach((outcome, i) => {
+          const { type } = planned[i];
+          if (outcome.status === 'fulfilled') {
+            bundle.reports[type] = outcome.value;
+          } else {
+            const reason = outcome.reason;
+            bundle.errors = { ...bundle.errors, [type]: reason instanceof Error ? reason.message : String(reason) };
+          }
+        });
+
+        if (planned.length > 0 && Object.keys(bundle.reports).length === 0) {
+          throw new Error(Object.entries(bundle.errors ?? {}).map(([type, message]) => `${type}: ${message}`).join('; '));
+        }
+
+        const summary = formatReportsBundle(bundle);
+        const responseText = buildToolResponse(summary, bundle, args.response_format);
+
+        return {
+          content: [
+            {
+              type: "text" as const,
+              text: responseText
+            }
+          ]
+        };
+
+      } catch (error) {
+        const errorMessage = error instanceof Error
+          ? error.message
+          : 'Unknown error occurred';
+
+        return {
+          content: [
+            {
+              type: "text" as const,
+              text: `Error fetching report bundle: ${errorMessage}`
+            }
+          ],
+          isError: true
+        };
+      }
+    }
+  );
 }